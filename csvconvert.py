@@ -1,33 +1,15 @@
-import json
 import uuid
-import requests
-import csv
+from organizations_manager_app.dedup import DedupIndex, deduplicate, entry_from_seed
+from organizations_manager_app.geocoding import GeocodeCache, Geocoder, NominatimBackend, parse_coordinate
+from organizations_manager_app.jsonstream import chunked, is_ndjson_path, read_records, write_json_array, write_ndjson
+from organizations_manager_app.nace import NaceClassifier, load_nace_codes
 
-# --- NACE Code Loading and Parsing ---
-#Returns a dictionary of {nacecode:description,}
-def load_nace_codes(filepath):
-    """Loads NACE codes from a text file and creates a lookup dictionary."""
-    nace_codes = {}
-    with open(filepath, 'r', encoding='utf-8') as file:
-        for line in file:
-            line = line.strip()
-            if line:
-                parts = line.split(" - ", 1)  # Split only once at the first " - "
-                if len(parts) == 2:
-                    code, description = parts[0].strip(), parts[1].strip()
-                    nace_codes[code] = description
-    return nace_codes
+# --- NACE Code Loading and Classification ---
+# load_nace_codes returns a dictionary of {nacecode:description,}; NaceClassifier
+# ranks those codes against an organization description.
 
-def find_best_nace_code(description, nace_codes):
-    """Finds the best matching NACE code based on description keywords."""
-    description = description.lower()
-    best_code = None
-    for code, desc in nace_codes.items():
-        desc_lower = desc.lower()
-        if any(keyword in description for keyword in desc_lower.split()):  #Check if any keyword from description
-            if best_code is None or len(desc_lower) < len(nace_codes[best_code].lower()): #select the shortest description to be more accurate
-                best_code = code
-    return best_code
+# Persistent reverse-geocoding cache, keyed by rounded coordinates
+GEOCODE_CACHE_FILE = "geocode_cache.sqlite3"
 
 # Ownership structure mapping
 OWNERSHIP_STRUCTURE_LOOKUP = {
@@ -96,22 +78,23 @@ def determine_geo_scope(location_str):
         return "virtual"
     return "global"
 
-def get_city_country_from_coords(lat, lon):
-    """Use OpenStreetMap's Nominatim API to get city and country from coordinates."""
-    try:
-        response = requests.get(
-            "https://nominatim.openstreetmap.org/reverse",
-            params={"format": "json", "lat": lat, "lon": lon},
-            headers={"User-Agent": "YourApp/1.0"}
-        )
-        data = response.json()
-        address = data.get("address", {})
-        city = address.get("city") or address.get("town") or address.get("village") or ""
-        country = address.get("country", "")
-        return city, country
-    except Exception as e:
-        print(f"Geolocation API failed for coordinates ({lat}, {lon}): {e}")
-        return "", ""
+def coordinates_to_geocode(row):
+    """Return (lat, lon) when the row's city and country must come from its coordinates."""
+    if "," in row.get("Location", ""):
+        return None  # "City, Country" is already given
+    lat = parse_coordinate(row.get("Latitude", ""))
+    lon = parse_coordinate(row.get("Longitude", ""))
+    if lat is None or lon is None:
+        return None
+    return lat, lon
+
+def prefetch_locations(rows, geocoder, chunk_size=200):
+    """Generator stage: reverse-geocodes each chunk of rows concurrently before conversion."""
+    for chunk in chunked(rows, chunk_size):
+        coords = [c for c in map(coordinates_to_geocode, chunk) if c]
+        if coords:
+            geocoder.reverse_many(coords)
+        yield from chunk
 
 def determine_organization_type(tags):
     """Determine the organization type based on tags."""
@@ -122,136 +105,169 @@ def determine_organization_type(tags):
         return "crypto_web3"
     return "other"
 
-def convert_json(input_file, output_file, nace_file):
-    """Converts the input JSON file, mapping to the specified format."""
-
-    nace_codes = load_nace_codes(nace_file) #Load NACE codes from provided file
+def convert_row(row, nace_classifier, geocoder=None):
+    """Map one CSV-derived row to an organization record."""
+    # Extract and clean fields from CSV-derived JSON
+    name = row.get("Name", "").strip()
+    description = row.get("Description", "").strip()
     
-    with open(input_file, 'r', encoding='utf-8') as infile:
-        data = json.load(infile)
+    csv_category = row.get("Category", "").strip().lower()
+    industry = nace_classifier.best_code(description)
 
-    results = []
-    for row in data:
-        # Extract and clean fields from CSV-derived JSON
-        name = row.get("Name", "").strip()
-        description = row.get("Description", "").strip()
-        
-        csv_category = row.get("Category", "").strip().lower()
-        industry = find_best_nace_code(description, nace_codes)
-
-        # Map organization type using the category.
-        org_type = ORGANIZATION_TYPE_STRUCTURE_LOOKUP.get(csv_category, "other")
-        
-        # Get the "Type" field for legal structure mapping.
-        type_field = row.get("Type", "").strip().lower()
-        legal_structure = LEGAL_STRUCTURE_LOOKUP.get(type_field, "other")
-        
-        # Determine ownership structure
-        ownership_structure = OWNERSHIP_STRUCTURE_LOOKUP.get(type_field, ["Community-Owned"])
-        
-        # Determine geographic scope
-        location_str = row.get("Location", "").strip()
-        geo_scope = determine_geo_scope(location_str)
-        
-        # Determine governance model
-        governance_model = GOVERNANCE_MODEL_LOOKUP.get(type_field, "other")
-        
-        # Get fields for tags: combine "What are you looking for?" and "Activities"
-        what_looking_for = row.get("What are you looking for?", "").strip()
-        activities = row.get("Activities", "").strip()
-        tags = []
-        if what_looking_for:
-            tags.append(what_looking_for)
-        tags.extend(parse_comma_separated(activities))
-        
-        # Determine organization type based on tags
-        org_type = determine_organization_type(tags)
-        
-        logo = row.get("Logo", "").strip()
-        website = row.get("Website", "").strip()
-        
-        # Process Latitude and Longitude: convert to string if numeric.
-        latitude = row.get("Latitude", "")
-        longitude = row.get("Longitude", "")
-        if isinstance(latitude, (float, int)):
-            lat_val = str(latitude)
-        else:
-            lat_val = str(latitude).strip()
-        if isinstance(longitude, (float, int)):
-            lon_val = str(longitude)
-        else:
-            lon_val = str(longitude).strip()
-        
-        github = row.get("Open  Repo", "").strip()
-        email = row.get("Email", "").strip()
-        
-        # Process location: if location string contains a comma, assume format "City, Country"
-        if "," in location_str:
-            parts = [p.strip() for p in location_str.split(",")]
-            if len(parts) >= 2:
-                city = parts[0]
-                country = parts[-1]
-            else:
-                city, country = "", ""
-        elif lat_val and lon_val:
-            city, country = get_city_country_from_coords(lat_val, lon_val)
+    # Map organization type using the category.
+    org_type = ORGANIZATION_TYPE_STRUCTURE_LOOKUP.get(csv_category, "other")
+    
+    # Get the "Type" field for legal structure mapping.
+    type_field = row.get("Type", "").strip().lower()
+    legal_structure = LEGAL_STRUCTURE_LOOKUP.get(type_field, "other")
+    
+    # Determine ownership structure
+    ownership_structure = OWNERSHIP_STRUCTURE_LOOKUP.get(type_field, ["Community-Owned"])
+    
+    # Determine geographic scope
+    location_str = row.get("Location", "").strip()
+    geo_scope = determine_geo_scope(location_str)
+    
+    # Determine governance model
+    governance_model = GOVERNANCE_MODEL_LOOKUP.get(type_field, "other")
+    
+    # Get fields for tags: combine "What are you looking for?" and "Activities"
+    what_looking_for = row.get("What are you looking for?", "").strip()
+    activities = row.get("Activities", "").strip()
+    tags = []
+    if what_looking_for:
+        tags.append(what_looking_for)
+    tags.extend(parse_comma_separated(activities))
+    
+    # Determine organization type based on tags
+    org_type = determine_organization_type(tags)
+    
+    logo = row.get("Logo", "").strip()
+    website = row.get("Website", "").strip()
+    
+    github = row.get("Open  Repo", "").strip()
+    email = row.get("Email", "").strip()
+    
+    # Process location: if location string contains a comma, assume format "City, Country"
+    if "," in location_str:
+        parts = [p.strip() for p in location_str.split(",")]
+        if len(parts) >= 2:
+            city = parts[0]
+            country = parts[-1]
         else:
             city, country = "", ""
-        
-        # Build the organization record matching your Django model structure.
-        organization = {
-            "id": str(uuid.uuid4()),
-            "name": name,
-            "description": description,
-            "type": org_type,  # OrganizationType mapped from tags
-            "industry": industry,  # NACE code from description
-            "ownership_structure": ownership_structure,  # Determined from type_field
-            "legal_structure": legal_structure,
-            "year_founded": None,  # Not provided in CSV.
-            "location": {
-                "city": city,
-                "country": country,
-                "address": "",  # Not provided.
-                "state_region": "",
-                "zip_postal_code": ""
-            },
-            "geo_scope": geo_scope,
-            "size": "unknown",  # Not provided.
-            "members": None,    # Not provided.
-            "funding": {
-                "sources": [],  # Not provided.
-                "revenue": ""
-            },
-            "token": {
-                "name": "",  # Not provided.
-                "token_symbol": "",
-                "blockchain_platform": "",
-                "governance_mechanism": "",
-                "link_to_token_contract": ""
-            },
-            "governance_model": governance_model,
-            "links_social_media": {
-                "website": website,
-                "twitter": "",  # Not provided.
-                "linkedin": "",  # Not provided.
-                "discord": "",   # Not provided.
-                "github": github,
-                "other": logo   # Logo stored as an extra link.
-            },
-            "contact_information": {
-                "contact_person": "",  # Not provided.
-                "email": email,
-                "phone": ""  # Not provided.
-            },
-            "certifications_affiliations": [],
-            "tags": tags
-        }
-        results.append(organization)
+    elif geocoder and (coords := coordinates_to_geocode(row)):
+        city, country = geocoder.reverse(*coords)
+    else:
+        city, country = "", ""
+    
+    # Build the organization record matching your Django model structure.
+    organization = {
+        "id": str(uuid.uuid4()),
+        "name": name,
+        "description": description,
+        "type": org_type,  # OrganizationType mapped from tags
+        "industry": industry,  # NACE code from description
+        "ownership_structure": ownership_structure,  # Determined from type_field
+        "legal_structure": legal_structure,
+        "year_founded": None,  # Not provided in CSV.
+        "location": {
+            "city": city,
+            "country": country,
+            "latitude": parse_coordinate(row.get("Latitude", "")),
+            "longitude": parse_coordinate(row.get("Longitude", "")),
+            "address": "",  # Not provided.
+            "state_region": "",
+            "zip_postal_code": ""
+        },
+        "geo_scope": geo_scope,
+        "size": "unknown",  # Not provided.
+        "members": None,    # Not provided.
+        "funding": {
+            "sources": [],  # Not provided.
+            "revenue": ""
+        },
+        "token": {
+            "name": "",  # Not provided.
+            "token_symbol": "",
+            "blockchain_platform": "",
+            "governance_mechanism": "",
+            "link_to_token_contract": ""
+        },
+        "governance_model": governance_model,
+        "links_social_media": {
+            "website": website,
+            "twitter": "",  # Not provided.
+            "linkedin": "",  # Not provided.
+            "discord": "",   # Not provided.
+            "github": github,
+            "other": logo   # Logo stored as an extra link.
+        },
+        "contact_information": {
+            "contact_person": "",  # Not provided.
+            "email": email,
+            "phone": ""  # Not provided.
+        },
+        "certifications_affiliations": [],
+        "tags": tags
+    }
+    return organization
+
+def convert_rows(rows, nace_classifier, geocoder=None):
+    """Generator stage: converts rows lazily, one at a time."""
+    for row in rows:
+        yield convert_row(row, nace_classifier, geocoder)
+
+def convert_json(input_file, output_file, nace_file, geocoder=None, dedup=False, existing_file=None,
+                 merge_report_file=None):
+    """
+    Converts the input JSON (array or NDJSON) file, mapping to the specified format.
+    Records are streamed from input to output, so memory use does not grow
+    with the file size. Output is NDJSON for .ndjson/.jsonl paths, otherwise
+    a JSON array.
+
+    Locations given only as coordinates are resolved through ``geocoder``;
+    by default Nominatim, rate limited and cached in GEOCODE_CACHE_FILE.
+    Pass ``Geocoder(cache=GeocodeCache(...), offline=True)`` to answer
+    from the cache alone, or ``Geocoder(GazetteerBackend("cities15000.txt"))``
+    to resolve coordinates from a local GeoNames file without any network.
+
+    With ``dedup``, rows describing the same organization (by name,
+    website domain or email) share one id. With ``existing_file`` too, a
+    seed file or NDJSON export of the current directory, rows matching an
+    organization there take over its id, so re-importing an updated CSV
+    updates it instead of adding a duplicate. ``merge_report_file``
+    receives every match as NDJSON; without ``dedup`` the matches are only
+    reported. Either keeps an index of every organization seen in memory,
+    so leave both off to convert in constant memory.
+    """
+
+    nace_classifier = NaceClassifier(load_nace_codes(nace_file)) #Index NACE codes from provided file once
+
+    if geocoder is None:
+        geocoder = Geocoder(NominatimBackend(), cache=GeocodeCache(GEOCODE_CACHE_FILE), rate=1.0)
+
+    rows = prefetch_locations(read_records(input_file), geocoder)
+    records = convert_rows(rows, nace_classifier, geocoder)
+
+    report = []
+    if dedup or merge_report_file:
+        index = DedupIndex(map(entry_from_seed, read_records(existing_file)) if existing_file else ())
+        records = deduplicate(records, index, report, assign_ids=dedup)
 
     with open(output_file, 'w', encoding='utf-8') as outfile:
-        json.dump(results, outfile, indent=4)
+        if is_ndjson_path(output_file):
+            count = write_ndjson(records, outfile)
+        else:
+            count = write_json_array(records, outfile)
     
-    print(f"Converted JSON saved to {output_file}")
+    print(f"Converted {count} records, saved to {output_file}")
+
+    if report:
+        print(f"{len(report)} records matched an organization seen before")
+    if merge_report_file:
+        with open(merge_report_file, 'w', encoding='utf-8') as reportfile:
+            write_ndjson(report, reportfile)
 
 """ if __name__ == '__main__':
     nace_codes_file = "NACEcodes.txt"
@@ -2,11 +2,14 @@ import React, { useState, useEffect } from 'react';
 import SearchBar from './components/SearchBar';
 import Filters from './components/Filters';
 import OrganizationList from './components/OrganizationList';
-import { searchOrganizations, filterOrganizations } from './api';
+import { searchOrganizations, filterOrganizations, fetchNextPage } from './api';
 import './App.css';
 
 const App = () => {
   const [organizations, setOrganizations] = useState([]);
+  // Absolute URL of the next page from the keyset pagination, or null on the last page
+  const [nextUrl, setNextUrl] = useState(null);
+  const [loadingMore, setLoadingMore] = useState(false);
 
   useEffect(() => {
     console.log('Organizations state updated:', organizations);
@@ -16,11 +19,14 @@ const App = () => {
     const data = await searchOrganizations(query);
     if (Array.isArray(data)) {
       setOrganizations(data);
+      setNextUrl(null);
     } else if (data.results) {
       setOrganizations(data.results);
+      setNextUrl(data.has_more ? data.next : null);
     } else {
       console.warn("Unexpected API response structure:", data);
       setOrganizations([]);
+      setNextUrl(null);
     }
   };
 
@@ -32,15 +38,38 @@ const App = () => {
 
       if (data && data.results) {
         setOrganizations(data.results);
+        setNextUrl(data.has_more ? data.next : null);
       } else {
         console.error('Unexpected API response structure:', data);
         setOrganizations([]);
+        setNextUrl(null);
       }
     } catch (error) {
       console.error('Error filtering organizations:', error);
     }
   };
 
+  const handleLoadMore = async () => {
+    if (!nextUrl || loadingMore) {
+      return;
+    }
+    setLoadingMore(true);
+    try {
+      const data = await fetchNextPage(nextUrl);
+      if (data && data.results) {
+        setOrganizations((current) => [...current, ...data.results]);
+        setNextUrl(data.has_more ? data.next : null);
+      } else {
+        console.error('Unexpected API response structure:', data);
+        setNextUrl(null);
+      }
+    } catch (error) {
+      console.error('Error loading more organizations:', error);
+    } finally {
+      setLoadingMore(false);
+    }
+  };
+
   useEffect(() => {
 
     handleSearch('');
@@ -52,6 +81,11 @@ const App = () => {
       <SearchBar onSearch={handleSearch} />
       <Filters onFilter={handleFilter} />
       <OrganizationList organizations={organizations} />
+      {nextUrl && (
+        <button type="button" onClick={handleLoadMore} disabled={loadingMore}>
+          {loadingMore ? 'Loading...' : 'Load more'}
+        </button>
+      )}
     </div>
   );
 };
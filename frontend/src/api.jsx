@@ -5,8 +5,8 @@ const API_URL = 'http://localhost:8000/api';
 export const searchOrganizations = async (query) => {
   console.log('Searching organizations with query:', query);
   try {
-    const response = await axios.get(`${API_URL}/organizations/`, {
-      params: { search: query }
+    const response = await axios.get(`${API_URL}/organizations/filter/`, {
+      params: { q: query }
     });
     console.log('Search response:', response.data);
     return response.data; 
@@ -36,6 +36,18 @@ export const filterOrganizations = async (filters) => {
   }
 };
 
+export const fetchNextPage = async (nextUrl) => {
+  console.log('Fetching next page:', nextUrl);
+  try {
+    const response = await axios.get(nextUrl);
+    console.log('Next page response:', response.data);
+    return response.data;
+  } catch (error) {
+    console.error('Error fetching next page:', error);
+    throw error;
+  }
+};
+
 export const getOwnershipStructures = async () => {
   console.log('Fetching ownership structures');
   try {
@@ -4,3 +4,6 @@ from django.apps import AppConfig
 class OrganizationsManagerConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'organizations_manager_app'
+
+    def ready(self):
+        from . import signals  # noqa: F401
@@ -0,0 +1,116 @@
+"""
+In-process prefix index for the autocomplete endpoint.
+
+Each kind of suggestion (organization names, NACE industries) is held as
+one sorted list of normalized keys with a parallel list of item numbers.
+A lookup is a binary search for the prefix followed by a short forward
+scan, which takes microseconds; the only query per request is the
+version check below. Keys
+are every word start of a name, so ``corp`` finds "Mondragon
+Corporation" as well as "Corp Co-op".
+
+Indexes are built on first use and rebuilt lazily: each remembers the
+data version it was built from (see ``caching``) and is replaced on the
+first lookup after that version moves on.
+"""
+import bisect
+import threading
+import unicodedata
+
+from .caching import get_data_version, get_industry_version
+from .models import Industry, Organization
+
+AUTOCOMPLETE_LIMIT = 10
+MAX_AUTOCOMPLETE_LIMIT = 50
+
+
+def normalize(text):
+    """Case- and accent-insensitive form of ``text`` used for keys and prefixes."""
+    decomposed = unicodedata.normalize('NFKD', text)
+    return ''.join(char for char in decomposed if not unicodedata.combining(char)).casefold().strip()
+
+
+def word_starts(text):
+    """``text`` from the start of each of its words: 'a b c' -> 'a b c', 'b c', 'c'."""
+    words = text.split()
+    return [' '.join(words[start:]) for start in range(len(words))]
+
+
+class PrefixIndex:
+    """
+    Sorted keys over a tuple of items. ``entries`` are ``(text, item)``
+    pairs; every word start of ``text`` becomes a key for ``item``.
+    """
+
+    def __init__(self, entries):
+        items = []
+        pairs = []
+        for text, item in entries:
+            number = len(items)
+            items.append(item)
+            pairs.extend((key, number) for key in dict.fromkeys(word_starts(normalize(text))))
+        pairs.sort()
+        self.items = tuple(items)
+        self.keys = [key for key, _ in pairs]
+        self.numbers = [number for _, number in pairs]
+
+    def __len__(self):
+        return len(self.items)
+
+    def search(self, prefix, limit=AUTOCOMPLETE_LIMIT):
+        """Up to ``limit`` distinct items with a key starting with ``prefix``, in key order."""
+        prefix = normalize(prefix)
+        if not prefix or limit <= 0:
+            return []
+        keys, numbers = self.keys, self.numbers
+        seen = set()
+        results = []
+        position = bisect.bisect_left(keys, prefix)
+        while position < len(keys) and keys[position].startswith(prefix):
+            number = numbers[position]
+            if number not in seen:
+                seen.add(number)
+                results.append(self.items[number])
+                if len(results) >= limit:
+                    break
+            position += 1
+        return results
+
+
+def _organization_index():
+    rows = Organization.objects.order_by('name', 'id').values_list('id', 'name').iterator(chunk_size=5000)
+    return PrefixIndex((name, {'id': str(id), 'name': name}) for id, name in rows)
+
+
+def _industry_index():
+    rows = Industry.objects.order_by('path').values_list('nace_code', 'description')
+    return PrefixIndex(
+        (f'{code} {description}', {'code': code, 'description': description, 'label': f'{code} - {description}'})
+        for code, description in rows
+    )
+
+
+# kind -> (index builder, version getter)
+AUTOCOMPLETE_KINDS = {
+    'org': (_organization_index, get_data_version),
+    'industry': (_industry_index, get_industry_version),
+}
+
+_indexes = {}
+_indexes_lock = threading.Lock()
+
+
+def get_index(kind):
+    """The current index for ``kind``, rebuilt if the data changed since it was built."""
+    build, get_version = AUTOCOMPLETE_KINDS[kind]
+    version = get_version()
+    with _indexes_lock:
+        built = _indexes.get(kind)
+        if built is None or built[0] != version:
+            built = (version, build())
+            _indexes[kind] = built
+        return built[1]
+
+
+def suggest(kind, prefix, limit=AUTOCOMPLETE_LIMIT):
+    return get_index(kind).search(prefix, limit)
@@ -0,0 +1,163 @@
+"""
+Versioned response caching for the organization API.
+
+Every write to an organization or one of its related tables bumps a
+global data version (see ``signals``). Cache keys include the version
+that was current when the response was computed, so a write makes every
+earlier entry unreachable at once. Versions are rows of ``DataVersion``,
+so a write made by any process is seen by all of them on their next
+read; reading one is a single primary-key lookup. Cached entries also
+expire after a timeout, which bounds how long anything missed by the
+versioning (a write outside Django, say) can be served.
+"""
+import hashlib
+import json
+import threading
+import time
+from collections import OrderedDict
+
+from django.conf import settings
+from django.core.cache import caches
+from django.db import transaction
+from django.db.models import F
+
+from .models import DataVersion
+
+DATA_VERSION_KEY = 'organizations:data_version'
+INDUSTRY_VERSION_KEY = 'organizations:industry_version'
+DEFAULT_RESPONSE_CACHE = {'BACKEND': 'lru', 'MAX_ENTRIES': 1024, 'TIMEOUT': 300}
+
+
+def get_version(key):
+    version = DataVersion.objects.filter(key=key).values_list('version', flat=True).first()
+    if version is None:
+        version = _reset_version(key)
+    return version
+
+
+def _reset_version(key):
+    # Start from the clock, not 1, so a recreated counter never reuses an old version
+    row, _ = DataVersion.objects.get_or_create(key=key, defaults={'version': time.time_ns()})
+    return row.version
+
+
+def bump_version(key):
+    """
+    Move the ``key`` version on once the current transaction commits.
+    Bumping earlier would let a concurrent reader cache data from before
+    the commit under the new version.
+    """
+    transaction.on_commit(lambda: _increment_version(key))
+
+
+def _increment_version(key):
+    if not DataVersion.objects.filter(key=key).update(version=F('version') + 1):
+        _reset_version(key)
+
+
+def get_data_version():
+    return get_version(DATA_VERSION_KEY)
+
+
+def bump_data_version():
+    """Invalidate every cached response once the current transaction commits."""
+    bump_version(DATA_VERSION_KEY)
+
+
+def get_industry_version():
+    return get_version(INDUSTRY_VERSION_KEY)
+
+
+def bump_industry_version():
+    """Invalidate in-process industry structures (see ``industries``)."""
+    bump_version(INDUSTRY_VERSION_KEY)
+
+
+class LRUResponseCache:
+    """In-process cache holding at most ``max_entries`` responses for ``timeout`` seconds each."""
+
+    def __init__(self, max_entries=1024, timeout=300):
+        self.max_entries = max_entries
+        self.timeout = timeout
+        self.entries = OrderedDict()
+        self.lock = threading.Lock()
+
+    def get(self, key):
+        with self.lock:
+            entry = self.entries.get(key)
+            if entry is None:
+                return None
+            expires, value = entry
+            if expires < time.monotonic():
+                del self.entries[key]
+                return None
+            self.entries.move_to_end(key)
+            return value
+
+    def set(self, key, value):
+        with self.lock:
+            self.entries[key] = (time.monotonic() + self.timeout, value)
+            self.entries.move_to_end(key)
+            while len(self.entries) > self.max_entries:
+                self.entries.popitem(last=False)
+
+    def clear(self):
+        with self.lock:
+            self.entries.clear()
+
+
+class DjangoResponseCache:
+    """Responses stored in one of the ``CACHES`` aliases, shared across processes."""
+
+    def __init__(self, alias='default', timeout=300):
+        self.alias = alias
+        self.timeout = timeout
+
+    def get(self, key):
+        return caches[self.alias].get(key)
+
+    def set(self, key, value):
+        caches[self.alias].set(key, value, self.timeout)
+
+    def clear(self):
+        caches[self.alias].clear()
+
+
+_response_cache = None
+_response_cache_lock = threading.Lock()
+
+
+def get_response_cache():
+    """The backend configured by ``settings.ORGANIZATION_RESPONSE_CACHE``."""
+    global _response_cache
+    with _response_cache_lock:
+        if _response_cache is None:
+            options = getattr(settings, 'ORGANIZATION_RESPONSE_CACHE', DEFAULT_RESPONSE_CACHE)
+            backend = options.get('BACKEND', 'lru')
+            if backend == 'lru':
+                _response_cache = LRUResponseCache(options.get('MAX_ENTRIES', 1024), options.get('TIMEOUT', 300))
+            elif backend == 'django':
+                _response_cache = DjangoResponseCache(options.get('ALIAS', 'default'), options.get('TIMEOUT', 300))
+            else:
+                raise ValueError(f"Unknown ORGANIZATION_RESPONSE_CACHE backend: {backend}")
+        return _response_cache
+
+
+def response_cache_key(name, request, params, extra_params=()):
+    """
+    Key for one endpoint response: the data version, the endpoint ``name``,
+    the normalized filter ``params`` and the raw values of ``extra_params``
+    (pagination and the like). Nothing request-specific such as the host
+    is part of the key, so cached data must not hold absolute links; the
+    filter endpoint keeps its next cursor and rebuilds the link per request.
+    """
+    payload = json.dumps(
+        [
+            name,
+            params,
+            {param: request.query_params.getlist(param) for param in extra_params},
+        ],
+        sort_keys=True,
+    )
+    digest = hashlib.sha1(payload.encode('utf-8')).hexdigest()
+    return f'organizations:{get_data_version()}:{name}:{digest}'
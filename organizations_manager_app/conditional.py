@@ -0,0 +1,68 @@
+"""
+Conditional GET support (``ETag`` / ``Last-Modified``) for the API.
+
+Validators come from two aggregates over the queryset a response is
+built from, ``max(updated)`` and the row count, so they cost one indexed
+query and are checked before anything is serialized. Edits move the
+maximum, including edits of the side tables nested in organizations,
+which touch the organizations using them (see ``signals``), and
+deletions change the count. The ETag also covers the request
+path and query string, since pages and parameter combinations over the
+same rows are different representations.
+"""
+import hashlib
+
+from django.core.exceptions import ValidationError
+from django.db.models import Count, Max
+from django.utils.cache import get_conditional_response
+from django.utils.http import http_date, quote_etag
+
+
+class Validators:
+    def __init__(self, etag, last_modified):
+        self.etag = etag
+        self.last_modified = last_modified
+
+    @classmethod
+    def for_queryset(cls, request, queryset, updated_field='updated'):
+        stats = queryset.order_by().aggregate(last=Max(updated_field), total=Count('pk'))
+        return cls.from_stats(request, stats['last'], stats['total'])
+
+    @classmethod
+    def from_stats(cls, request, last, total):
+        payload = f"{request.get_full_path()}|{last.isoformat() if last else ''}|{total}"
+        etag = quote_etag(hashlib.sha1(payload.encode('utf-8')).hexdigest())
+        # HTTP dates have whole-second resolution
+        last_modified = int(last.timestamp()) if last else None
+        return cls(etag, last_modified)
+
+    def not_modified(self, request):
+        """The 304 response for a matching conditional request, else None."""
+        return get_conditional_response(request, etag=self.etag, last_modified=self.last_modified)
+
+    def apply(self, response):
+        response['ETag'] = self.etag
+        if self.last_modified is not None:
+            response['Last-Modified'] = http_date(self.last_modified)
+        return response
+
+
+class ConditionalGetMixin:
+    """
+    Adds validators and 304 handling to ``list`` and ``retrieve``. The
+    model needs an ``updated`` timestamp that changes on every write.
+    """
+
+    def list(self, request, *args, **kwargs):
+        validators = Validators.for_queryset(request, self.filter_queryset(self.get_queryset()))
+        return validators.not_modified(request) or validators.apply(super().list(request, *args, **kwargs))
+
+    def retrieve(self, request, *args, **kwargs):
+        lookup_url_kwarg = self.lookup_url_kwarg or self.lookup_field
+        try:
+            queryset = self.get_queryset().filter(**{self.lookup_field: kwargs[lookup_url_kwarg]})
+            validators = Validators.for_queryset(request, queryset)
+        except (TypeError, ValueError, ValidationError):
+            # Malformed lookup: let retrieve() answer with its usual 404
+            return super().retrieve(request, *args, **kwargs)
+        return validators.not_modified(request) or validators.apply(super().retrieve(request, *args, **kwargs))
@@ -0,0 +1,211 @@
+"""
+Duplicate detection for imported organizations.
+
+Every organization is reduced to a normalized name, website domain and
+contact email. Instead of comparing each incoming record with the whole
+directory, records are grouped into blocks that share an exact key (the
+compact name, its sorted words, a vowel-less skeleton of it, the domain
+or the email) and fuzzy name scoring only runs inside those blocks. A
+lookup therefore touches a handful of candidates whatever the directory
+size, and the index is plain dicts built in one pass.
+
+Like ``jsonstream`` this module is plain Python so that ``csvconvert``
+can use it without configuring Django.
+"""
+import re
+import unicodedata
+import uuid
+from collections import namedtuple
+from difflib import SequenceMatcher
+
+_WORD = re.compile(r'[a-z0-9]+')
+# Host of a URL with or without a scheme: skip scheme, slashes and user info
+_HOST = re.compile(r'^(?:[a-z][a-z0-9+.\-]*:)?/*(?:[^/?#@]*@)?([^/?#:]*)')
+_VOWELS = re.compile(r'[aeiouy]')
+_REPEATS = re.compile(r'(.)\1+')
+
+# Legal forms and filler words that do not tell two organizations apart
+NAME_STOP_WORDS = frozenset("""
+    the a an and of inc incorporated llc ltd limited corp corporation co company gmbh ag sa sas sarl bv nv plc
+    pty eg ev
+""".split())
+
+# Hosts shared by unrelated organizations; a link there says nothing about identity
+SHARED_DOMAINS = frozenset("""
+    facebook.com fb.com twitter.com x.com instagram.com linkedin.com youtube.com github.com gitlab.com
+    medium.com substack.com linktr.ee google.com sites.google.com docs.google.com wordpress.com
+    blogspot.com wixsite.com notion.site
+""".split())
+
+NAME_THRESHOLD = 0.9  # name blocks: names this similar are the same organization
+DOMAIN_NAME_THRESHOLD = 0.5  # shared domain: names only need to be roughly alike
+MAX_BLOCK_SIZE = 50  # larger blocks come from keys too common to be evidence
+
+Match = namedtuple('Match', 'id name score reason')
+
+
+def normalize_name(name):
+    """Lowercase, accent-free words of ``name`` without legal forms."""
+    text = (name or '').lower()
+    if not text.isascii():
+        decomposed = unicodedata.normalize('NFKD', text)
+        text = ''.join(char for char in decomposed if not unicodedata.combining(char))
+    words = _WORD.findall(text)
+    kept = [word for word in words if word not in NAME_STOP_WORDS]
+    return ' '.join(kept or words)
+
+
+def normalize_domain(url):
+    """Registered host of a website URL without ``www.``, '' for shared or missing hosts."""
+    host = _HOST.match((url or '').strip().lower()).group(1).rstrip('.').removeprefix('www.')
+    parts = host.split('.')
+    if len(parts) < 2 or any('.'.join(parts[start:]) in SHARED_DOMAINS for start in range(len(parts) - 1)):
+        return ''
+    return host
+
+
+def normalize_email(email):
+    """Lowercase address without a ``+tag``, '' when it is not an address."""
+    email = (email or '').strip().lower()
+    local, at, domain = email.partition('@')
+    if not at or not local or '.' not in domain:
+        return ''
+    return f"{local.split('+', 1)[0]}@{domain}"
+
+
+def block_keys(name, domain, email):
+    """Blocking keys of one normalized organization."""
+    keys = []
+    if name:
+        words = name.split()
+        compact = ''.join(words)
+        keys.append(('name', compact))
+        keys.append(('words', ' '.join(sorted(words))))
+        skeleton = _REPEATS.sub(r'\1', compact[0] + _VOWELS.sub('', compact[1:]))
+        if len(skeleton) >= 3:
+            keys.append(('skeleton', skeleton))
+    if domain:
+        keys.append(('domain', domain))
+    if email:
+        keys.append(('email', email))
+    return keys
+
+
+def name_similarity(first, second):
+    """0..1 similarity of two normalized names, insensitive to word order."""
+    if not first or not second:
+        return 0.0
+    if first == second:
+        return 1.0
+    direct = SequenceMatcher(None, first, second).ratio()
+    reordered = SequenceMatcher(None, ' '.join(sorted(first.split())), ' '.join(sorted(second.split()))).ratio()
+    return max(direct, reordered)
+
+
+def entry_from_seed(record):
+    """``(id, name, website, email)`` of a record in the seed layout."""
+    return (
+        record.get('id'),
+        record.get('name') or '',
+        (record.get('links_social_media') or {}).get('website') or '',
+        (record.get('contact_information') or {}).get('email') or '',
+    )
+
+
+class DedupIndex:
+    """
+    Blocked index of known organizations. ``entries`` are
+    ``(id, name, website, email)`` tuples; more can be added later, e.g.
+    the new records of an import so that it is deduplicated against
+    itself too.
+    """
+
+    def __init__(self, entries=()):
+        self.names = []
+        self.ids = []
+        self.known_ids = set()
+        self.blocks = {}
+        for entry in entries:
+            self.add(*entry)
+
+    def __len__(self):
+        return len(self.ids)
+
+    def __contains__(self, id):
+        return str(id) in self.known_ids
+
+    def add(self, id, name, website='', email=''):
+        number = len(self.ids)
+        normalized = normalize_name(name)
+        self.ids.append(id)
+        self.known_ids.add(str(id))
+        self.names.append((name, normalized))
+        for key in block_keys(normalized, normalize_domain(website), normalize_email(email)):
+            block = self.blocks.setdefault(key, [])
+            if len(block) <= MAX_BLOCK_SIZE:
+                block.append(number)
+
+    def best_match(self, name, website='', email=''):
+        """The most likely existing organization for these details, or None."""
+        normalized = normalize_name(name)
+        best = None
+        scores = {}
+        for kind, key in block_keys(normalized, normalize_domain(website), normalize_email(email)):
+            block = self.blocks.get((kind, key), ())
+            if len(block) > MAX_BLOCK_SIZE:
+                continue
+            for number in block:
+                if number not in scores:
+                    scores[number] = name_similarity(normalized, self.names[number][1])
+                similarity = scores[number]
+                if kind == 'email':
+                    score, reason = max(similarity, 0.9), 'email'
+                elif kind == 'domain':
+                    if similarity < DOMAIN_NAME_THRESHOLD:
+                        continue
+                    score, reason = (1 + similarity) / 2, 'domain'
+                else:
+                    if similarity < NAME_THRESHOLD:
+                        continue
+                    score, reason = similarity, 'name'
+                if best is None or score > best.score:
+                    best = Match(self.ids[number], self.names[number][0], round(score, 4), reason)
+        return best
+
+
+def deduplicate(records, index, report=None, assign_ids=True):
+    """
+    Generator stage over seed-layout records. Records whose id is already
+    in ``index`` are passed through untouched: the id says which
+    organization they are, whatever other organization their name
+    resembles. Any other record matching a known organization takes over
+    its id when ``assign_ids`` is set, so the import updates that
+    organization instead of creating a copy; each match is appended to
+    ``report`` (a list) as a merge report row. Records without a match
+    are added to ``index``, and given an id if they have none, so later
+    copies in the same import can share it.
+    """
+    for record in records:
+        incoming_id, name, website, email = entry_from_seed(record)
+        if incoming_id and incoming_id in index:
+            yield record
+            continue
+        match = index.best_match(name, website, email)
+        if match is None:
+            if not incoming_id:
+                incoming_id = str(uuid.uuid4())
+                record = {**record, 'id': incoming_id}
+            index.add(incoming_id, name, website, email)
+        else:
+            if report is not None:
+                report.append({
+                    'id': incoming_id,
+                    'name': name,
+                    'matched_id': str(match.id),
+                    'matched_name': match.name,
+                    'score': match.score,
+                    'reason': match.reason,
+                })
+            if assign_ids:
+                record = {**record, 'id': str(match.id)}
+        yield record
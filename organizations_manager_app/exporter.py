@@ -0,0 +1,159 @@
+"""
+Streaming export of organizations as NDJSON or CSV.
+
+Records use the seed file layout read by ``record_from_seed``, so an
+NDJSON export can be fed straight back to ``manage.py seeddata``. Rows
+come from a server-side cursor with the side tables joined in, and are
+encoded and (optionally) gzipped one chunk at a time, so memory stays
+flat and the first bytes are sent before the query has finished.
+"""
+import csv
+import io
+import json
+import zlib
+
+from .jsonstream import chunked
+from .models import Organization
+
+EXPORT_CHUNK_SIZE = 2000
+
+# Seed record key -> organization column, for the top-level values
+ORGANIZATION_COLUMNS = {
+    'id': 'id',
+    'name': 'name',
+    'description': 'description',
+    'type': 'type',
+    'legal_structure': 'legal_structure',
+    'year_founded': 'year_founded',
+    'geo_scope': 'geo_scope',
+    'size': 'size',
+    'members': 'members',
+    'governance_model': 'governance',
+    'certifications_affiliations': 'certifications',
+    'tags': 'tags',
+    'industry': 'industry__nace_code',
+}
+
+# Seed record key -> (side table relation, {nested key: column})
+NESTED_COLUMNS = {
+    'location': ('location', {
+        'address': 'address', 'city': 'city', 'state_region': 'state_region', 'country': 'country',
+        'zip_postal_code': 'zip_postal_code', 'latitude': 'latitude', 'longitude': 'longitude',
+    }),
+    'funding': ('funding', {'sources': 'sources', 'revenue': 'revenue'}),
+    'token': ('token', {
+        'name': 'name', 'token_symbol': 'symbol', 'blockchain_platform': 'blockchain',
+        'governance_mechanism': 'governance', 'link_to_token_contract': 'contract',
+    }),
+    'links_social_media': ('social', {
+        'website': 'website', 'twitter': 'twitter', 'linkedin': 'linkedin',
+        'discord': 'discord', 'github': 'github', 'other': 'other',
+    }),
+    'contact_information': ('contact', {'contact_person': 'person', 'email': 'email', 'phone': 'phone'}),
+}
+
+CSV_HEADER = [
+    *ORGANIZATION_COLUMNS,
+    'ownership_structure',
+    *(f'{key}.{nested}' for key, (_, columns) in NESTED_COLUMNS.items() for nested in columns),
+]
+
+
+def export_records(queryset, chunk_size=EXPORT_CHUNK_SIZE):
+    """
+    Yield one seed-format dict per organization in ``queryset``, reading
+    ``chunk_size`` rows at a time. Ownership structure names are fetched
+    with one query per chunk.
+    """
+    columns = list(ORGANIZATION_COLUMNS.values()) + [
+        f'{relation}__{column}' for relation, nested in NESTED_COLUMNS.values() for column in nested.values()
+    ]
+    rows = queryset.select_related(None).prefetch_related(None).values(*columns).iterator(chunk_size=chunk_size)
+    Through = Organization.ownership_structures.through
+
+    for chunk in chunked(rows, chunk_size):
+        ownership = {}
+        pairs = Through.objects.filter(
+            organization_id__in=[row['id'] for row in chunk]
+        ).order_by('ownershipstructure__name').values_list('organization_id', 'ownershipstructure__name')
+        for organization_id, name in pairs:
+            ownership.setdefault(organization_id, []).append(name)
+
+        for row in chunk:
+            record = {key: row[column] for key, column in ORGANIZATION_COLUMNS.items()}
+            record['id'] = str(row['id'])
+            record['industry'] = record['industry'] or ''
+            record['ownership_structure'] = ownership.get(row['id'], [])
+            for key, (relation, nested) in NESTED_COLUMNS.items():
+                values = {name: row[f'{relation}__{column}'] for name, column in nested.items()}
+                # A missing side table comes back as all None
+                record[key] = values if any(value is not None for value in values.values()) else {}
+            yield record
+
+
+def ndjson_chunks(records):
+    """Encode records as NDJSON, one string per record."""
+    for record in records:
+        yield json.dumps(record, ensure_ascii=False) + '\n'
+
+
+def csv_chunks(records):
+    """
+    Encode records as CSV with ``CSV_HEADER`` columns. Lists are joined
+    with ``; `` and nested objects become ``key.field`` columns.
+    """
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+
+    def flush():
+        value = buffer.getvalue()
+        buffer.seek(0)
+        buffer.truncate()
+        return value
+
+    writer.writerow(CSV_HEADER)
+    yield flush()
+    for record in records:
+        flat = dict(record)
+        for key in NESTED_COLUMNS:
+            for nested, value in (flat.pop(key) or {}).items():
+                flat[f'{key}.{nested}'] = value
+        writer.writerow([_csv_value(flat.get(column)) for column in CSV_HEADER])
+        yield flush()
+
+
+def _csv_value(value):
+    if value is None:
+        return ''
+    if isinstance(value, list):
+        return '; '.join(str(item) for item in value)
+    return value
+
+
+def encode_stream(chunks, compress=False, buffer_size=1 << 16):
+    """
+    Turn text chunks into UTF-8 bytes, gzipped on the fly when
+    ``compress`` is set. Chunks are coalesced up to ``buffer_size``,
+    except the first one, which is sent at once so the client sees the
+    response start immediately.
+    """
+    compressor = zlib.compressobj(wbits=31) if compress else None  # 31: gzip container
+    pending, size, first = [], 0, True
+    for chunk in chunks:
+        data = chunk.encode('utf-8')
+        pending.append(data)
+        size += len(data)
+        if first or size >= buffer_size:
+            block = b''.join(pending)
+            if compressor:
+                block = compressor.compress(block)
+                if first:
+                    block += compressor.flush(zlib.Z_SYNC_FLUSH)
+            pending, size, first = [], 0, False
+            if block:
+                yield block
+    block = b''.join(pending)
+    if compressor:
+        block = compressor.compress(block) + compressor.flush()
+    if block:
+        yield block
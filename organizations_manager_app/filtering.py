@@ -0,0 +1,236 @@
+from django.db.models import Count, Q
+from django.utils import timezone
+from django.utils.dateparse import parse_date, parse_datetime
+import datetime
+import logging
+from .models import Organization, Industry, OwnershipStructure
+from .nace import nace_path
+from .spatial import bbox_around, distance_km, parse_bbox, parse_point, within_bboxes
+
+logger = logging.getLogger(__name__)
+
+# Facet -> (value column, label column) of the grouped count
+FACETS = {
+    'type': ('type', None),
+    'industry': ('industry__nace_code', 'industry__description'),
+    'geo_scope': ('geo_scope', None),
+    'governance': ('governance', None),
+}
+
+DEFAULT_RADIUS_KM = 50.0
+MAX_RADIUS_KM = 20000.0
+
+
+def normalize_params(query_params):
+    """
+    Validate and normalize the filter query parameters. This does not
+    touch the database, so the result can key a response cache.
+    """
+    return {
+        'q': query_params.get('q', '').strip(),
+        'name': query_params.get('name', '').strip(),
+        'type': query_params.get('type', '').strip().lower(),
+        'ownership': query_params.getlist('ownership', []),
+        'industry': query_params.get('industry', '').split(' - ')[0].strip().upper(),
+        'geo_scope': query_params.get('geoScope', '').strip().lower(),
+        'governance': query_params.get('governance', '').strip().lower(),
+        'tag': [tag.strip() for tag in query_params.getlist('tag', []) if tag.strip()],
+        'tag_match': query_params.get('tag_match', 'any').strip().lower(),
+        'certification': [c.strip() for c in query_params.getlist('certification', []) if c.strip()],
+        'certification_match': query_params.get('certification_match', 'any').strip().lower(),
+        'bbox': query_params.get('bbox', '').strip(),
+        'near': query_params.get('near', '').strip(),
+        'radius_km': query_params.get('radius_km', '').strip(),
+    }
+
+
+def parse_timestamp(value):
+    """
+    Parse an ISO 8601 datetime (or date) into an aware datetime; naive
+    values are taken to be in the server time zone. Raises ValueError.
+    """
+    value = value.strip()
+    parsed = parse_datetime(value)
+    if parsed is None:
+        day = parse_date(value)
+        if day is None:
+            raise ValueError(value)
+        parsed = datetime.datetime.combine(day, datetime.time.min)
+    if timezone.is_naive(parsed):
+        parsed = timezone.make_aware(parsed)
+    return parsed
+
+
+class OrganizationFilter:
+    """
+    Parses the organization filter query parameters once and turns them
+    into one Q condition per filter.
+
+    Keeping the conditions separate lets callers reuse the exact filter
+    semantics of ``OrganizationViewSet.filter`` elsewhere, and drop
+    individual filters (e.g. a facet excluding its own selection).
+    Problems with a parameter are collected in ``errors`` and the filter
+    is skipped, matching the warnings the filter action has always
+    returned.
+    """
+
+    def __init__(self, query_params):
+        self.params = normalize_params(query_params)
+        self.errors = []
+        self.near = None
+        self.radius = None
+        self.conditions = self._build_conditions()
+
+    def _build_conditions(self):
+        params = self.params
+        errors = self.errors
+        conditions = {}
+
+        # Name filter (partial match)
+        if params['name']:
+            conditions['name'] = Q(name__icontains=params['name'])
+
+        # Type filter (exact match)
+        if params['type']:
+            conditions['type'] = Q(type__iexact=params['type'])
+
+        # Ownership filter (multi-select)
+        if params['ownership']:
+            try:
+                valid_ids = list(OwnershipStructure.objects.filter(
+                    name__in=params['ownership']
+                ).values_list('id', flat=True))
+
+                if valid_ids:
+                    # Semi-join on the through table so no DISTINCT is needed
+                    memberships = Organization.ownership_structures.through.objects.filter(
+                        ownershipstructure_id__in=valid_ids
+                    ).values('organization_id')
+                    conditions['ownership'] = Q(id__in=memberships)
+                else:
+                    errors.append(f"No matching ownership structures found for: {params['ownership']}")
+            except Exception as e:
+                logger.error(f"Ownership filter error: {str(e)}")
+                errors.append("Invalid ownership structure filter")
+
+        # Industry filter (NACE code and every code below it in the hierarchy)
+        if params['industry']:
+            path = nace_path(params['industry'])
+            if Industry.objects.filter(path__startswith=path).exists():
+                # A prefix match on the materialized path is one index range scan
+                conditions['industry'] = Q(industry__path__startswith=path)
+            else:
+                errors.append(f"Invalid industry code: {params['industry']}")
+
+        # Geo Scope filter (exact match)
+        if params['geo_scope']:
+            conditions['geo_scope'] = Q(geo_scope__iexact=params['geo_scope'])
+
+        # Governance filter (exact match)
+        if params['governance']:
+            conditions['governance'] = Q(governance__iexact=params['governance'])
+
+        # Tag and certification filters (JSON containment, GIN-indexed)
+        for field in ('tag', 'certification'):
+            if not params[field]:
+                continue
+            lookup = 'tags__contains' if field == 'tag' else 'certifications__contains'
+            if params[f'{field}_match'] == 'all':
+                conditions[field] = Q(**{lookup: params[field]})
+            else:
+                if params[f'{field}_match'] != 'any':
+                    errors.append(f"Invalid {field}_match '{params[f'{field}_match']}', using 'any'")
+                any_of = Q()
+                for value in params[field]:
+                    any_of |= Q(**{lookup: [value]})
+                conditions[field] = any_of
+
+        # Bounding box filter (min_lon,min_lat,max_lon,max_lat)
+        if params['bbox']:
+            try:
+                conditions['bbox'] = within_bboxes(parse_bbox(params['bbox']))
+            except ValueError:
+                errors.append(f"Invalid bbox '{params['bbox']}', expected min_lon,min_lat,max_lon,max_lat")
+
+        # Radius filter around a point (lat,lon), closest first
+        if params['near']:
+            try:
+                near = parse_point(params['near'])
+                radius = float(params['radius_km'] or DEFAULT_RADIUS_KM)
+                if not 0 < radius <= MAX_RADIUS_KM:
+                    raise ValueError(radius)
+            except ValueError:
+                errors.append(f"Invalid near/radius_km '{params['near']}'/'{params['radius_km']}'")
+            else:
+                self.near, self.radius = near, radius
+                conditions['near'] = within_bboxes(bbox_around(*near, radius))
+
+        return conditions
+
+    def get_query(self, exclude=()):
+        """AND of every active condition except those named in ``exclude``."""
+        query = Q()
+        for name, condition in self.conditions.items():
+            if name not in exclude:
+                query &= condition
+        return query
+
+    def apply(self, queryset, exclude=()):
+        """
+        Filter ``queryset`` and return it with the keyset ordering to page
+        it by, or None for the default ordering. Radius queries are ordered
+        by distance, full-text queries by rank.
+        """
+        queryset = queryset.filter(self.get_query(exclude))
+        ordering = None
+
+        if self.near and 'near' not in exclude:
+            queryset = queryset.annotate(distance_km=distance_km(*self.near)).filter(distance_km__lte=self.radius)
+            ordering = ('distance_km', 'id')
+
+        # Full-text search, ranked by relevance unless ordered by distance
+        if self.params['q'] and 'q' not in exclude:
+            queryset = queryset.search(self.params['q'])
+            if ordering is None and 'rank' in queryset.query.annotations:
+                ordering = ('-rank', '-id')
+
+        return queryset, ordering
+
+    def facet_counts(self, labels=None):
+        """
+        Number of matching organizations per value of every facet, each
+        facet ignoring its own filter so the counts show what selecting
+        another value would give. One grouped query per facet; ownership
+        is counted on the M2M through table. ``labels`` maps a facet to a
+        ``{value: label}`` dict for facets without a label column.
+        """
+        labels = labels or {}
+        facets = {}
+        for facet, (column, label_column) in FACETS.items():
+            organizations, _ = self.apply(Organization.objects.all(), exclude=(facet,))
+            columns = [column] + ([label_column] if label_column else [])
+            rows = (
+                organizations.exclude(**{f'{column}__isnull': True}).exclude(**{column: ''})
+                .values(*columns).annotate(count=Count('id')).order_by('-count', column)
+            )
+            facets[facet] = [
+                {
+                    'value': row[column],
+                    'label': row[label_column] if label_column else labels.get(facet, {}).get(row[column], row[column]),
+                    'count': row['count'],
+                }
+                for row in rows
+            ]
+
+        organizations, _ = self.apply(Organization.objects.all(), exclude=('ownership',))
+        rows = (
+            Organization.ownership_structures.through.objects
+            .filter(organization_id__in=organizations.values('id'))
+            .values('ownershipstructure__name').annotate(count=Count('organization_id'))
+            .order_by('-count', 'ownershipstructure__name')
+        )
+        facets['ownership'] = [
+            {'value': row['ownershipstructure__name'], 'label': row['ownershipstructure__name'], 'count': row['count']}
+            for row in rows
+        ]
+        return facets
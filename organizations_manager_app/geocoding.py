@@ -0,0 +1,318 @@
+"""
+Reverse geocoding for the conversion pipeline.
+
+A :class:`Geocoder` answers ``(lat, lon) -> (city, country)`` from, in
+order, an in-memory memo, a persistent on-disk cache and finally a
+pluggable backend. Backend calls for a batch of coordinates run on a
+bounded thread pool behind a requests-per-second limiter, so throughput
+is no longer one HTTP round trip at a time while still honouring the
+provider's rate limits. :class:`GazetteerBackend` resolves coordinates
+offline from a local city file. Like ``jsonstream`` this module does not
+need Django.
+"""
+import logging
+import math
+import sqlite3
+import threading
+import time
+from array import array
+from concurrent.futures import ThreadPoolExecutor
+
+import requests
+
+logger = logging.getLogger(__name__)
+
+EMPTY_PLACE = ('', '')
+EARTH_RADIUS_KM = 6371.0
+
+
+def parse_coordinate(value):
+    """Return ``value`` as a float, or None for blanks and placeholders."""
+    if isinstance(value, (int, float)):
+        return float(value)
+    try:
+        return float(str(value).strip())
+    except ValueError:
+        return None
+
+
+class GeocodeCache:
+    """
+    SQLite-backed cache keyed by coordinates rounded to ``precision``
+    decimal places (4 places is roughly 10 m).
+    """
+
+    def __init__(self, path, precision=4):
+        self.precision = precision
+        self.connection = sqlite3.connect(path, check_same_thread=False)
+        self.lock = threading.Lock()
+        with self.lock, self.connection:
+            self.connection.execute(
+                'CREATE TABLE IF NOT EXISTS places ('
+                'lat REAL NOT NULL, lon REAL NOT NULL, city TEXT NOT NULL, country TEXT NOT NULL, '
+                'PRIMARY KEY (lat, lon))'
+            )
+
+    def key(self, lat, lon):
+        return round(lat, self.precision), round(lon, self.precision)
+
+    def get(self, lat, lon):
+        with self.lock:
+            row = self.connection.execute(
+                'SELECT city, country FROM places WHERE lat = ? AND lon = ?', self.key(lat, lon)
+            ).fetchone()
+        return tuple(row) if row else None
+
+    def put_many(self, places):
+        """Store ``{(lat, lon): (city, country)}``."""
+        rows = [(*self.key(lat, lon), city, country) for (lat, lon), (city, country) in places.items()]
+        with self.lock, self.connection:
+            self.connection.executemany('INSERT OR REPLACE INTO places VALUES (?, ?, ?, ?)', rows)
+
+    def close(self):
+        self.connection.close()
+
+
+class RateLimiter:
+    """Spaces calls at least ``1 / rate`` seconds apart across threads."""
+
+    def __init__(self, rate):
+        self.interval = 1.0 / rate if rate else 0.0
+        self.lock = threading.Lock()
+        self.next_slot = 0.0
+
+    def wait(self):
+        if not self.interval:
+            return
+        with self.lock:
+            now = time.monotonic()
+            slot = max(now, self.next_slot)
+            self.next_slot = slot + self.interval
+        if slot > now:
+            time.sleep(slot - now)
+
+
+class NominatimBackend:
+    """Reverse lookups against a Nominatim-compatible HTTP endpoint."""
+
+    def __init__(self, base_url='https://nominatim.openstreetmap.org', timeout=10,
+                 user_agent='OrganizationsDirectory/1.0'):
+        self.url = base_url.rstrip('/') + '/reverse'
+        self.timeout = timeout
+        self.user_agent = user_agent
+        self.local = threading.local()
+
+    def session(self):
+        # requests.Session is not thread-safe; keep one per worker thread
+        if not hasattr(self.local, 'session'):
+            self.local.session = requests.Session()
+            self.local.session.headers['User-Agent'] = self.user_agent
+        return self.local.session
+
+    def reverse(self, lat, lon):
+        response = self.session().get(
+            self.url, params={'format': 'json', 'lat': lat, 'lon': lon}, timeout=self.timeout,
+        )
+        response.raise_for_status()
+        address = response.json().get('address', {})
+        city = address.get('city') or address.get('town') or address.get('village') or ''
+        return city, address.get('country', '')
+
+
+class Geocoder:
+    """
+    Cached, concurrent reverse geocoder.
+
+    ``backend`` is any object with ``reverse(lat, lon)``; if it also has
+    ``reverse_many(coords)`` the whole batch of cache misses is handed to
+    it in one call instead of going through the thread pool. With
+    ``offline=True`` only the cache is consulted.
+    """
+
+    def __init__(self, backend=None, cache=None, max_workers=4, rate=1.0, offline=False, memo_size=100_000):
+        self.backend = backend
+        self.cache = cache
+        self.max_workers = max_workers
+        self.limiter = RateLimiter(rate)
+        self.offline = offline or backend is None
+        self.memo = {}
+        self.memo_size = memo_size
+
+    def _key(self, lat, lon):
+        return self.cache.key(lat, lon) if self.cache else (lat, lon)
+
+    def reverse(self, lat, lon):
+        """Resolve one coordinate pair; ``('', '')`` when it cannot be resolved."""
+        return self.reverse_many([(lat, lon)])[0]
+
+    def reverse_many(self, coords):
+        """Resolve a list of ``(lat, lon)`` pairs, returning places in order."""
+        if len(self.memo) > self.memo_size:
+            self.memo.clear()
+        missing = {}
+        for lat, lon in coords:
+            key = self._key(lat, lon)
+            if key in self.memo or key in missing:
+                continue
+            cached = self.cache.get(lat, lon) if self.cache else None
+            if cached is not None:
+                self.memo[key] = cached
+            else:
+                missing[key] = (lat, lon)
+
+        if missing and not self.offline:
+            resolved = self._lookup(list(missing.values()))
+            found = {}
+            for key, place in zip(missing, resolved):
+                if place is None:
+                    # Failures are remembered for this run only and retried next time
+                    self.memo[key] = EMPTY_PLACE
+                else:
+                    self.memo[key] = found[missing[key]] = place
+            if self.cache and found:
+                self.cache.put_many(found)
+        for key in missing:
+            self.memo.setdefault(key, EMPTY_PLACE)
+
+        return [self.memo[self._key(lat, lon)] for lat, lon in coords]
+
+    def _lookup(self, coords):
+        if hasattr(self.backend, 'reverse_many'):
+            return self.backend.reverse_many(coords)
+        with ThreadPoolExecutor(max_workers=self.max_workers) as executor:
+            return list(executor.map(self._lookup_one, coords))
+
+    def _lookup_one(self, coord):
+        lat, lon = coord
+        self.limiter.wait()
+        try:
+            return self.backend.reverse(lat, lon)
+        except Exception as e:
+            logger.warning('Reverse geocoding failed for (%s, %s): %s', lat, lon, e)
+            return None
+
+
+def _unit_vector(lat, lon):
+    lat, lon = math.radians(lat), math.radians(lon)
+    cos_lat = math.cos(lat)
+    return cos_lat * math.cos(lon), cos_lat * math.sin(lon), math.sin(lat)
+
+
+class KDTree:
+    """
+    Nearest-neighbour index over points on the sphere.
+
+    Points are stored as 3-d unit vectors, which avoids any special casing
+    at the antimeridian and the poles: the closest chord is also the
+    closest great-circle distance. The tree is implicit; after building,
+    the coordinate arrays are permuted so that the median of every range
+    ``[lo, hi)`` is its node, which keeps the whole index in three flat
+    ``array('d')`` buffers plus one ``array('l')`` of original indexes.
+    """
+
+    def __init__(self, latitudes, longitudes):
+        vectors = [_unit_vector(lat, lon) for lat, lon in zip(latitudes, longitudes)]
+        order = list(range(len(vectors)))
+        stack = [(0, len(order), 0)]
+        while stack:
+            lo, hi, axis = stack.pop()
+            if hi - lo <= 1:
+                continue
+            order[lo:hi] = sorted(order[lo:hi], key=lambda i: vectors[i][axis])
+            mid = (lo + hi) // 2
+            next_axis = (axis + 1) % 3
+            stack.append((lo, mid, next_axis))
+            stack.append((mid + 1, hi, next_axis))
+
+        self.index = array('l', order)
+        self.axes = tuple(array('d', (vectors[i][axis] for i in order)) for axis in range(3))
+
+    def __len__(self):
+        return len(self.index)
+
+    def nearest(self, lat, lon):
+        """Return ``(original_index, chord_distance_squared)`` of the closest point."""
+        query = _unit_vector(lat, lon)
+        xs, ys, zs = self.axes
+        best, best_distance = -1, math.inf
+        stack = [(0, len(self.index), 0, 0.0)]
+        while stack:
+            lo, hi, axis, plane_distance = stack.pop()
+            if lo >= hi or plane_distance >= best_distance:
+                continue
+            mid = (lo + hi) // 2
+            dx, dy, dz = xs[mid] - query[0], ys[mid] - query[1], zs[mid] - query[2]
+            distance = dx * dx + dy * dy + dz * dz
+            if distance < best_distance:
+                best, best_distance = mid, distance
+            diff = query[axis] - self.axes[axis][mid]
+            next_axis = (axis + 1) % 3
+            near, far = ((lo, mid), (mid + 1, hi)) if diff < 0 else ((mid + 1, hi), (lo, mid))
+            stack.append((*far, next_axis, diff * diff))
+            stack.append((*near, next_axis, 0.0))
+        if best < 0:
+            return None, math.inf
+        return self.index[best], best_distance
+
+
+def load_country_names(path):
+    """Read ISO code -> name from a GeoNames ``countryInfo.txt`` file."""
+    names = {}
+    with open(path, 'r', encoding='utf-8') as f:
+        for line in f:
+            if line.startswith('#') or not line.strip():
+                continue
+            columns = line.rstrip('\n').split('\t')
+            if len(columns) > 4:
+                names[columns[0]] = columns[4]
+    return names
+
+
+class GazetteerBackend:
+    """
+    Offline backend answering from a local GeoNames-style city file.
+
+    The file is tab separated with the GeoNames column layout (name in
+    column 1, latitude 4, longitude 5, country code 8), e.g.
+    ``cities15000.txt``. Country codes are turned into names when a
+    ``countryInfo.txt`` is given. Lookups are a k-d tree descent, so
+    resolving every coordinate in an import takes milliseconds and never
+    touches the network.
+    """
+
+    def __init__(self, path, country_info=None, max_distance_km=None):
+        names, countries, latitudes, longitudes = [], [], array('d'), array('d')
+        with open(path, 'r', encoding='utf-8') as f:
+            for line in f:
+                columns = line.rstrip('\n').split('\t')
+                if len(columns) < 9:
+                    continue
+                try:
+                    lat, lon = float(columns[4]), float(columns[5])
+                except ValueError:
+                    continue
+                names.append(columns[1])
+                countries.append(columns[8])
+                latitudes.append(lat)
+                longitudes.append(lon)
+
+        self.names = names
+        self.countries = countries
+        self.country_names = load_country_names(country_info) if country_info else {}
+        self.tree = KDTree(latitudes, longitudes)
+        # Compare squared chord lengths rather than converting every result
+        self.max_chord_squared = math.inf
+        if max_distance_km is not None:
+            chord = 2 * math.sin(min(max_distance_km / EARTH_RADIUS_KM, math.pi) / 2)
+            self.max_chord_squared = chord * chord
+
+    def reverse(self, lat, lon):
+        index, chord_squared = self.tree.nearest(lat, lon)
+        if index is None or chord_squared > self.max_chord_squared:
+            return EMPTY_PLACE
+        code = self.countries[index]
+        return self.names[index], self.country_names.get(code, code)
+
+    def reverse_many(self, coords):
+        """Resolve a whole batch in one pass over the in-memory tree."""
+        return [self.reverse(lat, lon) for lat, lon in coords]
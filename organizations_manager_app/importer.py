@@ -0,0 +1,429 @@
+import uuid
+from collections import Counter, defaultdict
+
+from django.db.models import Q
+from django.utils import timezone
+
+from .caching import bump_data_version, bump_industry_version
+from .models import (
+    Organization,
+    Industry,
+    OwnershipStructure,
+    Location,
+    FundingInformation,
+    TokenInformation,
+    SocialLinks,
+    ContactInformation,
+    GeoCluster,
+    OrganizationSignature,
+    OrganizationStats,
+    OrganizationTombstone,
+    TagUsage,
+    location_geohash,
+    stats_keys,
+    usage_names,
+)
+from .dedup import DedupIndex
+from .nace import nace_path
+from .spatial import CLUSTER_PRECISIONS
+
+# Organization columns rewritten when an existing id is imported again
+UPSERT_FIELDS = [
+    'name', 'description', 'type', 'industry', 'legal_structure', 'year_founded',
+    'location', 'geo_scope', 'size', 'members', 'funding', 'token', 'governance',
+    'social', 'contact', 'certifications', 'tags', 'updated',
+]
+
+# One-to-one side tables: organization FK attribute -> (model, columns)
+RELATED_TABLES = {
+    'location': (Location, [
+        'address', 'city', 'state_region', 'country', 'zip_postal_code', 'latitude', 'longitude', 'geohash',
+    ]),
+    'funding': (FundingInformation, ['sources', 'revenue']),
+    'token': (TokenInformation, ['name', 'symbol', 'blockchain', 'governance', 'contract']),
+    'social': (SocialLinks, ['website', 'discord', 'github']),
+    'contact': (ContactInformation, ['person', 'email', 'phone']),
+}
+
+
+def record_from_seed(entry):
+    """
+    Map one seed entry (the format written by ``csvconvert``) to plain
+    column dicts for the organization and each of its side tables.
+    """
+    location = entry.get('location') or {}
+    funding = entry.get('funding') or {}
+    token = entry.get('token') or {}
+    social = entry.get('links_social_media') or {}
+    contact = entry.get('contact_information') or {}
+    return {
+        'organization': {
+            'id': uuid.UUID(str(entry.get('id') or uuid.uuid4())),
+            'name': entry.get('name', 'Unnamed Organization'),
+            'description': entry.get('description', ''),
+            'type': entry.get('type', 'other'),
+            'legal_structure': entry.get('legal_structure', 'other'),
+            'year_founded': entry.get('year_founded', None),
+            'geo_scope': entry.get('geo_scope', 'global'),
+            'size': entry.get('size', 'unknown'),
+            'members': entry.get('members', None),
+            'governance': entry.get('governance_model', 'other'),
+            'certifications': entry.get('certifications_affiliations', []),
+            'tags': entry.get('tags', []),
+        },
+        'industry': entry.get('industry') or '',
+        'ownership_structures': list(entry.get('ownership_structure') or []),
+        'location': {
+            'address': location.get('address', ''),
+            'city': location.get('city', ''),
+            'state_region': location.get('state_region', ''),
+            'country': location.get('country', ''),
+            'zip_postal_code': location.get('zip_postal_code', ''),
+            'latitude': location.get('latitude'),
+            'longitude': location.get('longitude'),
+            # bulk writes skip Location.save(), so derive the geohash here
+            'geohash': location_geohash(location.get('latitude'), location.get('longitude')),
+        },
+        'funding': {
+            'sources': funding.get('sources', []),
+            'revenue': funding.get('revenue', ''),
+        },
+        'token': {
+            'name': token.get('name', ''),
+            'symbol': token.get('token_symbol', ''),
+            'blockchain': token.get('blockchain_platform', ''),
+            'governance': token.get('governance_mechanism', ''),
+            'contract': token.get('link_to_token_contract', ''),
+        },
+        'social': {
+            'website': social.get('website', ''),
+            'discord': social.get('discord', ''),
+            'github': social.get('github', ''),
+        },
+        'contact': {
+            'person': contact.get('contact_person', ''),
+            'email': contact.get('email', ''),
+            'phone': contact.get('phone', ''),
+        },
+    }
+
+
+def rebuild_aggregates():
+    """
+    Recompute the tables that signals and :class:`SummaryDeltas` keep
+    current, e.g. to repair them after rows were changed by hand.
+    """
+    TagUsage.objects.rebuild()
+    GeoCluster.objects.rebuild()
+    OrganizationStats.objects.rebuild()
+
+
+def refresh_derived(ids):
+    """
+    Bulk writes skip the post_save signals that maintain the tsvector and
+    similarity signatures, clear tombstones of re-imported ids and
+    invalidate cached responses; do their work for the written ``ids``.
+    """
+    Organization.objects.filter(id__in=ids).update_search_vector()
+    OrganizationSignature.objects.refresh(ids)
+    OrganizationTombstone.objects.filter(organization_id__in=ids).delete()
+    bump_data_version()
+
+
+def touch_sharing(row_ids, ids):
+    """
+    Move the ``updated`` timestamp of organizations outside ``ids`` that
+    share a side-table row edited in place, ``{attr: [row id]}``. Bulk
+    updates skip the signals that do this for single saves.
+    """
+    shared = Q()
+    for attr, values in row_ids.items():
+        if values:
+            shared |= Q(**{f'{attr}__in': values})
+    if shared:
+        Organization.objects.filter(shared).exclude(id__in=ids).update(updated=timezone.now())
+
+
+class SummaryDeltas:
+    """
+    Batched changes to the tables that signals keep current (tag usage,
+    map clusters, statistics) for writes that bypass the signals. Take a
+    snapshot of the affected organizations before and after writing; the
+    difference is applied with one upsert per table.
+    """
+    FIELDS = (
+        'tags', 'certifications', 'type', 'size', 'legal_structure', 'geo_scope', 'year_founded',
+        'location__geohash', 'location__latitude', 'location__longitude', 'location__country',
+    )
+
+    def __init__(self):
+        self.tags = defaultdict(Counter)
+        self.clusters = defaultdict(Counter)
+        self.stats = defaultdict(Counter)
+
+    def snapshot(self, organizations, sign):
+        """Count the current state of ``organizations`` in (+1) or out (-1)."""
+        for row in organizations.values(*self.FIELDS):
+            for name in usage_names(row['tags']):
+                self.tags[(TagUsage.TAG, name)]['count'] += sign
+            for name in usage_names(row['certifications']):
+                self.tags[(TagUsage.CERTIFICATION, name)]['count'] += sign
+            for key in stats_keys(dict(row, country=row['location__country'])):
+                self.stats[key]['count'] += sign
+            geohash, latitude, longitude = (
+                row['location__geohash'], row['location__latitude'], row['location__longitude']
+            )
+            if geohash and latitude is not None and longitude is not None:
+                for precision in CLUSTER_PRECISIONS:
+                    cluster = self.clusters[(precision, geohash[:precision], row['type'])]
+                    cluster['count'] += sign
+                    cluster['lat_sum'] += latitude * sign
+                    cluster['lon_sum'] += longitude * sign
+
+    def apply(self):
+        TagUsage.objects.increment(self.tags)
+        GeoCluster.objects.increment(self.clusters)
+        OrganizationStats.objects.increment(self.stats)
+
+
+def directory_index(chunk_size=5000):
+    """A :class:`DedupIndex` of every stored organization, read in one pass."""
+    rows = Organization.objects.order_by().values_list(
+        'id', 'name', 'social__website', 'contact__email'
+    ).iterator(chunk_size=chunk_size)
+    return DedupIndex((str(id), name, website or '', email or '') for id, name, website, email in rows)
+
+
+class OrganizationImporter:
+    """
+    Writes organization records in batches with a fixed number of queries
+    per batch, whatever the batch size. The summary tables are updated
+    with each batch, so call :meth:`write_batch` inside a transaction.
+
+    Records are upserted by id: side-table rows already attached to an
+    existing organization are updated in place, so importing the same file
+    twice leaves the database unchanged instead of failing on duplicate ids.
+    """
+
+    def __init__(self, nace_mapping=None):
+        self.nace_mapping = nace_mapping or {}
+        self.industries = dict(Industry.objects.values_list('nace_code', 'id'))
+        self.ownership_structures = dict(OwnershipStructure.objects.values_list('name', 'id'))
+        self.created = 0
+        self.updated = 0
+
+    def write_batch(self, records):
+        """Upsert a list of records produced by :func:`record_from_seed`."""
+        # Later duplicates of an id win, as they would with one-by-one saves
+        records = list({record['organization']['id']: record for record in records}.values())
+        if not records:
+            return 0
+
+        self._ensure_lookups(records)
+        ids = [record['organization']['id'] for record in records]
+        existing = {
+            row['id']: row
+            for row in Organization.objects.filter(id__in=ids).values('id', *RELATED_TABLES)
+        }
+
+        # Organizations sharing a location that is edited in place move with it
+        shared_locations = [row['location'] for row in existing.values() if row['location']]
+        affected = Q(id__in=ids) | Q(location__in=shared_locations)
+        deltas = SummaryDeltas()
+        deltas.snapshot(Organization.objects.filter(affected), -1)
+
+        related_ids = {attr: self._write_related(attr, records, existing) for attr in RELATED_TABLES}
+        touch_sharing(
+            {attr: [row[attr] for row in existing.values() if row[attr]] for attr in RELATED_TABLES}, ids
+        )
+
+        organizations = []
+        for index, record in enumerate(records):
+            fields = record['organization']
+            organizations.append(Organization(
+                industry_id=self.industries.get(record['industry']),
+                **{f'{attr}_id': related_ids[attr][index] for attr in RELATED_TABLES},
+                **fields,
+            ))
+        Organization.objects.bulk_create(
+            organizations,
+            update_conflicts=True,
+            unique_fields=['id'],
+            update_fields=UPSERT_FIELDS,
+        )
+
+        Through = Organization.ownership_structures.through
+        Through.objects.filter(organization_id__in=ids).delete()
+        Through.objects.bulk_create(
+            [
+                Through(organization_id=record['organization']['id'], ownershipstructure_id=self.ownership_structures[name])
+                for record in records
+                for name in dict.fromkeys(record['ownership_structures'])
+            ],
+            ignore_conflicts=True,
+        )
+
+        deltas.snapshot(Organization.objects.filter(affected), 1)
+        deltas.apply()
+        refresh_derived(ids)
+
+        self.updated += len(existing)
+        self.created += len(records) - len(existing)
+        return len(records)
+
+    def ensure_industries(self, codes):
+        """Create any of the NACE ``codes`` not seen yet, in bulk."""
+        missing_codes = set(codes) - self.industries.keys()
+        if not missing_codes:
+            return
+        Industry.objects.bulk_create(
+            [
+                # bulk_create skips Industry.save(), so the path is set here
+                Industry(
+                    nace_code=code,
+                    description=self.nace_mapping.get(code, f"Unknown industry ({code})"),
+                    path=nace_path(code),
+                )
+                for code in missing_codes
+            ],
+            ignore_conflicts=True,
+        )
+        self.industries.update(
+            Industry.objects.filter(nace_code__in=missing_codes).values_list('nace_code', 'id')
+        )
+        bump_industry_version()
+        bump_data_version()
+
+    def _ensure_lookups(self, records):
+        """Create any industry or ownership structure not seen yet, in bulk."""
+        self.ensure_industries(r['industry'] for r in records if r['industry'])
+
+        missing_names = {
+            name for r in records for name in r['ownership_structures']
+        } - self.ownership_structures.keys()
+        if missing_names:
+            OwnershipStructure.objects.bulk_create(
+                [OwnershipStructure(name=name) for name in missing_names],
+                ignore_conflicts=True,
+            )
+            self.ownership_structures.update(
+                OwnershipStructure.objects.filter(name__in=missing_names).values_list('name', 'id')
+            )
+
+    def _write_related(self, attr, records, existing):
+        """
+        Insert or update one side table for the whole batch and return the
+        row id to use for each record, in record order.
+        """
+        model, columns = RELATED_TABLES[attr]
+        to_create, to_update, row_ids = [], [], []
+        for record in records:
+            current = existing.get(record['organization']['id'], {}).get(attr)
+            obj = model(id=current, **record[attr])
+            (to_update if current else to_create).append(obj)
+            row_ids.append(obj)
+
+        if to_create:
+            model.objects.bulk_create(to_create)
+        if to_update:
+            model.objects.bulk_update(to_update, columns)
+        return [obj.id for obj in row_ids]
+
+
+class OrganizationBulkWriter:
+    """
+    Writes a batch of validated API items (``OrganizationBulkSerializer``
+    data) in bulk: one query per side table and operation, one per
+    organization insert or update, one M2M replace and a few to keep the
+    derived tables current, whatever the batch size. Only the fields an
+    item carries are written, so the same code serves inserts, upserts
+    and partial updates. Call inside a transaction.
+    """
+
+    def write(self, items):
+        """Write ``items`` and return ``[(id, created)]`` in item order."""
+        ids = [item.get('id') or uuid.uuid4() for item in items]
+        existing = (
+            Organization.objects.select_for_update(of=('self',))
+            .select_related(*RELATED_TABLES).in_bulk(ids)
+        )
+        # Organizations sharing a location that is edited in place move with it
+        shared_locations = [org.location_id for org in existing.values() if org.location_id]
+        affected = Q(id__in=ids) | Q(location__in=shared_locations)
+        deltas = SummaryDeltas()
+        deltas.snapshot(Organization.objects.filter(affected), -1)
+
+        organizations, fields = [], set()
+        to_create = defaultdict(list)
+        to_update = defaultdict(dict)
+        update_columns = defaultdict(set)
+        attach = []
+        for organization_id, item in zip(ids, items):
+            organization = existing.get(organization_id) or Organization(id=organization_id)
+            for name, value in item.items():
+                if name in ('id', 'ownership_structures'):
+                    continue
+                if name == 'industry':
+                    organization.industry_id = value
+                elif name in RELATED_TABLES:
+                    related = getattr(organization, name) if getattr(organization, f'{name}_id') else None
+                    if value is None:
+                        setattr(organization, name, None)
+                    elif related is not None:
+                        for column, column_value in value.items():
+                            setattr(related, column, column_value)
+                        to_update[name][related.pk] = related
+                        update_columns[name].update(value)
+                    else:
+                        related = RELATED_TABLES[name][0](**value)
+                        to_create[name].append(related)
+                        attach.append((organization, name, related))
+                else:
+                    setattr(organization, name, value)
+                fields.add(name)
+            organizations.append(organization)
+
+        # bulk writes skip Location.save(), so derive the geohash here
+        for location in [*to_create['location'], *to_update['location'].values()]:
+            location.geohash = location_geohash(location.latitude, location.longitude)
+        if to_update['location']:
+            update_columns['location'].add('geohash')
+        for name, (model, _) in RELATED_TABLES.items():
+            if to_create[name]:
+                model.objects.bulk_create(to_create[name])
+            if to_update[name]:
+                model.objects.bulk_update(list(to_update[name].values()), sorted(update_columns[name]))
+        touch_sharing({name: list(rows) for name, rows in to_update.items()}, ids)
+        for organization, name, related in attach:
+            setattr(organization, name, related)
+
+        created = [org for org in organizations if org.pk not in existing]
+        updated = [org for org in organizations if org.pk in existing]
+        if created:
+            Organization.objects.bulk_create(created)
+        if updated:
+            now = timezone.now()  # bulk_update does not apply auto_now
+            for organization in updated:
+                organization.updated = now
+            Organization.objects.bulk_update(updated, sorted(fields | {'updated'}))
+
+        memberships = {
+            organization_id: item['ownership_structures']
+            for organization_id, item in zip(ids, items) if 'ownership_structures' in item
+        }
+        if memberships:
+            Through = Organization.ownership_structures.through
+            Through.objects.filter(organization_id__in=memberships).delete()
+            Through.objects.bulk_create(
+                [
+                    Through(organization_id=organization_id, ownershipstructure_id=structure_id)
+                    for organization_id, structure_ids in memberships.items()
+                    for structure_id in dict.fromkeys(structure_ids)
+                ],
+                ignore_conflicts=True,
+            )
+
+        deltas.snapshot(Organization.objects.filter(affected), 1)
+        deltas.apply()
+        refresh_derived(ids)
+        return [(organization_id, organization_id not in existing) for organization_id in ids]
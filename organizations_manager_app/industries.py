@@ -0,0 +1,50 @@
+"""
+In-process NACE industry tree.
+
+The tree is built from one query the first time it is asked for and then
+served from memory. Every write to ``Industry`` bumps the industry
+version (see ``signals`` and the importer); a process notices the new
+version on its next read and rebuilds, so the tree is never stale for
+longer than the writing transaction.
+"""
+import threading
+
+from .caching import get_industry_version
+from .models import Industry
+
+_tree = None
+_tree_version = None
+_tree_lock = threading.Lock()
+
+
+def build_tree(rows):
+    """
+    Nest ``(nace_code, description, path)`` rows into
+    ``{'code', 'description', 'children'}`` nodes, ordered by code. A
+    code whose parent does not exist hangs from its nearest ancestor
+    that does, or becomes a root.
+    """
+    nodes = {}
+    roots = []
+    for code, description, path in sorted(rows, key=lambda row: (row[2].count('/'), row[2])):
+        node = {'code': code, 'description': description, 'children': []}
+        nodes[path] = node
+        ancestors = path.split('/')[:-2]
+        parent = None
+        while ancestors and parent is None:
+            parent = nodes.get('/'.join(ancestors) + '/')
+            ancestors.pop()
+        (parent['children'] if parent else roots).append(node)
+    return roots
+
+
+def industry_tree():
+    """The whole industry hierarchy, rebuilt only after ``Industry`` changes."""
+    global _tree, _tree_version
+    version = get_industry_version()
+    with _tree_lock:
+        if _tree is None or _tree_version != version:
+            rows = Industry.objects.order_by('path').values_list('nace_code', 'description', 'path')
+            _tree = build_tree(rows)
+            _tree_version = version
+        return _tree
@@ -0,0 +1,124 @@
+"""
+Incremental JSON readers and writers used by the import/export pipeline.
+
+Nothing here holds more than one record (plus one read buffer) in memory,
+so the same code handles a seed file of 300 or 3 million organizations.
+This module has no Django dependency and is shared with ``csvconvert``.
+"""
+import json
+import re
+from itertools import islice
+
+_WHITESPACE = re.compile(r'\s*')
+
+
+def iter_json_records(fp, chunk_size=1 << 16):
+    """
+    Yield records from a text stream one at a time.
+
+    Accepts a single JSON array of records, newline-delimited JSON, or any
+    other sequence of whitespace-separated top-level JSON values.
+    """
+    decoder = json.JSONDecoder()
+    buffer = ''
+    eof = False
+
+    def fill():
+        nonlocal buffer, eof
+        chunk = fp.read(chunk_size)
+        if chunk:
+            buffer += chunk
+        else:
+            eof = True
+
+    def skip_whitespace(pos):
+        # Returns the position of the next significant character, reading
+        # more input as needed; pos == len(buffer) only at end of input.
+        nonlocal buffer
+        while True:
+            pos = _WHITESPACE.match(buffer, pos).end()
+            if pos < len(buffer) or eof:
+                return pos
+            buffer, pos = buffer[pos:], 0
+            fill()
+
+    def decode(pos):
+        nonlocal buffer
+        while True:
+            try:
+                value, end = decoder.raw_decode(buffer, pos)
+            except json.JSONDecodeError:
+                if eof:
+                    raise
+            else:
+                # A value ending exactly at the buffer edge may be a
+                # truncated number or literal; only trust it at end of input
+                if end < len(buffer) or eof:
+                    return value, end
+            buffer, pos = buffer[pos:], 0
+            fill()
+
+    pos = skip_whitespace(0)
+    if buffer[pos:pos + 1] == '[':
+        pos = skip_whitespace(pos + 1)
+        if buffer[pos:pos + 1] == ']':
+            return
+        while True:
+            value, pos = decode(pos)
+            yield value
+            pos = skip_whitespace(pos)
+            separator = buffer[pos:pos + 1]
+            if separator == ']':
+                return
+            if separator != ',':
+                raise json.JSONDecodeError("Expecting ',' delimiter", buffer, pos)
+            pos = skip_whitespace(pos + 1)
+            buffer, pos = buffer[pos:], 0
+    else:
+        while pos < len(buffer):
+            value, pos = decode(pos)
+            yield value
+            pos = skip_whitespace(pos)
+            buffer, pos = buffer[pos:], 0
+
+
+def read_records(path):
+    """Yield every record stored in the JSON or NDJSON file at ``path``."""
+    with open(path, 'r', encoding='utf-8') as fp:
+        yield from iter_json_records(fp)
+
+
+def write_ndjson(records, fp):
+    """Write one compact JSON document per line; returns the record count."""
+    count = 0
+    for record in records:
+        fp.write(json.dumps(record))
+        fp.write('\n')
+        count += 1
+    return count
+
+
+def write_json_array(records, fp, indent=4):
+    """Write records as a JSON array without building the list in memory."""
+    count = 0
+    fp.write('[')
+    for record in records:
+        fp.write(',\n' if count else '\n')
+        fp.write(json.dumps(record, indent=indent))
+        count += 1
+    fp.write('\n]\n' if count else ']\n')
+    return count
+
+
+def is_ndjson_path(path):
+    return str(path).lower().endswith(('.ndjson', '.jsonl'))
+
+
+def chunked(iterable, size):
+    """Yield lists of at most ``size`` items."""
+    iterator = iter(iterable)
+    while True:
+        chunk = list(islice(iterator, size))
+        if not chunk:
+            return
+        yield chunk
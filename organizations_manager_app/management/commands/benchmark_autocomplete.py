@@ -0,0 +1,87 @@
+import random
+import re
+import time
+from django.core.management.base import BaseCommand
+from django.db.models import TextField, Value
+from django.db.models.functions import Concat
+from organizations_manager_app.autocomplete import AUTOCOMPLETE_KINDS, AUTOCOMPLETE_LIMIT, normalize
+from organizations_manager_app.models import Industry, Organization
+
+
+def word_start_pattern(prefix):
+    """Case-insensitive regex for ``prefix`` at the start of any whitespace-separated word."""
+    return r'(^|\s)' + re.escape(prefix)
+
+
+class Command(BaseCommand):
+    help = (
+        'Compare autocomplete lookups from the in-memory prefix index with database queries '
+        'matching the same word starts'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--lookups', type=int, default=200,
+            help='Number of random prefixes looked up per kind (default: 200)',
+        )
+        parser.add_argument(
+            '--limit', type=int, default=AUTOCOMPLETE_LIMIT,
+            help=f'Suggestions returned per lookup (default: {AUTOCOMPLETE_LIMIT})',
+        )
+        parser.add_argument('--seed', type=int, default=0, help='Random seed for the prefixes (default: 0)')
+
+    def handle(self, *args, **options):
+        lookups = max(1, options['lookups'])
+        limit = max(1, options['limit'])
+        rng = random.Random(options['seed'])
+
+        # The index matches word starts of the name, or of "code description"
+        # for industries; these querysets select exactly the same rows
+        def database_org(prefix):
+            return Organization.objects.filter(name__iregex=word_start_pattern(prefix))
+
+        def database_industry(prefix):
+            return Industry.objects.annotate(
+                label=Concat('nace_code', Value(' '), 'description', output_field=TextField()),
+            ).filter(label__iregex=word_start_pattern(prefix))
+
+        for kind, texts, database, ordering, key, item_key in (
+            ('org', Organization.objects.values_list('name', flat=True), database_org, 'name', 'id', 'id'),
+            ('industry', Industry.objects.values_list('nace_code', flat=True), database_industry, 'path', 'nace_code', 'code'),
+        ):
+            texts = [normalize(text) for text in texts if text.strip()]
+            if not texts:
+                self.stdout.write(self.style.WARNING(f'{kind}: nothing to look up'))
+                continue
+            prefixes = [text[:rng.randint(1, min(4, len(text)))].strip() for text in rng.choices(texts, k=lookups)]
+
+            build_index, _ = AUTOCOMPLETE_KINDS[kind]
+            started = time.perf_counter()
+            index = build_index()
+            build = time.perf_counter() - started
+            self.stdout.write(f'{kind}: index of {len(index)} items with {len(index.keys)} keys built in {build * 1000:.1f} ms')
+
+            # Only time prefixes for which both sides find the same rows. The
+            # database has no accent folding, so accented names can differ
+            agreeing = [
+                prefix for prefix in prefixes
+                if {str(item[item_key]) for item in index.search(prefix, len(index))}
+                == {str(value) for value in database(prefix).values_list(key, flat=True)}
+            ]
+            self.stdout.write(f'  {len(agreeing)} of {len(prefixes)} prefixes match the same rows in both')
+            if not agreeing:
+                self.stdout.write(self.style.WARNING(f'{kind}: no comparable prefixes'))
+                continue
+
+            timings = {}
+            for label, lookup in (
+                ('index', lambda prefix: index.search(prefix, limit)),
+                ('database', lambda prefix: list(database(prefix).order_by(ordering).values(key)[:limit])),
+            ):
+                started = time.perf_counter()
+                for prefix in agreeing:
+                    lookup(prefix)
+                timings[label] = (time.perf_counter() - started) / len(agreeing)
+                self.stdout.write(f'  {label}: {timings[label] * 1e6:.1f} us per lookup')
+            if timings['index']:
+                self.stdout.write(self.style.SUCCESS(f"  Speed-up: {timings['database'] / timings['index']:.0f}x"))
@@ -0,0 +1,59 @@
+import time
+from django.core.management.base import BaseCommand
+from rest_framework.renderers import JSONRenderer
+from rest_framework.request import Request
+from rest_framework.test import APIRequestFactory
+from organizations_manager_app.models import Organization
+from organizations_manager_app.renderers import FastJSONRenderer, orjson
+from organizations_manager_app.serializers import OrganizationRowSerializer, OrganizationSerializer
+
+
+class Command(BaseCommand):
+    help = 'Compare organization serialization throughput of the model serializer and the row fast path'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--rows', type=int, default=1000,
+            help='Number of organizations serialized per run (default: 1000)',
+        )
+        parser.add_argument(
+            '--repeat', type=int, default=5,
+            help='Runs per variant; the best one is reported (default: 5)',
+        )
+
+    def handle(self, *args, **options):
+        limit = max(1, options['rows'])
+        repeat = max(1, options['repeat'])
+        context = {'request': Request(APIRequestFactory().get('/api/organizations/'))}
+        queryset = (
+            Organization.objects.select_related('industry').prefetch_related('ownership_structures')
+            .order_by('-created', '-id')
+        )
+
+        def model_serializer():
+            organizations = list(queryset[:limit])
+            data = OrganizationSerializer(organizations, many=True, context=context).data
+            return len(organizations), JSONRenderer().render(data)
+
+        def row_serializer():
+            rows = list(OrganizationRowSerializer.values(queryset, context)[:limit])
+            data = OrganizationRowSerializer(rows, context=context).data
+            return len(rows), FastJSONRenderer().render(data)
+
+        self.stdout.write(f"JSON encoder for the fast path: {'orjson' if orjson else 'json (stdlib)'}")
+        results = {}
+        for label, run in (('model serializer + JSONRenderer', model_serializer),
+                           ('row serializer + FastJSONRenderer', row_serializer)):
+            best = None
+            for _ in range(repeat):
+                started = time.perf_counter()
+                count, body = run()
+                elapsed = time.perf_counter() - started
+                best = elapsed if best is None else min(best, elapsed)
+            rate = count / best if best else float(count)
+            results[label] = rate
+            self.stdout.write(f"{label}: {count} rows, {len(body)} bytes in {best * 1000:.1f} ms, {rate:.0f} rows/s")
+
+        before, after = results.values()
+        if before:
+            self.stdout.write(self.style.SUCCESS(f'Speed-up: {after / before:.1f}x'))
@@ -0,0 +1,22 @@
+import time
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from organizations_manager_app.models import OrganizationSignature
+
+
+class Command(BaseCommand):
+    help = 'Recompute the similarity signatures (MinHash and LSH band keys) of every organization'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--batch-size', type=int, default=1000,
+            help='Number of organizations recomputed per batch (default: 1000)',
+        )
+
+    def handle(self, *args, **options):
+        batch_size = max(1, options['batch_size'])
+        started = time.perf_counter()
+        with transaction.atomic():
+            total = OrganizationSignature.objects.rebuild(batch_size)
+        elapsed = time.perf_counter() - started
+        self.stdout.write(self.style.SUCCESS(f'Rebuilt {total} signatures in {elapsed:.2f}s'))
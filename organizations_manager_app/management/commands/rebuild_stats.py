@@ -0,0 +1,41 @@
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
+from organizations_manager_app.models import OrganizationStats
+
+
+class Command(BaseCommand):
+    help = 'Recompute the organization statistics from scratch and verify the incrementally maintained counts'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--check', action='store_true',
+            help='Only compare the counts; exit with an error if they differ',
+        )
+
+    def handle(self, *args, **options):
+        with transaction.atomic():
+            current = OrganizationStats.objects.current()
+            expected = OrganizationStats.objects.compute()
+            mismatches = {
+                key: (current.get(key, 0), expected.get(key, 0))
+                for key in current.keys() | expected.keys()
+                if current.get(key, 0) != expected.get(key, 0)
+            }
+
+            for (dimension, value), (found, count) in sorted(mismatches.items()):
+                self.stdout.write(self.style.WARNING(
+                    f"{dimension}={value or '(unknown)'}: maintained {found}, recomputed {count}"
+                ))
+
+            if options['check']:
+                if mismatches:
+                    raise CommandError(f'{len(mismatches)} statistics rows are out of date')
+                self.stdout.write(self.style.SUCCESS(f'All {len(expected)} statistics rows are up to date'))
+                return
+
+            OrganizationStats.objects.rebuild()
+
+        if mismatches:
+            self.stdout.write(self.style.SUCCESS(f'Rebuilt statistics, fixed {len(mismatches)} rows'))
+        else:
+            self.stdout.write(self.style.SUCCESS(f'Rebuilt statistics, all {len(expected)} rows were up to date'))
@@ -1,21 +1,38 @@
-import json
-import uuid
+import contextlib
+import time
 from django.core.management.base import BaseCommand
-from django.utils import timezone
-from organizations_manager_app.models import (
-    Organization, 
-    Industry, 
-    OwnershipStructure, 
-    Location, 
-    FundingInformation, 
-    TokenInformation, 
-    SocialLinks, 
-    ContactInformation
-)
+from django.db import transaction
+from organizations_manager_app.dedup import deduplicate
+from organizations_manager_app.importer import OrganizationImporter, directory_index, record_from_seed
+from organizations_manager_app.jsonstream import chunked, read_records, write_ndjson
 
 
 class Command(BaseCommand):
     help = 'Seed the database with initial organization data'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            'path', nargs='?', default='django_seed_data.json',
+            help='JSON array or NDJSON file to import (default: django_seed_data.json)',
+        )
+        parser.add_argument(
+            '--batch-size', type=int, default=500,
+            help='Number of organizations written per batch (default: 500)',
+        )
+        parser.add_argument(
+            '--dry-run', action='store_true',
+            help='Run the whole import, then roll it back',
+        )
+        parser.add_argument(
+            '--dedup', action='store_true',
+            help='Give records that match an existing organization (or an earlier record) its id, '
+                 'so they update it instead of creating a duplicate',
+        )
+        parser.add_argument(
+            '--merge-report', metavar='PATH',
+            help='Write the duplicates found to PATH as NDJSON (combine with --dry-run to only report)',
+        )
+
     def load_nace_codes(self):
         nace_data = {}
         try:
@@ -28,93 +45,48 @@ class Command(BaseCommand):
         except FileNotFoundError:
             self.stdout.write(self.style.ERROR('NACEcodes.txt file not found!'))
         return nace_data
-    def handle(self, *args, **kwargs):
-        
-        nace_mapping = self.load_nace_codes()
-        # Load seed data
-        with open('django_seed_data.json', 'r', encoding='utf-8') as f:
-            data = json.load(f)
-
-        for entry in data:  # Loop through the list of organizations
-            self.stdout.write(f"Processing: {entry.get('name', 'Unknown Organization')}")
-
-            # Get or create Industry
-            industry_value = entry.get('industry') or ''
-            industry_description = nace_mapping.get(industry_value, f"Unknown industry ({industry_value})")
-        
-            industry, _ = Industry.objects.get_or_create(
-                nace_code=industry_value,
-                defaults={'description': industry_description}
-            )
-
 
-            # Get or create Ownership Structures
-            ownership_structures = []
-            for structure in entry.get('ownership_structure', []):  # Ensure it's a list
-                obj, _ = OwnershipStructure.objects.get_or_create(name=structure)
-                ownership_structures.append(obj)
+    def handle(self, *args, **options):
+        batch_size = max(1, options['batch_size'])
+        dry_run = options['dry_run']
 
-            # Create Location
-            location = Location.objects.create(
-                city=entry.get('location', {}).get('city', ''),
-                country=entry.get('location', {}).get('country', '')
-            )
-
-            # Create Funding Information
-            funding = FundingInformation.objects.create(
-                sources=entry.get('funding', {}).get('sources', []),
-                revenue=entry.get('funding', {}).get('revenue', '')
-            )
-
-            # Create Token Information
-            token = TokenInformation.objects.create(
-                name=entry.get('token', {}).get('name', ''),
-                symbol=entry.get('token', {}).get('token_symbol', ''),
-                blockchain=entry.get('token', {}).get('blockchain_platform', ''),
-                governance=entry.get('token', {}).get('governance_mechanism', ''),
-                contract=entry.get('token', {}).get('link_to_token_contract', '')
-            )
-
-            # Create Social Links
-            social = SocialLinks.objects.create(
-                website=entry.get('links_social_media', {}).get('website', ''),
-                discord=entry.get('links_social_media', {}).get('discord', ''),
-                github=entry.get('links_social_media', {}).get('github', '')
-            )
-
-            # Create Contact Information
-            contact = ContactInformation.objects.create(
-                person=entry.get('contact_information', {}).get('contact_person', ''),
-                email=entry.get('contact_information', {}).get('email', '')
-            )
-
-            # Create Organization
-            organization = Organization.objects.create(
-                id=uuid.UUID(entry.get('id', str(uuid.uuid4()))),  # Ensure a valid UUID
-                name=entry.get('name', 'Unnamed Organization'),
-                description=entry.get('description', ''),
-                type=entry.get('type', 'other'),
-                industry=industry,
-                legal_structure=entry.get('legal_structure', 'other'),
-                year_founded=entry.get('year_founded', None),
-                location=location,
-                geo_scope=entry.get('geo_scope', 'global'),
-                size=entry.get('size', 'unknown'),
-                members=entry.get('members', None),
-                funding=funding,
-                token=token,
-                governance=entry.get('governance_model', 'other'),
-                social=social,
-                contact=contact,
-                certifications=entry.get('certifications_affiliations', []),
-                tags=entry.get('tags', []),
-                created=timezone.now(),
-                updated=timezone.now()
-            )
+        nace_mapping = self.load_nace_codes()
+        # Records are streamed from the file and each batch is committed on
+        # its own, together with its changes to the summary tables, so
+        # memory stays flat however large the input is. A dry run keeps
+        # everything inside one outer transaction instead.
+        entries = read_records(options['path'])
+        report = [] if options['merge_report'] else None
+        if options['dedup'] or report is not None:
+            entries = deduplicate(entries, directory_index(), report, assign_ids=options['dedup'])
+        records = (record_from_seed(entry) for entry in entries)
 
-            # Add many-to-many relationships
-            organization.ownership_structures.add(*ownership_structures)
+        started = time.perf_counter()
+        processed = 0
+        with transaction.atomic() if dry_run else contextlib.nullcontext():
+            importer = OrganizationImporter(nace_mapping)
+            # The whole NACE hierarchy, so the industry tree has no gaps
+            with transaction.atomic():
+                importer.ensure_industries(nace_mapping)
+            for batch in chunked(records, batch_size):
+                with transaction.atomic():
+                    processed += importer.write_batch(batch)
+                self.stdout.write(f"Imported {processed} organizations")
 
-            self.stdout.write(self.style.SUCCESS(f'Successfully added: {organization.name}'))
+            if dry_run:
+                transaction.set_rollback(True)
 
-        self.stdout.write(self.style.SUCCESS('Database seeding completed!'))
+        elapsed = time.perf_counter() - started
+        if report is not None:
+            with open(options['merge_report'], 'w', encoding='utf-8') as fp:
+                write_ndjson(report, fp)
+            self.stdout.write(f"{len(report)} duplicates written to {options['merge_report']}")
+        rate = processed / elapsed if elapsed else float(processed)
+        summary = (
+            f"{processed} organizations ({importer.created} created, {importer.updated} updated) "
+            f"in {elapsed:.2f}s, {rate:.0f} rows/s"
+        )
+        if dry_run:
+            self.stdout.write(self.style.WARNING(f'Dry run, rolled back: {summary}'))
+        else:
+            self.stdout.write(self.style.SUCCESS(f'Database seeding completed: {summary}'))
@@ -0,0 +1,17 @@
+# Generated by Django 5.1.7 on 2026-10-18 16:09
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('organizations_manager_app', '0002_alter_industry_nace_code'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='organization',
+            index=models.Index(fields=['created', 'id'], name='organization_created_id_idx'),
+        ),
+    ]
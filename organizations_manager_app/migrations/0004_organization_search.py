@@ -0,0 +1,44 @@
+# Generated by Django 5.1.7 on 2026-10-18 16:10
+
+import django.contrib.postgres.indexes
+import django.contrib.postgres.search
+import django.db.models.functions.text
+from django.contrib.postgres.operations import TrigramExtension
+from django.contrib.postgres.search import SearchVector
+from django.db import migrations
+from django.db.models import TextField
+from django.db.models.functions import Cast
+
+
+def populate_search_vector(apps, schema_editor):
+    Organization = apps.get_model('organizations_manager_app', 'Organization')
+    Organization.objects.update(search_vector=(
+        SearchVector('name', weight='A', config='english')
+        + SearchVector('description', weight='B', config='english')
+        + SearchVector(Cast('tags', TextField()), weight='C', config='english')
+    ))
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('organizations_manager_app', '0003_organization_created_id_idx'),
+    ]
+
+    operations = [
+        TrigramExtension(),
+        migrations.AddField(
+            model_name='organization',
+            name='search_vector',
+            field=django.contrib.postgres.search.SearchVectorField(editable=False, null=True),
+        ),
+        migrations.RunPython(populate_search_vector, migrations.RunPython.noop),
+        migrations.AddIndex(
+            model_name='organization',
+            index=django.contrib.postgres.indexes.GinIndex(fields=['search_vector'], name='organization_search_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='organization',
+            index=django.contrib.postgres.indexes.GinIndex(django.contrib.postgres.indexes.OpClass(django.db.models.functions.text.Upper('name'), name='gin_trgm_ops'), name='organization_name_trgm_idx'),
+        ),
+    ]
@@ -0,0 +1,56 @@
+# Generated by Django 5.1.7 on 2026-10-18 16:12
+
+import django.contrib.postgres.indexes
+from collections import Counter
+from django.db import migrations, models
+
+
+def populate_tag_usage(apps, schema_editor):
+    Organization = apps.get_model('organizations_manager_app', 'Organization')
+    TagUsage = apps.get_model('organizations_manager_app', 'TagUsage')
+    counts = {'tag': Counter(), 'certification': Counter()}
+    for tags, certifications in Organization.objects.values_list('tags', 'certifications').iterator():
+        for kind, values in (('tag', tags), ('certification', certifications)):
+            if isinstance(values, list):
+                counts[kind].update({v for v in values if isinstance(v, str) and v})
+    TagUsage.objects.bulk_create(
+        TagUsage(kind=kind, name=name, count=count)
+        for kind, counter in counts.items()
+        for name, count in counter.items()
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('organizations_manager_app', '0004_organization_search'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='TagUsage',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('kind', models.CharField(choices=[('tag', 'Tag'), ('certification', 'Certification')], max_length=20)),
+                ('name', models.CharField(max_length=255)),
+                ('count', models.IntegerField(default=0)),
+            ],
+        ),
+        migrations.AddIndex(
+            model_name='organization',
+            index=django.contrib.postgres.indexes.GinIndex(fields=['tags'], name='organization_tags_idx', opclasses=['jsonb_path_ops']),
+        ),
+        migrations.AddIndex(
+            model_name='organization',
+            index=django.contrib.postgres.indexes.GinIndex(fields=['certifications'], name='organization_certs_idx', opclasses=['jsonb_path_ops']),
+        ),
+        migrations.AddIndex(
+            model_name='tagusage',
+            index=models.Index(fields=['kind', '-count'], name='tagusage_kind_count_idx'),
+        ),
+        migrations.AddConstraint(
+            model_name='tagusage',
+            constraint=models.UniqueConstraint(fields=('kind', 'name'), name='tagusage_kind_name_unique'),
+        ),
+        migrations.RunPython(populate_tag_usage, migrations.RunPython.noop),
+    ]
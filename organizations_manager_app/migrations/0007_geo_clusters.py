@@ -0,0 +1,43 @@
+# Generated by Django 5.1.7 on 2026-10-18 16:21
+
+from django.db import migrations, models
+from django.db.models import Count, Sum
+from django.db.models.functions import Substr
+
+
+def populate_geo_clusters(apps, schema_editor):
+    Organization = apps.get_model('organizations_manager_app', 'Organization')
+    GeoCluster = apps.get_model('organizations_manager_app', 'GeoCluster')
+    located = Organization.objects.exclude(location__geohash='').exclude(location__isnull=True)
+    for precision in range(1, 8):
+        rows = located.values('type', cell=Substr('location__geohash', 1, precision)).annotate(
+            count=Count('id'), lat_sum=Sum('location__latitude'), lon_sum=Sum('location__longitude'),
+        ).order_by()
+        GeoCluster.objects.bulk_create(GeoCluster(precision=precision, **row) for row in rows)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('organizations_manager_app', '0006_location_coordinates'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='GeoCluster',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('precision', models.PositiveSmallIntegerField()),
+                ('cell', models.CharField(max_length=12)),
+                ('type', models.CharField(choices=[('cooperative', 'Cooperative'), ('employee_owned', 'Employee-Owned'), ('dao', 'DAO'), ('crypto_web3', 'Crypto/Web3'), ('esop', 'ESOP'), ('platform_coop', 'Platform Cooperative'), ('community_trust', 'Community Trust'), ('hybrid', 'Hybrid'), ('other', 'Other')], max_length=50)),
+                ('count', models.IntegerField(default=0)),
+                ('lat_sum', models.FloatField(default=0)),
+                ('lon_sum', models.FloatField(default=0)),
+            ],
+            options={
+                'indexes': [models.Index(fields=['precision', 'cell'], name='geocluster_precision_cell_idx', opclasses=['int2_ops', 'varchar_pattern_ops'])],
+                'constraints': [models.UniqueConstraint(fields=('precision', 'cell', 'type'), name='geocluster_cell_type_unique')],
+            },
+        ),
+        migrations.RunPython(populate_geo_clusters, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,22 @@
+# Generated by Django 5.1.7 on 2026-10-18 16:24
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('organizations_manager_app', '0007_geo_clusters'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='ownershipstructure',
+            name='updated',
+            field=models.DateTimeField(auto_now=True),
+        ),
+        migrations.AddIndex(
+            model_name='organization',
+            index=models.Index(fields=['updated', 'id'], name='organization_updated_id_idx'),
+        ),
+    ]
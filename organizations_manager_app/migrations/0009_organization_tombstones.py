@@ -0,0 +1,25 @@
+# Generated by Django 5.1.7 on 2026-10-18 16:25
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('organizations_manager_app', '0008_conditional_get'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='OrganizationTombstone',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('organization_id', models.UUIDField(unique=True)),
+                ('deleted', models.DateTimeField()),
+            ],
+        ),
+        migrations.AddIndex(
+            model_name='organizationtombstone',
+            index=models.Index(fields=['deleted', 'organization_id'], name='tombstone_deleted_idx'),
+        ),
+    ]
@@ -0,0 +1,54 @@
+# Generated by Django 5.1.7 on 2026-10-18 16:30
+
+from collections import Counter
+from django.db import migrations, models
+from django.db.models import Count, Value
+from django.db.models.functions import Coalesce
+
+
+def populate_organization_stats(apps, schema_editor):
+    Organization = apps.get_model('organizations_manager_app', 'Organization')
+    OrganizationStats = apps.get_model('organizations_manager_app', 'OrganizationStats')
+    counts = Counter()
+    rows = Organization.objects.values(
+        'type', 'size', 'legal_structure', 'geo_scope', 'year_founded',
+        country=Coalesce('location__country', Value('')),
+    ).annotate(count=Count('id')).order_by()
+    for row in rows:
+        year = row['year_founded']
+        for key in (
+            ('type', row['type'] or ''),
+            ('size', row['size'] or ''),
+            ('legal_structure', row['legal_structure'] or ''),
+            ('geo_scope', row['geo_scope'] or ''),
+            ('country', row['country'].strip()),
+            ('decade', f'{year // 10 * 10}s' if year is not None else ''),
+        ):
+            counts[key] += row['count']
+    OrganizationStats.objects.bulk_create(
+        OrganizationStats(dimension=dimension, value=value, count=count)
+        for (dimension, value), count in counts.items()
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('organizations_manager_app', '0009_organization_tombstones'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='OrganizationStats',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('dimension', models.CharField(choices=[('type', 'Type'), ('size', 'Size'), ('legal_structure', 'Legal structure'), ('geo_scope', 'Geographic scope'), ('country', 'Country'), ('decade', 'Decade founded')], max_length=20)),
+                ('value', models.CharField(blank=True, max_length=100)),
+                ('count', models.IntegerField(default=0)),
+            ],
+            options={
+                'constraints': [models.UniqueConstraint(fields=('dimension', 'value'), name='organizationstats_dimension_value_unique')],
+            },
+        ),
+        migrations.RunPython(populate_organization_stats, migrations.RunPython.noop),
+    ]
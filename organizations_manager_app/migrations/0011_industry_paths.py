@@ -0,0 +1,44 @@
+# Generated by Django 5.1.7 on 2026-10-18 16:33
+
+import re
+from django.db import migrations, models
+
+CODE = re.compile(r'^([A-Z])(\d+)?((?:\.\d+)*)$')
+
+
+def populate_industry_paths(apps, schema_editor):
+    Industry = apps.get_model('organizations_manager_app', 'Industry')
+    industries = list(Industry.objects.all())
+    for industry in industries:
+        match = CODE.match(industry.nace_code)
+        if not match:
+            industry.path = f'{industry.nace_code}/'
+            continue
+        section, division, rest = match.groups()
+        codes = [section]
+        if division:
+            codes.append(section + division)
+            for part in rest.split('.')[1:]:
+                codes.append(f'{codes[-1]}.{part}')
+        industry.path = ''.join(f'{code}/' for code in codes)
+    Industry.objects.bulk_update(industries, ['path'], batch_size=1000)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('organizations_manager_app', '0010_organization_stats'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='industry',
+            name='path',
+            field=models.CharField(blank=True, editable=False, max_length=255),
+        ),
+        migrations.AddIndex(
+            model_name='industry',
+            index=models.Index(fields=['path'], name='industry_path_idx', opclasses=['varchar_pattern_ops']),
+        ),
+        migrations.RunPython(populate_industry_paths, migrations.RunPython.noop),
+    ]
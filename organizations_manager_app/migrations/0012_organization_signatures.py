@@ -0,0 +1,98 @@
+# Generated by Django 5.1.7 on 2026-10-18 16:36
+
+import hashlib
+import random
+import re
+import django.contrib.postgres.fields
+import django.contrib.postgres.indexes
+import django.db.models.deletion
+from django.db import migrations, models
+
+# Copies of minhash and nace.tokenize as of this migration, so that later
+# changes to those modules cannot change what it computes
+TOKEN = re.compile(r'[a-z0-9]+')
+STOP_WORDS = frozenset("""
+    a about activities activity across all also among an and any are as at based be by
+    except for from group has have in including into is it its nec not of on or
+    other others our related service services such than that the their them they this
+    through to use used using via we which while with within without
+""".split())
+NUM_PERMUTATIONS = 64
+BANDS = 32
+PRIME = (1 << 61) - 1
+_random = random.Random(20261018)
+COEFFICIENTS = [(_random.randrange(1, PRIME), _random.randrange(PRIME)) for _ in range(NUM_PERMUTATIONS)]
+
+
+def stem(token):
+    for suffix, replacement in (('ies', 'y'), ('ing', ''), ('ers', ''), ('er', ''), ('ed', ''), ('s', '')):
+        if token.endswith(suffix) and len(token) - len(suffix) >= 3:
+            return token[:-len(suffix)] + replacement
+    return token
+
+
+def organization_features(tags, ownership_structure_ids, description):
+    features = {f'tag:{tag.strip().lower()}' for tag in tags or () if isinstance(tag, str) and tag.strip()}
+    features.update(f'ownership:{structure_id}' for structure_id in ownership_structure_ids)
+    features.update(
+        f'word:{stem(token)}' for token in TOKEN.findall((description or '').lower())
+        if len(token) > 1 and token not in STOP_WORDS
+    )
+    return features
+
+
+def blake2b_int(payload, signed=False):
+    return int.from_bytes(hashlib.blake2b(payload, digest_size=8).digest(), 'big', signed=signed)
+
+
+def signature(features):
+    hashes = [blake2b_int(feature.encode('utf-8')) for feature in features]
+    if not hashes:
+        return [PRIME] * NUM_PERMUTATIONS
+    return [min((a * value + b) % PRIME for value in hashes) for a, b in COEFFICIENTS]
+
+
+def band_keys(minhash):
+    if all(value == PRIME for value in minhash):
+        return []
+    rows = len(minhash) // BANDS
+    return [
+        blake2b_int(f"{band}:{','.join(map(str, minhash[band * rows:(band + 1) * rows]))}".encode('ascii'), signed=True)
+        for band in range(BANDS)
+    ]
+
+
+def populate_signatures(apps, schema_editor):
+    Organization = apps.get_model('organizations_manager_app', 'Organization')
+    OrganizationSignature = apps.get_model('organizations_manager_app', 'OrganizationSignature')
+    memberships = {}
+    pairs = Organization.ownership_structures.through.objects.values_list('organization_id', 'ownershipstructure_id')
+    for organization_id, structure_id in pairs:
+        memberships.setdefault(organization_id, []).append(structure_id)
+    signatures = []
+    for organization_id, tags, description in Organization.objects.values_list('id', 'tags', 'description').iterator():
+        minhash = signature(organization_features(tags, memberships.get(organization_id, []), description))
+        signatures.append(OrganizationSignature(organization_id=organization_id, minhash=minhash, bands=band_keys(minhash)))
+    OrganizationSignature.objects.bulk_create(signatures, batch_size=1000)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('organizations_manager_app', '0011_industry_paths'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='OrganizationSignature',
+            fields=[
+                ('organization', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, primary_key=True, related_name='signature', serialize=False, to='organizations_manager_app.organization')),
+                ('minhash', django.contrib.postgres.fields.ArrayField(base_field=models.BigIntegerField(), size=None)),
+                ('bands', django.contrib.postgres.fields.ArrayField(base_field=models.BigIntegerField(), size=None)),
+            ],
+            options={
+                'indexes': [django.contrib.postgres.indexes.GinIndex(fields=['bands'], name='signature_bands_idx')],
+            },
+        ),
+        migrations.RunPython(populate_signatures, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,38 @@
+# Generated by Django 5.1.7 on 2026-10-18 21:05
+
+import hashlib
+from django.db import migrations
+
+# Copy of minhash.band_keys with 16 bands of 4 rows, frozen like 0012
+BANDS = 16
+PRIME = (1 << 61) - 1
+
+
+def band_keys(minhash):
+    if all(value == PRIME for value in minhash):
+        return []
+    rows = len(minhash) // BANDS
+    keys = []
+    for band in range(BANDS):
+        payload = f"{band}:{','.join(map(str, minhash[band * rows:(band + 1) * rows]))}".encode('ascii')
+        keys.append(int.from_bytes(hashlib.blake2b(payload, digest_size=8).digest(), 'big', signed=True))
+    return keys
+
+
+def rebuild_bands(apps, schema_editor):
+    OrganizationSignature = apps.get_model('organizations_manager_app', 'OrganizationSignature')
+    signatures = list(OrganizationSignature.objects.only('organization_id', 'minhash'))
+    for organization_signature in signatures:
+        organization_signature.bands = band_keys(organization_signature.minhash)
+    OrganizationSignature.objects.bulk_update(signatures, ['bands'], batch_size=1000)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('organizations_manager_app', '0013_data_versions'),
+    ]
+
+    operations = [
+        migrations.RunPython(rebuild_bands, migrations.RunPython.noop),
+    ]
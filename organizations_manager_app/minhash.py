@@ -0,0 +1,72 @@
+"""
+MinHash signatures and LSH band keys for "similar organizations".
+
+An organization is reduced to a set of features (its tags, ownership
+structures and description words). A MinHash signature of that set keeps
+one minimum per hash function, and the fraction of equal positions in
+two signatures estimates the Jaccard similarity of the sets. Signatures
+are cut into bands, and each band is hashed into a single key: two
+organizations share at least one key with high probability when they are
+similar and rarely otherwise, so candidates come from an index lookup
+on the keys instead of comparing every pair.
+
+Plain Python, like ``nace``; the storage lives in ``models``.
+"""
+import hashlib
+import random
+
+from .nace import tokenize
+
+NUM_PERMUTATIONS = 64
+# 4 rows per band: a pair with Jaccard s shares a band with probability
+# 1 - (1 - s^4)^16, about 64% at 0.5 and 97% at 0.7 but 0.2% at 0.1
+BANDS = 16
+_PRIME = (1 << 61) - 1
+# Fixed seed: stored signatures must stay comparable across processes and restarts
+_random = random.Random(20261018)
+_COEFFICIENTS = [(_random.randrange(1, _PRIME), _random.randrange(_PRIME)) for _ in range(NUM_PERMUTATIONS)]
+
+
+def organization_features(tags, ownership_structure_ids, description):
+    """The feature set compared between organizations."""
+    features = {f'tag:{tag.strip().lower()}' for tag in tags or () if isinstance(tag, str) and tag.strip()}
+    features.update(f'ownership:{structure_id}' for structure_id in ownership_structure_ids)
+    features.update(f'word:{token}' for token in tokenize(description or ''))
+    return features
+
+
+def _hash(value):
+    return int.from_bytes(hashlib.blake2b(value.encode('utf-8'), digest_size=8).digest(), 'big')
+
+
+def signature(features):
+    """MinHash signature of a feature set."""
+    hashes = [_hash(feature) for feature in features]
+    if not hashes:
+        # Out of the range of real minimums, so it matches nothing
+        return [_PRIME] * NUM_PERMUTATIONS
+    return [min((a * value + b) % _PRIME for value in hashes) for a, b in _COEFFICIENTS]
+
+
+def band_keys(minhash):
+    """
+    One signed 64-bit key per band. The band number is part of the hash,
+    so keys of different bands never collide with each other. Empty
+    signatures get no keys: they say nothing about similarity.
+    """
+    if all(value == _PRIME for value in minhash):
+        return []
+    rows = len(minhash) // BANDS
+    keys = []
+    for band in range(BANDS):
+        chunk = minhash[band * rows:(band + 1) * rows]
+        payload = f"{band}:{','.join(map(str, chunk))}".encode('ascii')
+        keys.append(int.from_bytes(hashlib.blake2b(payload, digest_size=8).digest(), 'big', signed=True))
+    return keys
+
+
+def estimate_jaccard(first, second):
+    """Share of equal positions in two signatures."""
+    if not first or len(first) != len(second):
+        return 0.0
+    return sum(a == b for a, b in zip(first, second)) / len(first)
@@ -1,5 +1,16 @@
-from django.db import models
+from django.db import connections, models
+from django.db.models import Count, F, FloatField, IntegerField, Sum, TextField, Value
+from django.db.models.expressions import RawSQL
+from django.db.models.functions import Cast, Coalesce, Substr, Upper
+from django.contrib.postgres.fields import ArrayField
+from django.contrib.postgres.indexes import GinIndex, OpClass
+from django.contrib.postgres.search import SearchQuery, SearchRank, SearchVector, SearchVectorField
 from django.core.validators import MaxLengthValidator
+from collections import Counter
+from .minhash import band_keys, estimate_jaccard, organization_features, signature
+from .nace import nace_path
+from .spatial import CLUSTER_PRECISIONS, encode_geohash
+import re
 import uuid
 
 class OrganizationType(models.TextChoices):
@@ -49,12 +60,25 @@ class GovernanceModel(models.TextChoices):
 class Industry(models.Model):
     nace_code = models.CharField(max_length=100, unique=True)
     description = models.TextField()
+    # Materialized path of the code and its ancestors, e.g. 'C/C10/C10.1/'
+    path = models.CharField(max_length=255, blank=True, editable=False)
+
+    class Meta:
+        indexes = [
+            # Pattern ops so path__startswith (a code and its descendants) is an index range scan
+            models.Index(fields=['path'], name='industry_path_idx', opclasses=['varchar_pattern_ops']),
+        ]
+
+    def save(self, *args, **kwargs):
+        self.path = nace_path(self.nace_code)
+        super().save(*args, **kwargs)
 
     def __str__(self):
         return self.nace_code
 
 class OwnershipStructure(models.Model):
     name = models.CharField(max_length=50, unique=True)
+    updated = models.DateTimeField(auto_now=True)
 
     def __str__(self):
         return self.name
@@ -65,6 +89,24 @@ class Location(models.Model):
     state_region = models.CharField(max_length=100, blank=True)
     country = models.CharField(max_length=100, blank=True)
     zip_postal_code = models.CharField(max_length=20, blank=True)
+    latitude = models.FloatField(null=True, blank=True)
+    longitude = models.FloatField(null=True, blank=True)
+    geohash = models.CharField(max_length=12, blank=True, editable=False)
+
+    class Meta:
+        indexes = [
+            # Pattern ops so geohash__startswith is an index range scan
+            models.Index(fields=['geohash'], name='location_geohash_idx', opclasses=['varchar_pattern_ops']),
+        ]
+
+    def save(self, *args, **kwargs):
+        self.geohash = location_geohash(self.latitude, self.longitude)
+        super().save(*args, **kwargs)
+
+def location_geohash(latitude, longitude):
+    if latitude is None or longitude is None:
+        return ''
+    return encode_geohash(latitude, longitude)
 
 class FundingInformation(models.Model):
     sources = models.JSONField(default=list)
@@ -77,6 +119,32 @@ class TokenInformation(models.Model):
     governance = models.CharField(max_length=100, blank=True)
     contract = models.URLField(blank=True)
 
+# Weighted document used for full-text search: name first, then description and tags
+ORGANIZATION_SEARCH_VECTOR = (
+    SearchVector('name', weight='A', config='english')
+    + SearchVector('description', weight='B', config='english')
+    + SearchVector(Cast('tags', TextField()), weight='C', config='english')
+)
+
+class OrganizationQuerySet(models.QuerySet):
+    def update_search_vector(self):
+        """Recompute the stored tsvector for every row in the queryset."""
+        return self.update(search_vector=ORGANIZATION_SEARCH_VECTOR)
+
+    def search(self, text):
+        """
+        Full-text match against the stored search vector, annotated with a
+        ``rank``. Every term is treated as a prefix so partially typed words
+        match while the user is still typing.
+        """
+        terms = re.findall(r'\w+', text)
+        if not terms:
+            return self
+        query = SearchQuery(' & '.join(f'{term}:*' for term in terms), search_type='raw', config='english')
+        # ts_rank returns a real; cast it so cursor values round-trip exactly
+        rank = Cast(SearchRank(F('search_vector'), query), FloatField())
+        return self.filter(search_vector=query).annotate(rank=rank)
+
 class Organization(models.Model):
     id = models.UUIDField(primary_key=True, default=uuid.uuid4, editable=False)
     name = models.CharField(max_length=255)
@@ -99,10 +167,51 @@ class Organization(models.Model):
     tags = models.JSONField(default=list)
     created = models.DateTimeField(auto_now_add=True)
     updated = models.DateTimeField(auto_now=True)
+    search_vector = SearchVectorField(null=True, editable=False)
+
+    objects = OrganizationQuerySet.as_manager()
+
+    class Meta:
+        indexes = [
+            # Keyset pagination walks (created, id) in both directions
+            models.Index(fields=['created', 'id'], name='organization_created_id_idx'),
+            # max(updated) for conditional GETs, and keyset order of ?updated_since= syncs
+            models.Index(fields=['updated', 'id'], name='organization_updated_id_idx'),
+            GinIndex(fields=['search_vector'], name='organization_search_idx'),
+            # icontains compiles to UPPER(name) LIKE UPPER(...), so index that expression
+            GinIndex(OpClass(Upper('name'), name='gin_trgm_ops'), name='organization_name_trgm_idx'),
+            # jsonb_path_ops only serves @> (__contains), which is all the filters use
+            GinIndex(fields=['tags'], opclasses=['jsonb_path_ops'], name='organization_tags_idx'),
+            GinIndex(fields=['certifications'], opclasses=['jsonb_path_ops'], name='organization_certs_idx'),
+        ]
 
     def __str__(self):
         return self.name
 
+class OrganizationTombstone(models.Model):
+    """Record of a deleted organization, so incremental syncs can drop it too."""
+    organization_id = models.UUIDField(unique=True)
+    deleted = models.DateTimeField()
+
+    class Meta:
+        indexes = [
+            models.Index(fields=['deleted', 'organization_id'], name='tombstone_deleted_idx'),
+        ]
+
+    def __str__(self):
+        return str(self.organization_id)
+
+class DataVersion(models.Model):
+    """
+    Version counter of one kind of cached data (see ``caching``), kept in
+    the database so that every process sees the same value.
+    """
+    key = models.CharField(max_length=100, unique=True)
+    version = models.BigIntegerField()
+
+    def __str__(self):
+        return f'{self.key}={self.version}'
+
 class SocialLinks(models.Model):
     website = models.URLField(blank=True)
     twitter = models.URLField(blank=True)
@@ -114,4 +223,338 @@ class SocialLinks(models.Model):
 class ContactInformation(models.Model):
     person = models.CharField(max_length=255, blank=True)
     email = models.EmailField(blank=True)
-    phone = models.CharField(max_length=50, blank=True)
\ No newline at end of file
+    phone = models.CharField(max_length=50, blank=True)
+
+class CounterManager(models.Manager):
+    """
+    Manager of a summary table whose rows are counters identified by
+    ``key_fields``, with a ``count`` column and possibly other sums.
+    """
+    key_fields = ()
+    # Rows per INSERT, well below PostgreSQL's 65535 parameters per statement
+    increment_batch_size = 1000
+
+    def increment(self, deltas):
+        """
+        Add ``{key: {column: delta}}`` to the counters with one
+        ``INSERT ... ON CONFLICT DO UPDATE SET column = column + EXCLUDED.column``,
+        creating missing rows, then delete the rows whose count fell to
+        zero. The upsert is atomic, so concurrent writers cannot both
+        create a row, and keys are written in sorted order so that they
+        lock rows in the same order.
+        """
+        rows = sorted((key, values) for key, values in deltas.items() if any(values.values()))
+        if not rows:
+            return
+        meta = self.model._meta
+        quote = connections[self.db].ops.quote_name
+        table = quote(meta.db_table)
+        value_names = sorted({name for _, values in rows for name in values})
+        key_columns = [quote(meta.get_field(name).column) for name in self.key_fields]
+        value_columns = [quote(meta.get_field(name).column) for name in value_names]
+        assignments = ', '.join(f'{column} = {table}.{column} + EXCLUDED.{column}' for column in value_columns)
+        emptied = []
+        with connections[self.db].cursor() as cursor:
+            for start in range(0, len(rows), self.increment_batch_size):
+                batch = rows[start:start + self.increment_batch_size]
+                row_sql = '(' + ', '.join(['%s'] * (len(key_columns) + len(value_columns))) + ')'
+                cursor.execute(
+                    f"INSERT INTO {table} ({', '.join(key_columns + value_columns)}) "
+                    f"VALUES {', '.join([row_sql] * len(batch))} "
+                    f"ON CONFLICT ({', '.join(key_columns)}) DO UPDATE SET {assignments} "
+                    f"RETURNING {quote(meta.pk.column)}, {quote(meta.get_field('count').column)}",
+                    [param for key, values in batch for param in (*key, *(values.get(name, 0) for name in value_names))],
+                )
+                emptied.extend(pk for pk, count in cursor.fetchall() if count <= 0)
+        if emptied:
+            self.filter(pk__in=emptied).delete()
+
+class TagUsageManager(CounterManager):
+    key_fields = ('kind', 'name')
+
+    def adjust(self, kind, deltas):
+        """Apply ``{name: delta}`` changes to the usage counts of one kind."""
+        self.increment({(kind, name): {'count': delta} for name, delta in deltas.items()})
+
+    def rebuild(self):
+        """Recount every tag and certification from the organizations table."""
+        counts = {TagUsage.TAG: Counter(), TagUsage.CERTIFICATION: Counter()}
+        rows = Organization.objects.values_list('tags', 'certifications').iterator(chunk_size=2000)
+        for tags, certifications in rows:
+            counts[TagUsage.TAG].update(usage_names(tags))
+            counts[TagUsage.CERTIFICATION].update(usage_names(certifications))
+        self.all().delete()
+        self.bulk_create(
+            TagUsage(kind=kind, name=name, count=count)
+            for kind, counter in counts.items()
+            for name, count in counter.items()
+        )
+
+def usage_names(values):
+    """Distinct string entries of a tags/certifications list."""
+    if not isinstance(values, list):
+        return set()
+    return {value for value in values if isinstance(value, str) and value}
+
+class TagUsage(models.Model):
+    """Precomputed number of organizations using each tag or certification."""
+    TAG = 'tag'
+    CERTIFICATION = 'certification'
+    KIND_CHOICES = [(TAG, 'Tag'), (CERTIFICATION, 'Certification')]
+
+    kind = models.CharField(max_length=20, choices=KIND_CHOICES)
+    name = models.CharField(max_length=255)
+    count = models.IntegerField(default=0)
+
+    objects = TagUsageManager()
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=['kind', 'name'], name='tagusage_kind_name_unique'),
+        ]
+        indexes = [
+            models.Index(fields=['kind', '-count'], name='tagusage_kind_count_idx'),
+        ]
+
+    def __str__(self):
+        return self.name
+
+class GeoClusterManager(CounterManager):
+    key_fields = ('precision', 'cell', 'type')
+
+    def shift(self, org_type, geohash, latitude, longitude, delta):
+        """
+        Add (or with a negative ``delta`` remove) ``delta`` organizations of
+        ``org_type`` at one point to every precomputed cluster level.
+        """
+        self.shift_many([(org_type, geohash, latitude, longitude, delta)])
+
+    def shift_many(self, shifts):
+        """Apply several ``(org_type, geohash, latitude, longitude, delta)`` shifts in one upsert."""
+        deltas = {}
+        for org_type, geohash, latitude, longitude, delta in shifts:
+            if not geohash or latitude is None or longitude is None or not delta:
+                continue
+            for precision in CLUSTER_PRECISIONS:
+                cluster = deltas.setdefault((precision, geohash[:precision], org_type), Counter())
+                cluster.update(count=delta, lat_sum=latitude * delta, lon_sum=longitude * delta)
+        self.increment(deltas)
+
+    def rebuild(self):
+        """Recompute every cluster level from the organizations table."""
+        located = Organization.objects.exclude(location__geohash='').exclude(location__isnull=True)
+        clusters = []
+        for precision in CLUSTER_PRECISIONS:
+            rows = located.values('type', cell=Substr('location__geohash', 1, precision)).annotate(
+                count=Count('id'),
+                lat_sum=Sum('location__latitude'),
+                lon_sum=Sum('location__longitude'),
+            ).order_by()
+            clusters.extend(GeoCluster(precision=precision, **row) for row in rows)
+        self.all().delete()
+        self.bulk_create(clusters, batch_size=2000)
+
+class GeoCluster(models.Model):
+    """
+    Number of organizations of one type per geohash cell, for each cluster
+    precision. Coordinate sums are kept rather than centroids so that
+    adding or removing an organization is a constant-time update.
+    """
+    precision = models.PositiveSmallIntegerField()
+    cell = models.CharField(max_length=12)
+    type = models.CharField(max_length=50, choices=OrganizationType.choices)
+    count = models.IntegerField(default=0)
+    lat_sum = models.FloatField(default=0)
+    lon_sum = models.FloatField(default=0)
+
+    objects = GeoClusterManager()
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=['precision', 'cell', 'type'], name='geocluster_cell_type_unique'),
+        ]
+        indexes = [
+            # Viewports are looked up by cell prefix within one precision
+            models.Index(
+                fields=['precision', 'cell'], name='geocluster_precision_cell_idx',
+                opclasses=['int2_ops', 'varchar_pattern_ops'],
+            ),
+        ]
+
+    def __str__(self):
+        return f'{self.precision}:{self.cell}'
+
+def stats_keys(values):
+    """
+    The ``(dimension, value)`` summary rows an organization counts towards,
+    from a dict with its type, size, legal_structure, geo_scope,
+    year_founded and location country.
+    """
+    year = values.get('year_founded')
+    return [
+        (OrganizationStats.TYPE, values.get('type') or ''),
+        (OrganizationStats.SIZE, values.get('size') or ''),
+        (OrganizationStats.LEGAL_STRUCTURE, values.get('legal_structure') or ''),
+        (OrganizationStats.GEO_SCOPE, values.get('geo_scope') or ''),
+        (OrganizationStats.COUNTRY, (values.get('country') or '').strip()),
+        (OrganizationStats.DECADE, f'{year // 10 * 10}s' if year is not None else ''),
+    ]
+
+class OrganizationStatsManager(CounterManager):
+    key_fields = ('dimension', 'value')
+
+    def adjust(self, deltas):
+        """Apply ``{(dimension, value): delta}`` changes to the summary counts."""
+        self.increment({key: {'count': delta} for key, delta in deltas.items()})
+
+    def compute(self):
+        """Full recount from the organizations table as ``{(dimension, value): count}``."""
+        counts = Counter()
+        rows = Organization.objects.values(
+            'type', 'size', 'legal_structure', 'geo_scope', 'year_founded',
+            country=Coalesce('location__country', Value('')),
+        ).annotate(count=Count('id')).order_by()
+        for row in rows:
+            for key in stats_keys(row):
+                counts[key] += row['count']
+        return counts
+
+    def current(self):
+        """The maintained counts as ``{(dimension, value): count}``."""
+        return Counter({(dimension, value): count for dimension, value, count in self.values_list('dimension', 'value', 'count')})
+
+    def rebuild(self):
+        counts = self.compute()
+        self.all().delete()
+        self.bulk_create(
+            OrganizationStats(dimension=dimension, value=value, count=count)
+            for (dimension, value), count in counts.items()
+        )
+        return counts
+
+class OrganizationStats(models.Model):
+    """
+    Denormalized number of organizations per value of each dashboard
+    dimension, kept current by signals. An empty ``value`` counts the
+    organizations where the attribute is unknown.
+    """
+    TYPE = 'type'
+    SIZE = 'size'
+    LEGAL_STRUCTURE = 'legal_structure'
+    GEO_SCOPE = 'geo_scope'
+    COUNTRY = 'country'
+    DECADE = 'decade'
+    DIMENSION_CHOICES = [
+        (TYPE, 'Type'), (SIZE, 'Size'), (LEGAL_STRUCTURE, 'Legal structure'),
+        (GEO_SCOPE, 'Geographic scope'), (COUNTRY, 'Country'), (DECADE, 'Decade founded'),
+    ]
+
+    dimension = models.CharField(max_length=20, choices=DIMENSION_CHOICES)
+    value = models.CharField(max_length=100, blank=True)
+    count = models.IntegerField(default=0)
+
+    objects = OrganizationStatsManager()
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=['dimension', 'value'], name='organizationstats_dimension_value_unique'),
+        ]
+
+    def __str__(self):
+        return f'{self.dimension}={self.value}'
+
+class OrganizationSignatureManager(models.Manager):
+    max_candidates = 200
+
+    def refresh(self, organization_ids):
+        """Recompute the signatures of the given organizations from their stored data."""
+        organization_ids = list(organization_ids)
+        if not organization_ids:
+            return
+        memberships = {}
+        Through = Organization.ownership_structures.through
+        pairs = Through.objects.filter(organization_id__in=organization_ids).values_list(
+            'organization_id', 'ownershipstructure_id'
+        )
+        for organization_id, structure_id in pairs:
+            memberships.setdefault(organization_id, []).append(structure_id)
+
+        signatures = []
+        rows = Organization.objects.filter(id__in=organization_ids).values_list('id', 'tags', 'description')
+        for organization_id, tags, description in rows:
+            minhash = signature(organization_features(tags, memberships.get(organization_id, []), description))
+            signatures.append(
+                OrganizationSignature(organization_id=organization_id, minhash=minhash, bands=band_keys(minhash))
+            )
+        self.bulk_create(
+            signatures,
+            update_conflicts=True,
+            unique_fields=['organization'],
+            update_fields=['minhash', 'bands'],
+        )
+
+    def rebuild(self, batch_size=1000):
+        """Recompute every signature, ``batch_size`` organizations at a time."""
+        ids = Organization.objects.order_by('id').values_list('id', flat=True).iterator(chunk_size=batch_size)
+        batch = []
+        total = 0
+        for organization_id in ids:
+            batch.append(organization_id)
+            if len(batch) >= batch_size:
+                self.refresh(batch)
+                total += len(batch)
+                batch = []
+        self.refresh(batch)
+        return total + len(batch)
+
+    def similar(self, organization_id, limit=10):
+        """
+        ``[(organization_id, estimated Jaccard similarity)]`` of the
+        ``limit`` nearest neighbours of an organization, best first. Only
+        organizations sharing an LSH band with it are compared.
+        """
+        own = self.filter(organization_id=organization_id).values_list('minhash', 'bands').first()
+        if own is None or not own[1]:
+            return []
+        minhash, bands = own
+        # Sharing more bands means closer signatures; only the best
+        # ``max_candidates`` are loaded and scored
+        bands_column = f'{connections[self.db].ops.quote_name(self.model._meta.db_table)}.bands'
+        shared = RawSQL(
+            f'cardinality(ARRAY(SELECT unnest({bands_column}) INTERSECT SELECT unnest(%s::bigint[])))',
+            (bands,),
+            output_field=IntegerField(),
+        )
+        candidates = (
+            self.filter(bands__overlap=bands)
+            .exclude(organization_id=organization_id)
+            .annotate(shared=shared)
+            .order_by('-shared', 'organization_id')
+            .values_list('organization_id', 'minhash')[:max(limit, self.max_candidates)]
+        )
+        scored = [(estimate_jaccard(minhash, other), candidate_id) for candidate_id, other in candidates]
+        scored.sort(key=lambda pair: (-pair[0], str(pair[1])))
+        return [(candidate_id, score) for score, candidate_id in scored[:limit] if score > 0]
+
+class OrganizationSignature(models.Model):
+    """
+    MinHash signature of an organization's tags, ownership structures and
+    description words, with its LSH band keys (see ``minhash``). Kept
+    current by signals; the GIN index on ``bands`` finds the organizations
+    sharing a band with one overlap query.
+    """
+    organization = models.OneToOneField(
+        Organization, on_delete=models.CASCADE, primary_key=True, related_name='signature'
+    )
+    minhash = ArrayField(models.BigIntegerField())
+    bands = ArrayField(models.BigIntegerField())
+
+    objects = OrganizationSignatureManager()
+
+    class Meta:
+        indexes = [
+            GinIndex(fields=['bands'], name='signature_bands_idx'),
+        ]
+
+    def __str__(self):
+        return str(self.organization_id)
@@ -0,0 +1,147 @@
+"""
+NACE code loading and description-based classification.
+
+Like ``jsonstream`` this module is plain Python so that ``csvconvert`` can
+use it without configuring Django.
+"""
+import heapq
+import math
+import re
+from collections import defaultdict
+
+_TOKEN = re.compile(r'[a-z0-9]+')
+# Section letter, optional division number, then .group and .class levels
+_CODE = re.compile(r'^([A-Z])(\d+)?((?:\.\d+)*)$')
+
+# Words that appear in most NACE descriptions (or most English text) and
+# would otherwise match almost every code
+STOP_WORDS = frozenset("""
+    a about activities activity across all also among an and any are as at based be by
+    except for from group has have in including into is it its nec not of on or
+    other others our related service services such than that the their them they this
+    through to use used using via we which while with within without
+""".split())
+
+
+def load_nace_codes(filepath):
+    """Loads NACE codes from a text file and creates a lookup dictionary."""
+    nace_codes = {}
+    with open(filepath, 'r', encoding='utf-8') as file:
+        for line in file:
+            line = line.strip()
+            if line:
+                parts = line.split(" - ", 1)  # Split only once at the first " - "
+                if len(parts) == 2:
+                    code, description = parts[0].strip(), parts[1].strip()
+                    nace_codes[code] = description
+    return nace_codes
+
+
+def nace_ancestors(code):
+    """
+    The codes from the section down to ``code`` itself, e.g. ``C10.1.1``
+    gives ``['C', 'C10', 'C10.1', 'C10.1.1']``. Codes that do not follow
+    the NACE layout are their own single level.
+    """
+    match = _CODE.match(code)
+    if not match:
+        return [code]
+    section, division, rest = match.groups()
+    codes = [section]
+    if division:
+        codes.append(section + division)
+        for part in rest.split('.')[1:]:
+            codes.append(f'{codes[-1]}.{part}')
+    return codes
+
+
+def nace_path(code):
+    """
+    Materialized path of a code, ``'C/C10/C10.1/'`` for ``C10.1``. Every
+    descendant's path starts with its ancestors' paths, and the trailing
+    separator keeps ``C1/`` from matching ``C10/``.
+    """
+    return ''.join(f'{ancestor}/' for ancestor in nace_ancestors(code))
+
+
+def _stem(token):
+    """Very light suffix stripping so 'farming', 'farms' and 'farm' meet."""
+    for suffix, replacement in (('ies', 'y'), ('ing', ''), ('ers', ''), ('er', ''), ('ed', ''), ('s', '')):
+        if token.endswith(suffix) and len(token) - len(suffix) >= 3:
+            return token[:-len(suffix)] + replacement
+    return token
+
+
+def tokenize(text):
+    """Lowercase, split, drop stop words and stem; returns distinct tokens."""
+    return {
+        _stem(token) for token in _TOKEN.findall(text.lower())
+        if len(token) > 1 and token not in STOP_WORDS
+    }
+
+
+class NaceClassifier:
+    """
+    Ranks NACE codes against free-text descriptions.
+
+    Built once from the code list: each code description is tokenized a
+    single time into an inverted index of ``token -> [(code, weight)]``
+    where the weight is the token's IDF divided by the square root of the
+    description length. Scoring a description then only touches the
+    postings of its own tokens, and rare, specific words count for more
+    than words shared by many codes.
+    """
+
+    def __init__(self, nace_codes):
+        self.codes = list(nace_codes)
+        documents = [tokenize(nace_codes[code]) for code in self.codes]
+
+        document_frequency = defaultdict(int)
+        for tokens in documents:
+            for token in tokens:
+                document_frequency[token] += 1
+
+        total = len(documents)
+        postings = defaultdict(list)
+        for index, tokens in enumerate(documents):
+            if not tokens:
+                continue
+            norm = math.sqrt(len(tokens))
+            for token in tokens:
+                idf = math.log(total / document_frequency[token])
+                if idf > 0:
+                    postings[token].append((index, idf / norm))
+        self.postings = {token: tuple(entries) for token, entries in postings.items()}
+
+    @classmethod
+    def from_file(cls, filepath):
+        return cls(load_nace_codes(filepath))
+
+    def classify(self, description, k=1):
+        """Return up to ``k`` ``(code, score)`` pairs, best match first."""
+        return self._rank(tokenize(description), k)
+
+    def classify_many(self, descriptions, k=1):
+        """
+        Classify a batch of descriptions; identical descriptions are
+        tokenized and scored only once.
+        """
+        results = {}
+        for description in descriptions:
+            if description not in results:
+                results[description] = self._rank(tokenize(description), k)
+        return [results[description] for description in descriptions]
+
+    def best_code(self, description):
+        """The single best code for a description, or None when nothing matches."""
+        matches = self.classify(description, k=1)
+        return matches[0][0] if matches else None
+
+    def _rank(self, tokens, k):
+        scores = defaultdict(float)
+        for token in tokens:
+            for index, weight in self.postings.get(token, ()):
+                scores[index] += weight
+        # Ties go to the code listed first, i.e. the broader one
+        best = heapq.nlargest(k, scores.items(), key=lambda item: (item[1], -item[0]))
+        return [(self.codes[index], round(score, 4)) for index, score in best]
@@ -0,0 +1,167 @@
+import base64
+import datetime
+import functools
+import json
+import uuid
+
+from django.core.exceptions import FieldDoesNotExist, ValidationError
+from django.db.models import Q
+from rest_framework.exceptions import NotFound
+from rest_framework.pagination import BasePagination
+from rest_framework.response import Response
+from rest_framework.utils.urls import replace_query_param
+
+
+def _encode_position_value(value):
+    # DjangoJSONEncoder truncates datetimes to milliseconds, which would make
+    # rows inside the same millisecond fall between two pages.
+    if isinstance(value, datetime.datetime):
+        return value.isoformat()
+    if isinstance(value, uuid.UUID):
+        return str(value)
+    raise TypeError(f'Cannot encode {type(value).__name__} in a cursor')
+
+
+class KeysetPagination(BasePagination):
+    """
+    Cursor pagination keyed on a unique ordering, by default ``(created, id)``.
+
+    Every page is a single range query reading ``page_size + 1`` rows: the
+    extra row only tells us whether there is a next page, so no COUNT is run
+    unless the client asks for one with ``?count=true``.
+    """
+    ordering = ('-created', '-id')
+    page_size = 50
+    max_page_size = 500
+    cursor_query_param = 'cursor'
+    page_size_query_param = 'page_size'
+    count_query_param = 'count'
+    invalid_cursor_message = 'Invalid cursor'
+
+    def paginate_queryset(self, queryset, request, view=None, ordering=None):
+        self.request = request
+        self.ordering = tuple(ordering or self.ordering)
+        self.page_size = self.get_page_size(request)
+
+        # The exact count is opt-in and ignores the cursor position.
+        self.count = queryset.count() if self.wants_count(request) else None
+
+        queryset = queryset.order_by(*self.ordering)
+        position = self.decode_cursor(request, queryset)
+        if position is not None:
+            queryset = queryset.filter(self.get_keyset_filter(position))
+
+        rows = list(queryset[:self.page_size + 1])
+        self.has_more = len(rows) > self.page_size
+        rows = rows[:self.page_size]
+
+        self.next_position = None
+        if self.has_more:
+            last = rows[-1]
+            # Rows may be model instances or .values() dicts
+            get = last.__getitem__ if isinstance(last, dict) else functools.partial(getattr, last)
+            self.next_position = [get(field.lstrip('-')) for field in self.ordering]
+        return rows
+
+    def get_paginated_response(self, data):
+        payload = {
+            'next': self.get_next_link(),
+            'has_more': self.has_more,
+        }
+        if self.count is not None:
+            payload['count'] = self.count
+        payload['results'] = data
+        return Response(payload)
+
+    def get_paginated_response_schema(self, schema):
+        return {
+            'type': 'object',
+            'required': ['results', 'has_more'],
+            'properties': {
+                'next': {'type': 'string', 'nullable': True, 'format': 'uri'},
+                'has_more': {'type': 'boolean'},
+                'count': {'type': 'integer'},
+                'results': schema,
+            },
+        }
+
+    def get_page_size(self, request):
+        try:
+            page_size = int(request.query_params[self.page_size_query_param])
+        except (KeyError, ValueError):
+            return self.page_size
+        if page_size <= 0:
+            return self.page_size
+        return min(page_size, self.max_page_size)
+
+    def wants_count(self, request):
+        value = request.query_params.get(self.count_query_param, '')
+        return value.strip().lower() in ('1', 'true', 'yes')
+
+    def get_keyset_filter(self, position):
+        """
+        Expand ``(a, b) < (x, y)`` into ``a < x OR (a = x AND b < y)`` so the
+        comparison direction can differ per field.
+        """
+        keyset = Q()
+        equal = {}
+        for field, value in zip(self.ordering, position):
+            name = field.lstrip('-')
+            lookup = 'lt' if field.startswith('-') else 'gt'
+            keyset |= Q(**equal, **{f'{name}__{lookup}': value})
+            equal[name] = value
+        return keyset
+
+    def get_next_cursor(self):
+        """The encoded position of the next page, or None on the last page."""
+        if self.next_position is None:
+            return None
+        return self.encode_cursor(self.next_position)
+
+    def get_next_link(self):
+        return self.get_cursor_link(self.request, self.get_next_cursor())
+
+    def get_cursor_link(self, request, cursor):
+        """Absolute URL of ``request`` at the encoded position ``cursor``, or None without one."""
+        if cursor is None:
+            return None
+        return replace_query_param(request.build_absolute_uri(), self.cursor_query_param, cursor)
+
+    def encode_cursor(self, position):
+        raw = json.dumps(position, default=_encode_position_value, separators=(',', ':'))
+        return base64.urlsafe_b64encode(raw.encode('utf-8')).decode('ascii')
+
+    def decode_cursor(self, request, queryset):
+        """
+        The position in the cursor parameter, each value converted by its
+        ordering column so tampered cursors are rejected before querying.
+        """
+        encoded = request.query_params.get(self.cursor_query_param)
+        if not encoded:
+            return None
+        try:
+            position = json.loads(base64.urlsafe_b64decode(encoded.encode('ascii')).decode('utf-8'))
+        except (TypeError, ValueError, UnicodeError):
+            raise NotFound(self.invalid_cursor_message)
+        if not isinstance(position, list) or len(position) != len(self.ordering):
+            raise NotFound(self.invalid_cursor_message)
+        try:
+            values = [
+                self.get_ordering_field(queryset, field.lstrip('-')).to_python(value)
+                for field, value in zip(self.ordering, position)
+            ]
+        except (ValidationError, TypeError, ValueError):
+            raise NotFound(self.invalid_cursor_message)
+        if any(value is None for value in values):
+            raise NotFound(self.invalid_cursor_message)
+        return values
+
+    def get_ordering_field(self, queryset, name):
+        """Model field or annotation output field behind an ordering column."""
+        annotation = queryset.query.annotations.get(name)
+        if annotation is not None:
+            return annotation.output_field
+        try:
+            return queryset.model._meta.get_field(name)
+        except FieldDoesNotExist:
+            raise NotFound(self.invalid_cursor_message)
@@ -0,0 +1,67 @@
+"""
+Renderers for large API responses.
+
+``FastJSONRenderer`` stands in for DRF's ``JSONRenderer`` under the same
+``application/json`` media type: it encodes with orjson when that is
+installed and no indentation was asked for, and leaves everything else
+to DRF. The export formats stream their bodies themselves and only
+render error responses through these classes.
+"""
+import csv
+import io
+import json
+
+from rest_framework.renderers import BaseRenderer, JSONRenderer
+from rest_framework.utils import encoders
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+_encoder = encoders.JSONEncoder()
+
+
+class FastJSONRenderer(JSONRenderer):
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        if data is None:
+            return b''
+        # orjson only writes compact, non-ASCII-escaped output
+        if (
+            orjson is None
+            or not self.compact
+            or self.ensure_ascii
+            or self.get_indent(accepted_media_type or '', renderer_context or {})
+        ):
+            return super().render(data, accepted_media_type, renderer_context)
+        # Dates, lazy strings, decimals and the like go through DRF's encoder
+        return orjson.dumps(
+            data, default=_encoder.default, option=orjson.OPT_NON_STR_KEYS | orjson.OPT_PASSTHROUGH_DATETIME,
+        )
+
+
+class NDJSONRenderer(BaseRenderer):
+    media_type = 'application/x-ndjson'
+    format = 'ndjson'
+    charset = None
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        if data is None:
+            return b''
+        return (json.dumps(data, cls=encoders.JSONEncoder, ensure_ascii=False) + '\n').encode('utf-8')
+
+
+class CSVRenderer(BaseRenderer):
+    media_type = 'text/csv'
+    format = 'csv'
+    charset = 'utf-8'
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        if data is None:
+            return b''
+        buffer = io.StringIO()
+        writer = csv.writer(buffer)
+        items = data.items() if isinstance(data, dict) else enumerate(data)
+        for key, value in items:
+            writer.writerow([key, value])
+        return buffer.getvalue().encode('utf-8')
@@ -1,26 +1,280 @@
+import operator
+
+from django.utils import timezone
 from rest_framework import serializers
-from .models import Organization , OwnershipStructure
+from rest_framework.permissions import SAFE_METHODS
+from .models import (
+    GeographicalScope,
+    GovernanceModel,
+    Industry,
+    LegalStructure,
+    OrganizationSize,
+    OrganizationType,
+    Organization,
+    OrganizationTombstone,
+    OwnershipStructure,
+    TagUsage,
+    Location,
+    FundingInformation,
+    TokenInformation,
+    SocialLinks,
+    ContactInformation,
+)
+
+class LocationSerializer(serializers.ModelSerializer):
+    class Meta:
+        model = Location
+        fields = ['id', 'address', 'city', 'state_region', 'country', 'zip_postal_code', 'latitude', 'longitude']
+
+
+class FundingInformationSerializer(serializers.ModelSerializer):
+    class Meta:
+        model = FundingInformation
+        fields = ['id', 'sources', 'revenue']
+
+
+class TokenInformationSerializer(serializers.ModelSerializer):
+    class Meta:
+        model = TokenInformation
+        fields = ['id', 'name', 'symbol', 'blockchain', 'governance', 'contract']
+
+
+class SocialLinksSerializer(serializers.ModelSerializer):
+    class Meta:
+        model = SocialLinks
+        fields = ['id', 'website', 'twitter', 'linkedin', 'discord', 'github', 'other']
+
+
+class ContactInformationSerializer(serializers.ModelSerializer):
+    class Meta:
+        model = ContactInformation
+        fields = ['id', 'person', 'email', 'phone']
+
+
+# Side tables that ?expand= can nest in place of their id
+EXPANDABLE_FIELDS = {
+    'location': LocationSerializer,
+    'funding': FundingInformationSerializer,
+    'token': TokenInformationSerializer,
+    'social': SocialLinksSerializer,
+    'contact': ContactInformationSerializer,
+}
+
+
+def requested_expansions(request):
+    """Known relation names from ``?expand=a,b``, unknown names are ignored."""
+    if request is None:
+        return []
+    requested = {
+        name.strip().lower()
+        for value in request.query_params.getlist('expand')
+        for name in value.split(',')
+    }
+    return [name for name in EXPANDABLE_FIELDS if name in requested]
+
+
+# Model columns behind the computed fields, for ?fields= to load
+DISPLAY_FIELD_SOURCES = {
+    'industry_display': 'industry',
+    'geo_scope_display': 'geo_scope',
+    'governance_display': 'governance',
+}
+
+
+def requested_fields(request):
+    """
+    Field names from ``?fields=a,b`` on read requests, or None when every
+    field is wanted. ``id`` is always included; unknown names are ignored
+    like unknown ``?expand=`` names.
+    """
+    if request is None or request.method not in SAFE_METHODS:
+        return None
+    values = request.query_params.getlist('fields')
+    if not values:
+        return None
+    names = {name.strip() for value in values for name in value.split(',') if name.strip()}
+    return names | {'id'}
+
+
+def field_columns(fields):
+    """Model fields to load for a set of serializer field names."""
+    model_fields = {field.name for field in Organization._meta.get_fields()}
+    columns = {DISPLAY_FIELD_SOURCES.get(name, name) for name in fields}
+    return columns & model_fields
+
 
 class OrganizationSerializer(serializers.ModelSerializer):
     # These fields will return human-readable values
     industry_display = serializers.SerializerMethodField()
     geo_scope_display = serializers.SerializerMethodField()
     governance_display = serializers.SerializerMethodField()
+    # Only present on radius queries (?near=), where it is annotated in SQL
+    distance_km = serializers.FloatField(read_only=True)
 
     class Meta:
         model = Organization
-        fields = '__all__'  # You can list fields explicitly if needed
+        exclude = ['search_vector']  # Internal full-text index column
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        # Nest the requested side tables; the view select_related()s the same ones
+        request = self.context.get('request')
+        for name in requested_expansions(request):
+            self.fields[name] = EXPANDABLE_FIELDS[name](read_only=True)
+        # Sparse fieldsets: the view only() loads the matching columns
+        fields = requested_fields(request)
+        if fields is not None:
+            for name in set(self.fields) - fields:
+                self.fields.pop(name)
 
     def get_industry_display(self, obj):
         # If you want to show the nace_code or description
         return obj.industry.nace_code if obj.industry else ''
 
     def get_geo_scope_display(self, obj):
-        return obj.get_geo_scope_display() if obj.geo_scope else ''
+        return choice_label('geo_scope', obj.geo_scope)
 
     def get_governance_display(self, obj):
-        return obj.get_governance_display() if obj.governance else ''
+        return choice_label('governance', obj.governance)
+
+
+class OrganizationBulkSerializer(serializers.ModelSerializer):
+    """
+    Validates one item of a bulk write. Relations are plain ids checked
+    once per batch by the view, and side tables are nested objects, so
+    validating a whole batch runs no queries.
+    """
+    id = serializers.UUIDField(required=False)
+    industry = serializers.IntegerField(required=False, allow_null=True)
+    ownership_structures = serializers.ListField(child=serializers.IntegerField(), required=False)
+    location = LocationSerializer(required=False, allow_null=True)
+    funding = FundingInformationSerializer(required=False, allow_null=True)
+    token = TokenInformationSerializer(required=False, allow_null=True)
+    social = SocialLinksSerializer(required=False, allow_null=True)
+    contact = ContactInformationSerializer(required=False, allow_null=True)
+
+    class Meta:
+        model = Organization
+        exclude = ['search_vector', 'created', 'updated']
+
+
+# Precomputed value -> label maps, instead of get_FOO_display() per row
+CHOICE_LABELS = {
+    'type': dict(OrganizationType.choices),
+    'legal_structure': dict(LegalStructure.choices),
+    'geo_scope': dict(GeographicalScope.choices),
+    'size': dict(OrganizationSize.choices),
+    'governance': dict(GovernanceModel.choices),
+}
+
+
+def choice_label(field, value):
+    """Label of a choice value, the value itself when unknown, '' when empty."""
+    if not value:
+        return ''
+    return CHOICE_LABELS[field].get(value, value)
+
+
+def format_datetime(value):
+    """The representation DRF's DateTimeField gives with default settings."""
+    if value is None:
+        return None
+    value = value.astimezone(timezone.get_current_timezone()).isoformat()
+    if value.endswith('+00:00'):
+        value = value[:-6] + 'Z'
+    return value
+
+
+# Columns read by the row serializer for fields that are not plain columns
+ROW_COLUMNS = {
+    'industry_display': 'industry__nace_code',
+    'geo_scope_display': 'geo_scope',
+    'governance_display': 'governance',
+}
+
+
+class OrganizationRowSerializer:
+    """
+    Read-only fast path for lists of organizations.
+
+    Produces the same output as ``OrganizationSerializer(many=True)``
+    (honouring ``?fields=``, but not ``?expand=``) from ``.values()``
+    rows: each field becomes one plain function of the row, choice labels
+    come from ``CHOICE_LABELS`` and ownership structures are read with a
+    single query on the through table. None of DRF's per-field machinery
+    runs per row.
+    """
+
+    def __init__(self, rows, context=None):
+        self.rows = rows
+        self.context = context or {}
+
+    @staticmethod
+    def field_names(context):
+        # The real serializer decides which fields exist and in what order
+        return list(OrganizationSerializer(context=context).fields)
 
+    @classmethod
+    def values(cls, queryset, context, extra_columns=()):
+        """``queryset`` as dict rows holding every column the output needs."""
+        model_fields = {field.name for field in Organization._meta.get_fields()}
+        columns = set(extra_columns)
+        for name in cls.field_names(context):
+            column = ROW_COLUMNS.get(name, name)
+            if column in queryset.query.annotations or '__' in column:
+                columns.add(column)
+            elif column in model_fields and column != 'ownership_structures':
+                columns.add(column)
+        return queryset.select_related(None).prefetch_related(None).values(*columns)
+
+    @property
+    def data(self):
+        rows = self.rows
+        names = self.field_names(self.context)
+        if not rows:
+            return []
+        if 'distance_km' in names and 'distance_km' not in rows[0]:
+            # Only annotated on radius queries, like the model serializer
+            names.remove('distance_km')
+
+        memberships = {}
+        if 'ownership_structures' in names:
+            Through = Organization.ownership_structures.through
+            pairs = Through.objects.filter(
+                organization_id__in=[row['id'] for row in rows]
+            ).order_by('ownershipstructure_id').values_list('organization_id', 'ownershipstructure_id')
+            for organization_id, structure_id in pairs:
+                memberships.setdefault(organization_id, []).append(structure_id)
+
+        getters = []
+        for name in names:
+            if name == 'id':
+                getter = lambda row: str(row['id'])
+            elif name == 'industry_display':
+                getter = lambda row: row['industry__nace_code'] or ''
+            elif name in ('geo_scope_display', 'governance_display'):
+                column = ROW_COLUMNS[name]
+                labels = CHOICE_LABELS[column]
+                getter = lambda row, column=column, labels=labels: labels.get(row[column], row[column]) if row[column] else ''
+            elif name in ('created', 'updated'):
+                getter = lambda row, name=name: format_datetime(row[name])
+            elif name == 'ownership_structures':
+                getter = lambda row: memberships.get(row['id'], [])
+            else:
+                getter = operator.itemgetter(name)
+            getters.append((name, getter))
+
+        return [{name: getter(row) for name, getter in getters} for row in rows]
+
+
+
+class IndustrySerializer(serializers.ModelSerializer):
+    """
+    Serializer for NACE industries with their materialized path.
+    """
+    class Meta:
+        model = Industry
+        fields = ['id', 'nace_code', 'description', 'path']
 
 
 class OwnershipStructureSerializer(serializers.ModelSerializer):
@@ -32,6 +286,21 @@ class OwnershipStructureSerializer(serializers.ModelSerializer):
         fields = ['id', 'name']
 
 
+class TagUsageSerializer(serializers.ModelSerializer):
+    """
+    Serializer for precomputed tag and certification usage counts.
+    """
+    class Meta:
+        model = TagUsage
+        fields = ['name', 'kind', 'count']
+
 
+class OrganizationTombstoneSerializer(serializers.ModelSerializer):
+    """
+    Serializer for deleted organizations reported to incremental syncs.
+    """
+    id = serializers.UUIDField(source='organization_id')
 
-        
\ No newline at end of file
+    class Meta:
+        model = OrganizationTombstone
+        fields = ['id', 'deleted']
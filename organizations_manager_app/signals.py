@@ -0,0 +1,299 @@
+from collections import Counter
+
+from django.db.models import Count
+from django.db.models.signals import m2m_changed, post_delete, post_save, pre_delete, pre_save
+from django.dispatch import receiver
+from django.utils import timezone
+
+from .caching import bump_data_version, bump_industry_version
+from .models import (
+    ContactInformation,
+    FundingInformation,
+    GeoCluster,
+    Industry,
+    Location,
+    Organization,
+    OrganizationSignature,
+    OrganizationStats,
+    OrganizationTombstone,
+    OwnershipStructure,
+    SocialLinks,
+    TagUsage,
+    TokenInformation,
+    stats_keys,
+    usage_names,
+)
+
+# Columns whose previous value is needed to maintain derived data
+PREVIOUS_STATE_FIELDS = (
+    'tags', 'certifications', 'description', 'type', 'size', 'legal_structure', 'geo_scope', 'year_founded',
+    'location', 'location__geohash', 'location__latitude', 'location__longitude', 'location__country',
+)
+STATS_FIELDS = ('type', 'size', 'legal_structure', 'geo_scope', 'year_founded')
+LOCATION_POINT_FIELDS = ('geohash', 'latitude', 'longitude')
+# Every model that appears in an organization response
+VERSIONED_MODELS = (
+    Organization, Industry, OwnershipStructure, Location, FundingInformation,
+    TokenInformation, SocialLinks, ContactInformation,
+)
+# Side tables rendered inside organizations, with the field pointing at them
+EMBEDDED_MODELS = {
+    Industry: 'industry',
+    Location: 'location',
+    FundingInformation: 'funding',
+    TokenInformation: 'token',
+    SocialLinks: 'social',
+    ContactInformation: 'contact',
+}
+
+
+def invalidate_responses(sender, **kwargs):
+    bump_data_version()
+
+
+for model in VERSIONED_MODELS:
+    post_save.connect(invalidate_responses, sender=model)
+    post_delete.connect(invalidate_responses, sender=model)
+
+
+def touch_organizations(sender, instance, raw=False, created=False, **kwargs):
+    """
+    Side tables show up in organization responses (``industry_display``,
+    ``?expand=``) but editing one does not save the organizations using
+    it, so move their ``updated`` timestamp (the conditional GET
+    validator) by hand. On delete this runs before the organizations are
+    detached with a bulk SET NULL.
+    """
+    if raw or created:
+        return
+    Organization.objects.filter(**{EMBEDDED_MODELS[sender]: instance}).update(updated=timezone.now())
+
+
+for model in EMBEDDED_MODELS:
+    post_save.connect(touch_organizations, sender=model)
+    pre_delete.connect(touch_organizations, sender=model)
+
+
+@receiver(post_save, sender=Industry)
+@receiver(post_delete, sender=Industry)
+def invalidate_industries(sender, **kwargs):
+    bump_industry_version()
+
+
+@receiver(m2m_changed, sender=Organization.ownership_structures.through)
+def touch_memberships(sender, instance, action, reverse, pk_set, **kwargs):
+    """
+    Membership changes do not save the organization, so move its
+    ``updated`` timestamp (the conditional GET validator) by hand.
+    """
+    if action == 'pre_clear' and reverse:
+        # The cleared organizations are only known before the clear
+        instance._cleared_organizations = list(instance.organization_set.values_list('pk', flat=True))
+        return
+    if action not in ('post_add', 'post_remove', 'post_clear'):
+        return
+    if not reverse:
+        organization_ids = [instance.pk]
+    elif action == 'post_clear':
+        organization_ids = getattr(instance, '_cleared_organizations', [])
+    else:
+        organization_ids = pk_set or []
+    Organization.objects.filter(pk__in=organization_ids).update(updated=timezone.now())
+    OrganizationSignature.objects.refresh(organization_ids)
+    bump_data_version()
+
+
+@receiver(pre_save, sender=Organization)
+def remember_previous_state(sender, instance, raw=False, **kwargs):
+    """Snapshot the stored row so post_save can work out what changed."""
+    instance._previous_state = None
+    if raw or instance._state.adding:
+        return
+    instance._previous_state = (
+        Organization.objects.filter(pk=instance.pk).values(*PREVIOUS_STATE_FIELDS).first()
+    )
+
+
+@receiver(post_save, sender=Organization)
+def refresh_search_vector(sender, instance, raw=False, **kwargs):
+    """Keep the stored tsvector in step with name, description and tags."""
+    if raw:
+        return
+    Organization.objects.filter(pk=instance.pk).update_search_vector()
+
+
+@receiver(post_save, sender=Organization)
+def clear_tombstone(sender, instance, created, raw=False, **kwargs):
+    # An id can come back, e.g. when a seed file is imported again
+    if created:
+        OrganizationTombstone.objects.filter(organization_id=instance.pk).delete()
+
+
+@receiver(post_delete, sender=Organization)
+def record_tombstone(sender, instance, **kwargs):
+    OrganizationTombstone.objects.update_or_create(
+        organization_id=instance.pk, defaults={'deleted': timezone.now()},
+    )
+
+
+@receiver(post_save, sender=Organization)
+def update_signature(sender, instance, raw=False, **kwargs):
+    """Recompute the similarity signature when its inputs may have changed."""
+    if raw:
+        return
+    previous = getattr(instance, '_previous_state', None)
+    if previous and previous['tags'] == instance.tags and previous['description'] == instance.description:
+        # Membership changes are picked up by touch_memberships
+        return
+    OrganizationSignature.objects.refresh([instance.pk])
+
+
+@receiver(post_save, sender=Organization)
+def update_tag_usage(sender, instance, raw=False, **kwargs):
+    if raw:
+        return
+    previous = getattr(instance, '_previous_state', None) or {}
+    _adjust_tag_usage({
+        TagUsage.TAG: (previous.get('tags'), instance.tags),
+        TagUsage.CERTIFICATION: (previous.get('certifications'), instance.certifications),
+    })
+
+
+@receiver(post_delete, sender=Organization)
+def release_tag_usage(sender, instance, **kwargs):
+    _adjust_tag_usage({
+        TagUsage.TAG: (instance.tags, None),
+        TagUsage.CERTIFICATION: (instance.certifications, None),
+    })
+
+
+def _adjust_tag_usage(changes):
+    """Apply ``{kind: (old values, new values)}`` to the usage counts in one upsert."""
+    deltas = {}
+    for kind, (old, new) in changes.items():
+        old, new = usage_names(old), usage_names(new)
+        deltas.update({(kind, name): {'count': 1} for name in new - old})
+        deltas.update({(kind, name): {'count': -1} for name in old - new})
+    TagUsage.objects.increment(deltas)
+
+
+@receiver(post_save, sender=Organization)
+def update_geo_clusters(sender, instance, raw=False, **kwargs):
+    if raw:
+        return
+    previous = getattr(instance, '_previous_state', None)
+    if previous and previous['type'] == instance.type and previous['location'] == instance.location_id:
+        # Coordinate edits on the location itself are handled by its own signals
+        return
+    shifts = [(instance.type, *_location_point(instance.location_id), 1)]
+    if previous:
+        old_point = tuple(previous[f'location__{field}'] for field in LOCATION_POINT_FIELDS)
+        shifts.append((previous['type'], *old_point, -1))
+    GeoCluster.objects.shift_many(shifts)
+
+
+@receiver(post_delete, sender=Organization)
+def release_geo_clusters(sender, instance, **kwargs):
+    GeoCluster.objects.shift(instance.type, *_location_point(instance.location_id), -1)
+
+
+@receiver(pre_save, sender=Location)
+def remember_previous_point(sender, instance, raw=False, **kwargs):
+    instance._previous_point = instance._previous_country = None
+    if raw or instance._state.adding:
+        return
+    row = Location.objects.filter(pk=instance.pk).values_list(*LOCATION_POINT_FIELDS, 'country').first()
+    if row:
+        instance._previous_point, instance._previous_country = row[:-1], row[-1]
+
+
+@receiver(post_save, sender=Location)
+def move_geo_clusters(sender, instance, raw=False, **kwargs):
+    previous = getattr(instance, '_previous_point', None)
+    point = (instance.geohash, instance.latitude, instance.longitude)
+    if raw or not previous or previous == point:
+        return
+    shifts = []
+    for org_type, count in _located_types(instance):
+        shifts.extend([(org_type, *previous, -count), (org_type, *point, count)])
+    GeoCluster.objects.shift_many(shifts)
+
+
+@receiver(pre_delete, sender=Location)
+def release_location_clusters(sender, instance, **kwargs):
+    # Organizations are detached with a bulk SET NULL that sends no signals
+    point = _location_point(instance.pk)
+    GeoCluster.objects.shift_many((org_type, *point, -count) for org_type, count in _located_types(instance))
+
+
+@receiver(post_save, sender=Organization)
+def update_stats(sender, instance, raw=False, **kwargs):
+    if raw:
+        return
+    previous = getattr(instance, '_previous_state', None)
+    deltas = Counter()
+    if previous:
+        deltas.subtract(stats_keys(dict(previous, country=previous['location__country'])))
+    if previous and previous['location'] == instance.location_id:
+        # Edits of the location itself are counted by its own signals
+        country = previous['location__country']
+    else:
+        country = _location_country(instance.location_id)
+    values = {field: getattr(instance, field) for field in STATS_FIELDS}
+    deltas.update(stats_keys(dict(values, country=country)))
+    _adjust_stats(deltas)
+
+
+@receiver(post_delete, sender=Organization)
+def release_stats(sender, instance, **kwargs):
+    values = {field: getattr(instance, field) for field in STATS_FIELDS}
+    deltas = Counter()
+    deltas.subtract(stats_keys(dict(values, country=_location_country(instance.location_id))))
+    _adjust_stats(deltas)
+
+
+@receiver(post_save, sender=Location)
+def move_country_stats(sender, instance, raw=False, **kwargs):
+    if raw or instance._previous_country is None:
+        return
+    _move_country(instance, instance._previous_country, instance.country)
+
+
+@receiver(pre_delete, sender=Location)
+def release_country_stats(sender, instance, **kwargs):
+    _move_country(instance, _location_country(instance.pk), '')
+
+
+def _move_country(location, old, new):
+    old, new = (old or '').strip(), (new or '').strip()
+    if old == new:
+        return
+    count = Organization.objects.filter(location=location).count()
+    _adjust_stats({(OrganizationStats.COUNTRY, old): -count, (OrganizationStats.COUNTRY, new): count})
+
+
+def _adjust_stats(deltas):
+    deltas = {key: delta for key, delta in deltas.items() if delta}
+    if deltas:
+        OrganizationStats.objects.adjust(deltas)
+
+
+def _location_country(location_id):
+    if location_id is None:
+        return ''
+    return Location.objects.filter(pk=location_id).values_list('country', flat=True).first() or ''
+
+
+def _location_point(location_id):
+    if location_id is None:
+        return None, None, None
+    point = Location.objects.filter(pk=location_id).values_list(*LOCATION_POINT_FIELDS).first()
+    return point or (None, None, None)
+
+
+def _located_types(location):
+    """``(type, count)`` of the organizations placed at ``location``."""
+    return (
+        Organization.objects.filter(location=location)
+        .values_list('type').annotate(count=Count('id')).order_by()
+    )
@@ -0,0 +1,153 @@
+"""
+Geohash encoding and the spatial filters used by the organization API.
+
+Locations store a geohash next to their coordinates. A bounding box is
+covered by a handful of geohash prefixes, each of which is a B-tree range
+scan on ``Location.geohash``; the exact box and the distance ordering are
+then evaluated in SQL on that small candidate set only.
+"""
+import math
+
+from django.db.models import F, FloatField, Q, Value
+from django.db.models.functions import ASin, Cos, Least, Power, Radians, Sin, Sqrt
+
+GEOHASH_ALPHABET = '0123456789bcdefghjkmnpqrstuvwxyz'
+GEOHASH_PRECISION = 9  # ~5 m cells, the precision stored on Location
+MAX_COVER_CELLS = 32
+CLUSTER_PRECISIONS = range(1, 8)  # precomputed map cluster levels, ~5000 km down to ~150 m
+EARTH_RADIUS_KM = 6371.0
+KM_PER_DEGREE = math.pi * EARTH_RADIUS_KM / 180
+
+
+def encode_geohash(lat, lon, precision=GEOHASH_PRECISION):
+    lat_range, lon_range = [-90.0, 90.0], [-180.0, 180.0]
+    chars, bits, value, even = [], 0, 0, True
+    while len(chars) < precision:
+        interval, coordinate = (lon_range, lon) if even else (lat_range, lat)
+        middle = (interval[0] + interval[1]) / 2
+        value <<= 1
+        if coordinate >= middle:
+            value |= 1
+            interval[0] = middle
+        else:
+            interval[1] = middle
+        even = not even
+        bits += 1
+        if bits == 5:
+            chars.append(GEOHASH_ALPHABET[value])
+            bits, value = 0, 0
+    return ''.join(chars)
+
+
+def cell_size(precision):
+    """``(height, width)`` in degrees of a geohash cell."""
+    total_bits = 5 * precision
+    lon_bits = (total_bits + 1) // 2
+    lat_bits = total_bits // 2
+    return 180.0 / (1 << lat_bits), 360.0 / (1 << lon_bits)
+
+
+def _cell_range(low, high, origin, size, cells):
+    first = max(0, min(cells - 1, int((low - origin) // size)))
+    last = max(0, min(cells - 1, int((high - origin) // size)))
+    return range(first, last + 1)
+
+
+def cover_bbox(bbox, max_cells=MAX_COVER_CELLS, max_precision=GEOHASH_PRECISION):
+    """
+    Return the geohash prefixes of the finest precision (up to
+    ``max_precision``) whose cells cover ``bbox = (min_lat, min_lon,
+    max_lat, max_lon)`` in at most ``max_cells`` cells. Boxes must not
+    cross the antimeridian; see :func:`split_bbox`.
+    """
+    min_lat, min_lon, max_lat, max_lon = bbox
+    cover = ['']
+    for precision in range(1, max_precision + 1):
+        height, width = cell_size(precision)
+        rows = _cell_range(min_lat, max_lat, -90.0, height, round(180 / height))
+        columns = _cell_range(min_lon, max_lon, -180.0, width, round(360 / width))
+        if len(rows) * len(columns) > max_cells:
+            break
+        cover = [
+            encode_geohash(-90.0 + (row + 0.5) * height, -180.0 + (column + 0.5) * width, precision)
+            for row in rows
+            for column in columns
+        ]
+    return cover
+
+
+def zoom_precision(zoom):
+    """Cluster geohash precision for a web map zoom level (0-20)."""
+    return min(CLUSTER_PRECISIONS[-1], max(CLUSTER_PRECISIONS[0], (zoom + 3) // 2))
+
+
+def split_bbox(min_lat, min_lon, max_lat, max_lon):
+    """Split a box crossing the antimeridian (``min_lon > max_lon``) in two."""
+    if min_lon <= max_lon:
+        return [(min_lat, min_lon, max_lat, max_lon)]
+    return [(min_lat, min_lon, max_lat, 180.0), (min_lat, -180.0, max_lat, max_lon)]
+
+
+def bbox_around(lat, lon, radius_km):
+    """Boxes (already split at the antimeridian) containing a circle."""
+    dlat = radius_km / KM_PER_DEGREE
+    min_lat, max_lat = max(-90.0, lat - dlat), min(90.0, lat + dlat)
+    if min_lat <= -90.0 or max_lat >= 90.0:
+        return [(min_lat, -180.0, max_lat, 180.0)]
+    dlon = dlat / max(math.cos(math.radians(lat)), 1e-12)
+    if dlon >= 180.0:
+        return [(min_lat, -180.0, max_lat, 180.0)]
+    min_lon = (lon - dlon + 540.0) % 360.0 - 180.0
+    max_lon = (lon + dlon + 540.0) % 360.0 - 180.0
+    return split_bbox(min_lat, min_lon, max_lat, max_lon)
+
+
+def parse_bbox(value):
+    """
+    Parse ``min_lon,min_lat,max_lon,max_lat`` (west, south, east, north).
+    Returns a list of boxes in ``(min_lat, min_lon, max_lat, max_lon)``
+    order, or raises ValueError.
+    """
+    west, south, east, north = (float(part) for part in value.split(','))
+    if not (-90 <= south <= north <= 90 and -180 <= west <= 180 and -180 <= east <= 180):
+        raise ValueError(value)
+    return split_bbox(south, west, north, east)
+
+
+def parse_point(value):
+    """Parse ``lat,lon`` or raise ValueError."""
+    lat, lon = (float(part) for part in value.split(','))
+    if not (-90 <= lat <= 90 and -180 <= lon <= 180):
+        raise ValueError(value)
+    return lat, lon
+
+
+def within_bboxes(boxes, prefix='location__'):
+    """
+    Q object matching locations inside any of ``boxes``: an OR of geohash
+    prefix scans narrowed by exact coordinate ranges.
+    """
+    query = Q()
+    for box in boxes:
+        min_lat, min_lon, max_lat, max_lon = box
+        cells = Q()
+        for cell in cover_bbox(box):
+            cells |= Q(**{f'{prefix}geohash__startswith': cell})
+        query |= cells & Q(**{
+            f'{prefix}latitude__range': (min_lat, max_lat),
+            f'{prefix}longitude__range': (min_lon, max_lon),
+        })
+    return query
+
+
+def distance_km(lat, lon, prefix='location__'):
+    """Haversine distance from ``(lat, lon)`` as a SQL expression, in km."""
+    lat_rad = math.radians(lat)
+    half_dlat = (Radians(F(f'{prefix}latitude')) - Value(lat_rad)) / 2
+    half_dlon = (Radians(F(f'{prefix}longitude')) - Value(math.radians(lon))) / 2
+    haversine = (
+        Power(Sin(half_dlat), 2)
+        + Value(math.cos(lat_rad)) * Cos(Radians(F(f'{prefix}latitude'))) * Power(Sin(half_dlon), 2)
+    )
+    # Rounding can push the haversine term a hair above 1 for antipodes
+    return ASin(Least(Sqrt(haversine), Value(1.0)), output_field=FloatField()) * Value(2 * EARTH_RADIUS_KM)
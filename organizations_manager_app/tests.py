@@ -1,3 +1,1550 @@
-from django.test import TestCase
+import base64
+import csv
+import datetime
+import decimal
+import gzip
+import io
+import json
+import math
+import os
+import random
+import uuid
+import tempfile
+import threading
+import time
+from collections import Counter
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from unittest import mock
+from urllib.parse import parse_qs, urlencode, urlparse
 
-# Create your tests here.
+from django.core.management import call_command
+from django.db import connection, connections
+from django.test import SimpleTestCase, TestCase, TransactionTestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+from rest_framework.renderers import JSONRenderer
+from rest_framework.test import APITestCase
+
+from organizations_manager_app.autocomplete import PrefixIndex
+from organizations_manager_app.caching import LRUResponseCache
+from organizations_manager_app.exporter import CSV_HEADER
+from organizations_manager_app.dedup import DedupIndex, deduplicate, normalize_domain, normalize_email, normalize_name
+from organizations_manager_app.geocoding import (
+    GazetteerBackend,
+    GeocodeCache,
+    Geocoder,
+    KDTree,
+    NominatimBackend,
+    RateLimiter,
+)
+from organizations_manager_app.importer import RELATED_TABLES, rebuild_aggregates
+from organizations_manager_app.minhash import band_keys, estimate_jaccard, organization_features, signature
+from organizations_manager_app.jsonstream import iter_json_records, write_json_array, write_ndjson
+from organizations_manager_app.nace import NaceClassifier, load_nace_codes, nace_ancestors, tokenize
+from organizations_manager_app.renderers import FastJSONRenderer
+from organizations_manager_app.spatial import encode_geohash
+from organizations_manager_app.models import (
+    ContactInformation,
+    GeoCluster,
+    Industry,
+    Location,
+    Organization,
+    OrganizationSignature,
+    OrganizationStats,
+    OwnershipStructure,
+    TagUsage,
+)
+
+
+def make_organization(name, **fields):
+    values = {
+        'type': 'cooperative',
+        'legal_structure': 'cooperative',
+        'geo_scope': 'local',
+        'size': 'small',
+    }
+    values.update(fields)
+    return Organization.objects.create(name=name, **values)
+
+
+def make_located(name, latitude, longitude, **fields):
+    location = Location.objects.create(city=name, latitude=latitude, longitude=longitude)
+    return make_organization(name, location=location, **fields)
+
+
+class FakeNominatim:
+    """
+    Local HTTP server answering ``/reverse`` like Nominatim. The city is
+    derived from the coordinates; a latitude of 13 answers with a 500.
+    Request times are recorded to check the rate limiting.
+    """
+
+    def __init__(self):
+        self.requests = []
+        fake = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_GET(self):
+                query = parse_qs(urlparse(self.path).query)
+                lat, lon = float(query['lat'][0]), float(query['lon'][0])
+                fake.requests.append((time.monotonic(), lat, lon))
+                if lat == 13:
+                    self.send_response(500)
+                    self.end_headers()
+                    return
+                body = json.dumps({'address': {'town': f'Town {lat:g}', 'country': f'Country {lon:g}'}}).encode()
+                self.send_response(200)
+                self.send_header('Content-Type', 'application/json')
+                self.send_header('Content-Length', str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, *args):
+                pass
+
+        self.server = ThreadingHTTPServer(('127.0.0.1', 0), Handler)
+        self.url = f'http://127.0.0.1:{self.server.server_address[1]}'
+        self.thread = threading.Thread(target=self.server.serve_forever, daemon=True)
+        self.thread.start()
+
+    def close(self):
+        self.server.shutdown()
+        self.server.server_close()
+
+
+class GeocoderTests(SimpleTestCase):
+    def setUp(self):
+        self.fake = FakeNominatim()
+        self.addCleanup(self.fake.close)
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        self.cache_path = os.path.join(directory.name, 'geocode.sqlite3')
+
+    def geocoder(self, **kwargs):
+        cache = GeocodeCache(self.cache_path)
+        self.addCleanup(cache.close)
+        kwargs.setdefault('rate', 0)
+        return Geocoder(NominatimBackend(self.fake.url), cache=cache, **kwargs)
+
+    def test_resolves_through_the_backend(self):
+        self.assertEqual(self.geocoder().reverse(48.5, 2.25), ('Town 48.5', 'Country 2.25'))
+
+    def test_duplicate_coordinates_are_looked_up_once(self):
+        places = self.geocoder().reverse_many([(1, 2), (1, 2), (1.00001, 2), (3, 4)])
+        self.assertEqual(places[0], places[1])
+        self.assertEqual(places[0], places[2])  # same key once rounded to 4 places
+        self.assertEqual(len(self.fake.requests), 2)
+
+    def test_results_are_cached_on_disk(self):
+        coords = [(10, 20), (11, 21)]
+        first = self.geocoder().reverse_many(coords)
+        self.assertEqual(len(self.fake.requests), 2)
+
+        self.assertEqual(self.geocoder().reverse_many(coords), first)
+        self.assertEqual(len(self.fake.requests), 2)
+        self.assertEqual(self.geocoder(offline=True).reverse_many(coords), first)
+
+    def test_failures_are_not_cached(self):
+        with self.assertLogs('organizations_manager_app.geocoding', 'WARNING'):
+            self.assertEqual(self.geocoder().reverse(13, 1), ('', ''))
+        self.assertEqual(self.geocoder(offline=True).reverse(13, 1), ('', ''))
+        self.assertEqual(len(self.fake.requests), 1)
+
+        with self.assertLogs('organizations_manager_app.geocoding', 'WARNING'):
+            self.geocoder().reverse(13, 1)
+        self.assertEqual(len(self.fake.requests), 2)
+
+    def test_offline_geocoder_never_calls_the_backend(self):
+        self.assertEqual(self.geocoder(offline=True).reverse_many([(5, 6), (7, 8)]), [('', ''), ('', '')])
+        self.assertEqual(self.fake.requests, [])
+
+    def test_concurrent_requests_are_rate_limited(self):
+        rate = 20
+        self.geocoder(rate=rate, max_workers=4).reverse_many([(lat, 0) for lat in range(6)])
+        times = sorted(when for when, _, _ in self.fake.requests)
+        self.assertEqual(len(times), 6)
+        gaps = [later - earlier for earlier, later in zip(times, times[1:])]
+        # Allow for scheduling jitter between the limiter and the server
+        self.assertGreaterEqual(min(gaps), 0.8 / rate)
+        self.assertGreaterEqual(times[-1] - times[0], 5 * 0.9 / rate)
+
+    def test_rate_limiter_without_rate_does_not_wait(self):
+        limiter = RateLimiter(0)
+        started = time.monotonic()
+        for _ in range(100):
+            limiter.wait()
+        self.assertLess(time.monotonic() - started, 0.05)
+
+
+class GazetteerTests(SimpleTestCase):
+    @staticmethod
+    def vector(lat, lon):
+        lat, lon = math.radians(lat), math.radians(lon)
+        return math.cos(lat) * math.cos(lon), math.cos(lat) * math.sin(lon), math.sin(lat)
+
+    def test_nearest_matches_brute_force(self):
+        rng = random.Random(8)
+        points = [(rng.uniform(-90, 90), rng.uniform(-180, 180)) for _ in range(1000)]
+        # A dense cluster, the poles and both sides of the antimeridian
+        points += [(48 + rng.random(), 2 + rng.random()) for _ in range(200)]
+        points += [(89.9, 0.0), (-89.9, 90.0), (10.0, 179.99), (10.0, -179.99)]
+        tree = KDTree([lat for lat, _ in points], [lon for _, lon in points])
+        self.assertEqual(len(tree), len(points))
+
+        queries = [(rng.uniform(-90, 90), rng.uniform(-180, 180)) for _ in range(1800)]
+        queries += [(48.5 + rng.random() / 10, 2.5 + rng.random() / 10) for _ in range(200)]
+        queries += [(90.0, 45.0), (-90.0, 0.0), (10.0, 180.0), (10.0, -180.0)]
+        vectors = [self.vector(*point) for point in points]
+        mismatches = 0
+        for query in queries:
+            qx, qy, qz = self.vector(*query)
+            closest = min((x - qx) ** 2 + (y - qy) ** 2 + (z - qz) ** 2 for x, y, z in vectors)
+            mismatches += not math.isclose(tree.nearest(*query)[1], closest, abs_tol=1e-12)
+        self.assertEqual(mismatches, 0)
+
+    def test_empty_tree(self):
+        self.assertEqual(KDTree([], []).nearest(0, 0), (None, math.inf))
+
+    def test_backend(self):
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        cities = os.path.join(directory.name, 'cities.txt')
+        countries = os.path.join(directory.name, 'countryInfo.txt')
+        with open(cities, 'w', encoding='utf-8') as fp:
+            for number, (name, lat, lon, code) in enumerate((
+                ('Paris', 48.85, 2.35, 'FR'), ('Lyon', 45.76, 4.83, 'FR'), ('Suva', -18.14, 178.44, 'FJ'),
+            )):
+                fp.write('\t'.join([str(number), name, name, '', str(lat), str(lon), 'P', 'PPLC', code]) + '\n')
+            fp.write('broken line\n')
+        with open(countries, 'w', encoding='utf-8') as fp:
+            fp.write('#ISO\tISO3\tISO-Numeric\tfips\tCountry\n')
+            fp.write('FR\tFRA\t250\tFR\tFrance\n')
+
+        backend = GazetteerBackend(cities, country_info=countries, max_distance_km=500)
+        self.assertEqual(backend.reverse(48.0, 2.0), ('Paris', 'France'))
+        self.assertEqual(backend.reverse_many([(45.0, 5.0), (-17.0, -179.5)]), [('Lyon', 'France'), ('Suva', 'FJ')])
+        self.assertEqual(backend.reverse(0.0, 0.0), ('', ''))
+
+
+NACE_CODES_FILE = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'NACEcodes.txt')
+
+
+class NaceClassifierTests(SimpleTestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.classifier = NaceClassifier.from_file(NACE_CODES_FILE)
+
+    def test_known_descriptions(self):
+        for description, code in (
+            ('We bake bread and pastries', 'C10.7.1'),
+            ('Processing and preserving of poultry meat', 'C10.1.2'),
+            ('Computer programming and software consultancy', 'J62'),
+            ('Growing of grapes for our vineyard', 'A1.2.1'),
+            ('Solar power generation', 'D35.1'),
+        ):
+            with self.subTest(description=description):
+                self.assertEqual(self.classifier.best_code(description), code)
+
+    def test_stop_words_alone_match_nothing(self):
+        for description in ('the of and with services activities', 'Other related activities n.e.c.', '', 'Zzyzx qwerty'):
+            with self.subTest(description=description):
+                self.assertEqual(self.classifier.classify(description, k=3), [])
+                self.assertIsNone(self.classifier.best_code(description))
+
+    def test_ranking(self):
+        classifier = NaceClassifier({
+            'A': 'Farming of animals',
+            'A1': 'Farming of cattle',
+            'A2': 'Farming of sheep and goats',
+            'B': 'Mining of coal',
+        })
+        # 'farming' is in three of four descriptions, so 'cattle' decides
+        self.assertEqual([code for code, _ in classifier.classify('cattle farming', k=2)], ['A1', 'A'])
+        self.assertEqual(classifier.classify('farmed animals', k=1)[0][0], 'A')
+        self.assertEqual(classifier.classify_many(['coal', 'cattle', 'coal']), [
+            classifier.classify('coal'), classifier.classify('cattle'), classifier.classify('coal'),
+        ])
+        # Equal scores go to the code listed first
+        tied = NaceClassifier({'X': 'Widgets', 'X1': 'Widgets'})
+        self.assertEqual(tied.best_code('widgets'), None)  # in every description: no information
+        tied = NaceClassifier({'X': 'Widgets', 'X1': 'Widgets', 'Y': 'Gadgets'})
+        self.assertEqual(tied.best_code('widgets'), 'X')
+
+    def test_helpers(self):
+        self.assertEqual(tokenize('Farming, farms and the FARMERS'), {'farm'})
+        self.assertEqual(nace_ancestors('C10.7.1'), ['C', 'C10', 'C10.7', 'C10.7.1'])
+        self.assertEqual(nace_ancestors('odd-code'), ['odd-code'])
+        self.assertEqual(load_nace_codes(NACE_CODES_FILE)['C10'], 'Manufacture of food products')
+
+
+class KeysetPaginationTests(APITestCase):
+    def setUp(self):
+        self.organizations = [make_organization(f'Org {number:02}') for number in range(23)]
+        # Ties on created must still be split by id
+        Organization.objects.filter(name__in=['Org 03', 'Org 04', 'Org 05']).update(created=timezone.now())
+
+    def walk(self, url):
+        ids = []
+        pages = 0
+        while url:
+            response = self.client.get(url)
+            self.assertEqual(response.status_code, 200)
+            data = response.json()
+            ids.extend(row['id'] for row in data['results'])
+            self.assertEqual(data['has_more'], data['next'] is not None)
+            self.assertNotIn('count', data)
+            url = data['next']
+            pages += 1
+        return ids, pages
+
+    def expected_ids(self):
+        return [str(pk) for pk in Organization.objects.order_by('-created', '-id').values_list('id', flat=True)]
+
+    def test_pages_cover_every_row_once_in_order(self):
+        ids, pages = self.walk('/api/organizations/?page_size=5')
+        self.assertEqual(ids, self.expected_ids())
+        self.assertEqual(pages, 5)
+
+    def test_filter_endpoint_pages(self):
+        ids, _ = self.walk('/api/organizations/filter/?type=cooperative&page_size=4')
+        self.assertEqual(ids, self.expected_ids())
+
+    def test_rows_added_during_a_walk_are_not_repeated(self):
+        first = self.client.get('/api/organizations/?page_size=10').json()
+        make_organization('Newcomer')
+        rest, _ = self.walk(first['next'])
+        ids = [row['id'] for row in first['results']] + rest
+        self.assertEqual(len(ids), len(set(ids)))
+        self.assertEqual(len(ids), 23)
+
+    def test_pages_do_not_depend_on_the_offset(self):
+        # Validators, one range query for the rows and their ownership structures
+        second = self.client.get('/api/organizations/?page_size=10').json()['next']
+        with self.assertNumQueries(3):
+            self.client.get(second)
+        with self.assertNumQueries(3):
+            response = self.client.get('/api/organizations/?page_size=10')
+        self.assertEqual(len(response.json()['results']), 10)
+
+    def test_count_is_opt_in(self):
+        data = self.client.get('/api/organizations/?page_size=10&count=true').json()
+        self.assertEqual(data['count'], 23)
+
+    def test_page_size_bounds(self):
+        self.assertEqual(len(self.client.get('/api/organizations/?page_size=0').json()['results']), 23)
+        self.assertEqual(len(self.client.get('/api/organizations/?page_size=abc').json()['results']), 23)
+
+    def test_invalid_cursor_is_not_found(self):
+        self.assertEqual(self.client.get('/api/organizations/?cursor=not-a-cursor').status_code, 404)
+        self.assertEqual(self.client.get('/api/organizations/?cursor=WzFd').status_code, 404)  # [1]
+
+    def test_tampered_cursor_is_not_found(self):
+        for position in (['garbage', 'x'], [None, str(uuid.uuid4())], [timezone.now().isoformat(), 'x'], [{}, []]):
+            cursor = base64.urlsafe_b64encode(json.dumps(position).encode()).decode()
+            for url in ('/api/organizations/?', '/api/organizations/filter/?', '/api/organizations/filter/?q=org&'):
+                with self.subTest(position=position, url=url):
+                    self.assertEqual(self.client.get(f'{url}cursor={cursor}').status_code, 404)
+
+
+def seed_entry(name, **fields):
+    """One organization in the seed file layout written by ``csvconvert``."""
+    entry = {
+        'id': str(uuid.uuid4()),
+        'name': name,
+        'description': f'About {name}',
+        'type': 'cooperative',
+        'industry': 'C10.1',
+        'ownership_structure': ['Worker-Owned'],
+        'legal_structure': 'cooperative',
+        'geo_scope': 'local',
+        'size': 'small',
+        'location': {'city': 'Lyon', 'country': 'France', 'latitude': 45.76, 'longitude': 4.84},
+        'links_social_media': {'website': f'https://{name.lower().replace(" ", "")}.example'},
+        'contact_information': {'email': 'hello@example.org'},
+        'tags': ['food'],
+    }
+    entry.update(fields)
+    return entry
+
+
+class SeedDataTests(TestCase):
+    def setUp(self):
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        self.directory = directory.name
+        self.entries = [seed_entry(f'Bakery {number}', tags=['food', f'tag {number % 3}']) for number in range(7)]
+
+    def write(self, entries, name='seed.ndjson'):
+        path = os.path.join(self.directory, name)
+        with open(path, 'w', encoding='utf-8') as fp:
+            (write_ndjson if name.endswith('.ndjson') else write_json_array)(entries, fp)
+        return path
+
+    def seed(self, path, *args):
+        stdout = io.StringIO()
+        call_command('seeddata', path, *args, stdout=stdout)
+        return stdout.getvalue()
+
+    def reset(self):
+        Organization.objects.all().delete()
+        for model, _ in RELATED_TABLES.values():
+            model.objects.all().delete()
+
+    def snapshot(self):
+        return {
+            'organizations': sorted(Organization.objects.values_list('id', 'name', 'tags', 'location__city')),
+            'locations': Location.objects.count(),
+            'contacts': ContactInformation.objects.count(),
+            'memberships': Organization.ownership_structures.through.objects.count(),
+            'tags': sorted(TagUsage.objects.values_list('kind', 'name', 'count')),
+            'stats': sorted(OrganizationStats.objects.values_list('dimension', 'value', 'count')),
+        }
+
+    def test_import_is_idempotent(self):
+        path = self.write(self.entries)
+        self.assertIn('(7 created, 0 updated)', self.seed(path, '--batch-size', '3'))
+        first = self.snapshot()
+        self.assertEqual(len(first['organizations']), 7)
+        self.assertEqual(first['locations'], 7)
+
+        self.assertIn('(0 created, 7 updated)', self.seed(path, '--batch-size', '3'))
+        self.assertEqual(self.snapshot(), first)
+
+    def test_reimport_updates_in_place(self):
+        self.seed(self.write(self.entries))
+        changed = dict(self.entries[0], name='Renamed', tags=['bread'], location={'city': 'Paris', 'country': 'France'})
+        self.seed(self.write([changed]))
+
+        organization = Organization.objects.get(id=changed['id'])
+        self.assertEqual((organization.name, organization.tags, organization.location.city), ('Renamed', ['bread'], 'Paris'))
+        self.assertEqual(Location.objects.count(), 7)
+        self.assertEqual(TagUsage.objects.get(kind=TagUsage.TAG, name='food').count, 6)
+        self.assertEqual(TagUsage.objects.get(kind=TagUsage.TAG, name='bread').count, 1)
+
+    def test_batch_size_does_not_change_the_result(self):
+        path = self.write(self.entries)
+        self.seed(path, '--batch-size', '1')
+        one_by_one = self.snapshot()
+        self.reset()
+        self.seed(path, '--batch-size', '500')
+        self.assertEqual(self.snapshot(), one_by_one)
+
+    def test_later_duplicate_of_an_id_wins(self):
+        duplicate = dict(self.entries[2], name='Second copy')
+        self.seed(self.write([*self.entries, duplicate]))
+        self.assertEqual(Organization.objects.count(), 7)
+        self.assertEqual(Organization.objects.get(id=duplicate['id']).name, 'Second copy')
+
+    def test_json_array_and_ndjson_import_the_same(self):
+        self.seed(self.write(self.entries, 'seed.json'))
+        from_array = self.snapshot()
+        self.reset()
+        self.seed(self.write(self.entries, 'seed.ndjson'))
+        self.assertEqual(self.snapshot(), from_array)
+
+    def test_dedup_merges_into_existing_organizations(self):
+        self.seed(self.write(self.entries))
+        copy = seed_entry('BAKERY 3 Inc.', links_social_media={}, contact_information={})
+        fresh = seed_entry('Pastry Workshop', contact_information={'email': 'pastry@example.net'})
+        report_path = os.path.join(self.directory, 'report.ndjson')
+        self.seed(self.write([copy, fresh], 'new.ndjson'), '--dedup', '--merge-report', report_path)
+
+        self.assertEqual(Organization.objects.count(), 8)
+        self.assertEqual(Organization.objects.get(id=self.entries[3]['id']).name, 'BAKERY 3 Inc.')
+        with open(report_path, encoding='utf-8') as fp:
+            report = [json.loads(line) for line in fp]
+        self.assertEqual([(row['id'], row['matched_id']) for row in report], [(copy['id'], self.entries[3]['id'])])
+
+    def test_summary_tables_are_current_after_every_batch(self):
+        broken = [*self.entries[:5], dict(self.entries[5], id='not-a-uuid'), self.entries[6]]
+        with self.assertRaises(ValueError):
+            self.seed(self.write(broken), '--batch-size', '3')
+        self.assertEqual(Organization.objects.count(), 3)
+        maintained = aggregate_snapshot()
+        rebuild_aggregates()
+        self.assertEqual(aggregate_snapshot(), maintained)
+
+        changed = [
+            dict(entry, tags=['bread'], type='esop', location={'city': 'Oslo', 'latitude': 59.9, 'longitude': 10.7})
+            for entry in self.entries[::2]
+        ]
+        self.seed(self.write([*changed, *self.entries[1::2]]), '--batch-size', '2')
+        maintained = aggregate_snapshot()
+        rebuild_aggregates()
+        self.assertEqual(aggregate_snapshot(), maintained)
+
+    def test_dry_run_rolls_back(self):
+        output = self.seed(self.write(self.entries), '--dry-run')
+        self.assertIn('Dry run, rolled back', output)
+        self.assertFalse(Organization.objects.exists())
+
+
+class JSONStreamTests(SimpleTestCase):
+    records = [
+        {'id': 1, 'name': 'Plain'},
+        {'id': 22, 'name': 'Brackets ] and , inside "strings" \\ [', 'tags': []},
+        {'id': 333, 'name': 'Unicode caf\u00e9 \u2603', 'members': 1.5e3, 'nested': {'list': [1, [2, {}]]}},
+        12345,
+        None,
+    ]
+
+    def test_arrays_and_ndjson_parse_across_any_chunk_boundary(self):
+        array = io.StringIO()
+        write_json_array(self.records, array)
+        ndjson = io.StringIO()
+        write_ndjson(self.records, ndjson)
+        for text in (array.getvalue(), ndjson.getvalue(), json.dumps(self.records)):
+            for chunk_size in (1, 2, 7, 1 << 16):
+                with self.subTest(text=text[:20], chunk_size=chunk_size):
+                    self.assertEqual(list(iter_json_records(io.StringIO(text), chunk_size)), self.records)
+
+    def test_empty_inputs(self):
+        for text in ('', '   \n', '[]', ' [ \n ] '):
+            self.assertEqual(list(iter_json_records(io.StringIO(text), 2)), [])
+
+    def test_records_are_read_incrementally(self):
+        text = io.StringIO()
+        write_ndjson(({'id': number, 'padding': 'x' * 100} for number in range(1000)), text)
+        stream = io.StringIO(text.getvalue())
+        first = next(iter_json_records(stream, chunk_size=256))
+        self.assertEqual(first['id'], 0)
+        self.assertLess(stream.tell(), 1024)
+
+    def test_malformed_input_raises(self):
+        for text in ('[{"id": 1} {"id": 2}]', '[{"id": 1},', '{"id": 1}\n{"id": '):
+            with self.subTest(text=text), self.assertRaises(json.JSONDecodeError):
+                list(iter_json_records(io.StringIO(text), 3))
+
+
+class FastJSONRendererTests(APITestCase):
+    data = {
+        'name': 'Caf\u00e9 \u2603',
+        'members': decimal.Decimal('1.50'),
+        'updated': datetime.datetime(2026, 1, 2, 3, 4, 5, 123456, tzinfo=datetime.timezone.utc),
+        'day': datetime.date(2026, 1, 2),
+        'id': uuid.UUID(int=5),
+        'values': [1, 1.1, None, True],
+    }
+
+    def test_output_matches_drf(self):
+        for media_type in (None, 'application/json', 'application/json; indent=2'):
+            with self.subTest(media_type=media_type):
+                self.assertEqual(
+                    FastJSONRenderer().render(self.data, media_type),
+                    JSONRenderer().render(self.data, media_type),
+                )
+
+    def test_plain_json_media_type(self):
+        make_organization('Renderer')
+        for url, headers in (
+            ('/api/organizations/', {}),
+            ('/api/organizations/', {'HTTP_ACCEPT': 'application/json'}),
+            ('/api/organizations/?format=json', {}),
+        ):
+            with self.subTest(url=url, headers=headers):
+                response = self.client.get(url, **headers)
+                self.assertEqual(response.status_code, 200)
+                self.assertEqual(response['Content-Type'], 'application/json')
+                self.assertIsInstance(response.accepted_renderer, FastJSONRenderer)
+
+
+class SpatialFilterTests(APITestCase):
+    def setUp(self):
+        make_located('Suva', -18.14, 178.44)
+        make_located('Apia', -13.83, -171.76)
+        make_located('Paris', 48.86, 2.35)
+        make_located('London', 51.51, -0.13)
+        make_located('Lisbon', 38.72, -9.14)
+        make_organization('Nowhere')
+
+    def names(self, query):
+        response = self.client.get(f'/api/organizations/filter/?{query}')
+        self.assertEqual(response.status_code, 200)
+        data = response.json()
+        return [row['name'] for row in data['results']], data.get('warnings', [])
+
+    def test_bbox(self):
+        names, warnings = self.names('bbox=-10,35,5,50')
+        self.assertEqual(sorted(names), ['Lisbon', 'Paris'])
+        self.assertEqual(warnings, [])
+
+    def test_bbox_crossing_the_antimeridian(self):
+        names, _ = self.names('bbox=170,-25,-165,-5')
+        self.assertEqual(sorted(names), ['Apia', 'Suva'])
+        names, _ = self.names('bbox=-165,-25,170,-5')
+        self.assertEqual(names, [])
+
+    def test_near_is_ordered_by_distance(self):
+        response = self.client.get('/api/organizations/filter/?near=48.86,2.35&radius_km=2000&page_size=2')
+        data = response.json()
+        self.assertEqual([row['name'] for row in data['results']], ['Paris', 'London'])
+        self.assertEqual([round(row['distance_km']) for row in data['results']], [0, 343])
+        rest = self.client.get(data['next']).json()['results']
+        self.assertEqual([row['name'] for row in rest], ['Lisbon'])
+        self.assertEqual(self.names('near=48.86,2.35&radius_km=400')[0], ['Paris', 'London'])
+
+    def test_near_across_the_antimeridian(self):
+        self.assertEqual(self.names('near=-16,179.9&radius_km=1200')[0], ['Suva', 'Apia'])
+
+    def test_invalid_coordinates_are_rejected(self):
+        everything = Organization.objects.count()
+        for query in (
+            'bbox=1,2,3', 'bbox=a,b,c,d', 'bbox=0,60,10,50', 'bbox=-190,0,10,10', 'bbox=0,-95,10,10',
+            'near=91,0', 'near=0,181', 'near=paris', 'near=48,2&radius_km=0', 'near=48,2&radius_km=x',
+            'near=48,2&radius_km=25000',
+        ):
+            with self.subTest(query=query):
+                names, warnings = self.names(f'{query}&page_size=50')
+                self.assertEqual(len(warnings), 1)
+                self.assertEqual(len(names), everything)
+
+
+class SyncTests(APITestCase):
+    def setUp(self):
+        self.start = timezone.now() - datetime.timedelta(days=10)
+        self.organizations = [make_organization(f'Sync {number}') for number in range(8)]
+        for number, organization in enumerate(self.organizations):
+            # Two organizations per timestamp, so ties have to be split by id
+            updated = self.start + datetime.timedelta(days=number // 2)
+            Organization.objects.filter(pk=organization.pk).update(updated=updated)
+
+    def walk(self, url):
+        rows = []
+        while url:
+            response = self.client.get(url)
+            self.assertEqual(response.status_code, 200)
+            data = response.json()
+            rows.extend(data['results'])
+            url = data['next']
+        return rows
+
+    def since(self, path, moment, **params):
+        return f'{path}?{urlencode({"updated_since": moment.isoformat(), **params})}'
+
+    def test_updated_since_pages_oldest_first(self):
+        since = self.start + datetime.timedelta(days=1)
+        rows = self.walk(self.since('/api/organizations/', since, page_size=3))
+        expected = Organization.objects.filter(updated__gte=since).order_by('updated', 'id')
+        self.assertEqual([row['id'] for row in rows], [str(pk) for pk in expected.values_list('id', flat=True)])
+        self.assertEqual(len(rows), 6)
+        self.assertEqual(len(self.walk('/api/organizations/?updated_since=2000-01-01&page_size=3')), 8)
+        self.assertEqual(self.walk(self.since('/api/organizations/', timezone.now() + datetime.timedelta(days=1))), [])
+
+    def test_edits_move_an_organization_to_the_end(self):
+        since = timezone.now()
+        organization = self.organizations[0]
+        organization.name = 'Edited'
+        organization.save()
+        self.assertEqual([row['name'] for row in self.walk(self.since('/api/organizations/', since))], ['Edited'])
+
+    def test_invalid_updated_since(self):
+        for url in ('/api/organizations/?updated_since=yesterday', '/api/organizations/deleted/?updated_since=2024-13-01'):
+            with self.subTest(url=url):
+                self.assertEqual(self.client.get(url).status_code, 400)
+
+    def test_deletes_leave_tombstones(self):
+        since = timezone.now()
+        gone, also_gone = self.organizations[3], self.organizations[5]
+        also_gone_id = str(also_gone.pk)
+        self.assertEqual(self.client.delete(f'/api/organizations/{gone.pk}/').status_code, 204)
+        also_gone.delete()
+
+        rows = self.walk('/api/organizations/deleted/?page_size=1')
+        self.assertEqual([row['id'] for row in rows], [str(gone.pk), also_gone_id])
+        self.assertEqual(len(self.walk(self.since('/api/organizations/deleted/', since))), 2)
+        later = timezone.now() + datetime.timedelta(seconds=1)
+        self.assertEqual(self.walk(self.since('/api/organizations/deleted/', later)), [])
+        self.assertNotIn(str(gone.pk), [row['id'] for row in self.walk('/api/organizations/?page_size=50')])
+
+        # Bringing an organization back removes its tombstone
+        make_organization('Back again', id=gone.pk)
+        self.assertEqual([row['id'] for row in self.walk('/api/organizations/deleted/')], [also_gone_id])
+
+
+class ExportTests(APITestCase):
+    def setUp(self):
+        structure = OwnershipStructure.objects.create(name='Worker-Owned')
+        self.bakery = make_located('Bakery', 45.76, 4.84, tags=['food', 'bread'], type='cooperative')
+        self.bakery.ownership_structures.add(structure)
+        self.dao = make_organization('Protocol DAO', type='dao', tags=['web3'])
+        make_organization('Caf\u00e9 \u2603', type='cooperative')
+
+    def export(self, query='', **headers):
+        response = self.client.get(f'/api/organizations/export/{query}', **headers)
+        self.assertEqual(response.status_code, 200)
+        return response, b''.join(response.streaming_content)
+
+    def test_ndjson(self):
+        response, body = self.export()
+        self.assertEqual(response['Content-Type'], 'application/x-ndjson; charset=utf-8')
+        self.assertNotIn('Content-Encoding', response)
+        records = [json.loads(line) for line in body.decode('utf-8').splitlines()]
+        expected = Organization.objects.order_by('created', 'id').values_list('id', flat=True)
+        self.assertEqual([record['id'] for record in records], [str(pk) for pk in expected])
+        bakery = next(record for record in records if record['name'] == 'Bakery')
+        self.assertEqual(bakery['ownership_structure'], ['Worker-Owned'])
+        self.assertEqual(bakery['tags'], ['food', 'bread'])
+        self.assertEqual(bakery['location']['city'], 'Bakery')
+        self.assertEqual(next(record for record in records if record['name'] == 'Protocol DAO')['location'], {})
+
+    def test_gzip(self):
+        _, plain = self.export()
+        response, body = self.export(HTTP_ACCEPT_ENCODING='deflate, gzip')
+        self.assertEqual(response['Content-Encoding'], 'gzip')
+        self.assertIn('Accept-Encoding', response['Vary'])
+        self.assertEqual(gzip.decompress(body), plain)
+        self.assertEqual(len(gzip.decompress(body).splitlines()), 3)
+
+    def test_csv(self):
+        response, body = self.export('?format=csv', HTTP_ACCEPT_ENCODING='gzip')
+        self.assertEqual(response['Content-Type'], 'text/csv; charset=utf-8')
+        self.assertIn('organizations.csv', response['Content-Disposition'])
+        rows = list(csv.DictReader(io.StringIO(gzip.decompress(body).decode('utf-8'))))
+        self.assertEqual(list(rows[0]), CSV_HEADER)
+        bakery = next(row for row in rows if row['name'] == 'Bakery')
+        self.assertEqual(bakery['tags'], 'food; bread')
+        self.assertEqual(bakery['ownership_structure'], 'Worker-Owned')
+        self.assertEqual((bakery['location.city'], bakery['location.latitude']), ('Bakery', '45.76'))
+        self.assertIn('Caf\u00e9 \u2603', [row['name'] for row in rows])
+
+    def test_filters_apply(self):
+        _, body = self.export('?type=dao')
+        self.assertEqual([json.loads(line)['name'] for line in body.splitlines()], ['Protocol DAO'])
+        _, body = self.export('?format=csv&tag=bread')
+        self.assertEqual([row['name'] for row in csv.DictReader(io.StringIO(body.decode('utf-8')))], ['Bakery'])
+        _, body = self.export('?near=45.7,4.8&radius_km=50')
+        self.assertEqual([json.loads(line)['name'] for line in body.splitlines()], ['Bakery'])
+
+        response, body = self.export('?bbox=nonsense')
+        self.assertEqual(len(json.loads(response['X-Filter-Warnings'])), 1)
+        self.assertEqual(len(body.splitlines()), 3)
+
+    def test_export_reimports_unchanged(self):
+        _, body = self.export()
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        path = os.path.join(directory.name, 'export.ndjson')
+        with open(path, 'wb') as fp:
+            fp.write(body)
+        stdout = io.StringIO()
+        call_command('seeddata', path, stdout=stdout)
+        self.assertIn('(0 created, 3 updated)', stdout.getvalue())
+
+        def meaningful(line):
+            # Re-imports create empty side table rows where there were none
+            return {
+                key: {name: item for name, item in value.items() if item not in ('', [], None)}
+                if isinstance(value, dict) else value
+                for key, value in json.loads(line).items()
+            }
+        self.assertEqual(list(map(meaningful, self.export()[1].splitlines())), list(map(meaningful, body.splitlines())))
+
+
+class FacetTests(APITestCase):
+    def setUp(self):
+        bakery = Industry.objects.create(nace_code='C10.7', description='Bakery products')
+        software = Industry.objects.create(nace_code='J62', description='Computer programming')
+        worker = OwnershipStructure.objects.create(name='Worker-Owned')
+        token = OwnershipStructure.objects.create(name='Token-based Ownership')
+        for name, fields, structures in (
+            ('Bread 1', {'industry': bakery, 'governance': 'direct'}, [worker]),
+            ('Bread 2', {'industry': bakery, 'governance': 'direct', 'geo_scope': 'regional'}, [worker]),
+            ('Code Coop', {'industry': software, 'governance': 'representative'}, [worker]),
+            ('DAO 1', {'type': 'dao', 'industry': software, 'governance': 'token', 'geo_scope': 'global'}, [token]),
+            ('DAO 2', {'type': 'dao', 'governance': 'token', 'geo_scope': 'global'}, [token, worker]),
+        ):
+            make_organization(name, **fields).ownership_structures.set(structures)
+
+    def facets(self, query=''):
+        response = self.client.get(f'/api/organizations/facets/{query}')
+        self.assertEqual(response.status_code, 200)
+        return {
+            facet: rows if facet == 'warnings' else {row['value']: row['count'] for row in rows}
+            for facet, rows in response.json().items()
+        }
+
+    def test_counts(self):
+        facets = self.facets()
+        self.assertEqual(facets['type'], {'cooperative': 3, 'dao': 2})
+        self.assertEqual(facets['industry'], {'C10.7': 2, 'J62': 2})
+        self.assertEqual(facets['geo_scope'], {'local': 2, 'regional': 1, 'global': 2})
+        self.assertEqual(facets['governance'], {'direct': 2, 'representative': 1, 'token': 2})
+        self.assertEqual(facets['ownership'], {'Worker-Owned': 4, 'Token-based Ownership': 2})
+
+        rows = self.client.get('/api/organizations/facets/').json()
+        self.assertEqual([row['value'] for row in rows['type']], ['cooperative', 'dao'])  # most common first
+        self.assertEqual(rows['type'][1]['label'], 'DAO')
+        self.assertIn({'value': 'C10.7', 'label': 'Bakery products', 'count': 2}, rows['industry'])
+
+    def test_each_facet_ignores_its_own_filter(self):
+        facets = self.facets('?type=dao')
+        self.assertEqual(facets['type'], {'cooperative': 3, 'dao': 2})
+        self.assertEqual(facets['industry'], {'J62': 1})
+        self.assertEqual(facets['governance'], {'token': 2})
+        self.assertEqual(facets['ownership'], {'Token-based Ownership': 2, 'Worker-Owned': 1})
+
+        facets = self.facets('?ownership=Token-based Ownership&governance=token')
+        self.assertEqual(facets['ownership'], {'Token-based Ownership': 2, 'Worker-Owned': 1})
+        self.assertEqual(facets['governance'], {'token': 2})
+        self.assertEqual(facets['type'], {'dao': 2})
+
+        facets = self.facets('?industry=C&geoScope=local')
+        self.assertEqual(facets['industry'], {'C10.7': 1, 'J62': 1})
+        self.assertEqual(facets['geo_scope'], {'local': 1, 'regional': 1})
+
+    def test_invalid_filters_are_reported(self):
+        facets = self.facets('?industry=Z99')
+        self.assertEqual(len(facets['warnings']), 1)
+        self.assertEqual(facets['type'], {'cooperative': 3, 'dao': 2})
+
+
+class IndustryHierarchyTests(APITestCase):
+    codes = {
+        'C': 'Manufacturing',
+        'C1': 'Not a real division',
+        'C10': 'Manufacture of food products',
+        'C10.1': 'Processing of meat',
+        'C10.7': 'Bakery products',
+        'C10.7.1': 'Bread',
+        'C11': 'Manufacture of beverages',
+        'J': 'Information and communication',
+        'J62': 'Computer programming',
+    }
+
+    def setUp(self):
+        for code, description in self.codes.items():
+            industry = Industry.objects.create(nace_code=code, description=description)
+            if code != 'J':
+                make_organization(f'Org {code}', industry=industry)
+
+    def names(self, industry):
+        response = self.client.get('/api/organizations/filter/', {'industry': industry, 'page_size': 50})
+        self.assertEqual(response.status_code, 200)
+        data = response.json()
+        return sorted(row['name'].removeprefix('Org ') for row in data['results']), data.get('warnings', [])
+
+    def test_prefix_filter_matches_descendants(self):
+        self.assertEqual(self.names('C')[0], ['C', 'C1', 'C10', 'C10.1', 'C10.7', 'C10.7.1', 'C11'])
+        self.assertEqual(self.names('C10')[0], ['C10', 'C10.1', 'C10.7', 'C10.7.1'])
+        self.assertEqual(self.names('c10.7 - Bakery products')[0], ['C10.7', 'C10.7.1'])
+        self.assertEqual(self.names('C1')[0], ['C1'])  # not C10 or C11
+        self.assertEqual(self.names('J')[0], ['J62'])
+
+    def test_unknown_code_is_reported(self):
+        names, warnings = self.names('C99')
+        self.assertEqual(len(names), 8)
+        self.assertEqual(warnings, ['Invalid industry code: C99'])
+
+    def test_tree(self):
+        def shape(nodes):
+            return [(node['code'], shape(node['children'])) for node in nodes]
+
+        def count(nodes):
+            return sum(1 + count(node['children']) for node in nodes)
+
+        tree = self.client.get('/api/industries/tree/').json()
+        self.assertEqual(shape(tree), [
+            ('C', [
+                ('C1', []),
+                ('C10', [('C10.1', []), ('C10.7', [('C10.7.1', [])])]),
+                ('C11', []),
+            ]),
+            ('J', [('J62', [])]),
+        ])
+        self.assertEqual(count(tree), Industry.objects.count())
+        self.assertEqual(tree[0]['description'], 'Manufacturing')
+
+    def test_tree_follows_changes(self):
+        self.client.get('/api/industries/tree/')
+        with self.captureOnCommitCallbacks(execute=True):
+            Industry.objects.create(nace_code='J62.0', description='Programming')
+            Industry.objects.filter(nace_code='C1').delete()
+        tree = self.client.get('/api/industries/tree/').json()
+        self.assertEqual([node['code'] for node in tree[0]['children']], ['C10', 'C11'])
+        self.assertEqual(tree[1]['children'][0]['children'][0]['code'], 'J62.0')
+
+
+class PrefixIndexTests(SimpleTestCase):
+    def test_matches_word_starts_in_key_order(self):
+        index = PrefixIndex((name, name) for name in (
+            'Mondragon Corporation', 'Corp Co-op', 'Café Corpus', 'Incorporated Bakers', 'Zeta',
+        ))
+        self.assertEqual(index.search('corp'), ['Corp Co-op', 'Mondragon Corporation', 'Café Corpus'])
+        self.assertEqual(index.search('CAFE'), ['Café Corpus'])
+        self.assertEqual(index.search('  co-op'), ['Corp Co-op'])
+        self.assertEqual(index.search('mondragon corp'), ['Mondragon Corporation'])
+        self.assertEqual(index.search('corp', limit=1), ['Corp Co-op'])
+        self.assertEqual(index.search('orp'), [])
+        self.assertEqual(index.search(''), [])
+
+    def test_items_are_not_repeated(self):
+        index = PrefixIndex([('Bread and Bread', 1), ('Breadline', 2)])
+        self.assertEqual(index.search('bread'), [1, 2])
+
+
+class AutocompleteTests(APITestCase):
+    def setUp(self):
+        for name in ('Mondragon Corporation', 'Corp Co-op', 'Sunrise Solar', 'Solaris'):
+            make_organization(name)
+        Industry.objects.create(nace_code='C10.7', description='Manufacture of bakery products')
+        Industry.objects.create(nace_code='C10', description='Manufacture of food products')
+
+    def suggest(self, **params):
+        response = self.client.get('/api/autocomplete/', params)
+        self.assertEqual(response.status_code, 200)
+        return response.json()['results']
+
+    def test_organizations(self):
+        self.assertEqual([row['name'] for row in self.suggest(prefix='corp')], ['Corp Co-op', 'Mondragon Corporation'])
+        # Ranked by the matching word start: 'solar' sorts before 'solaris'
+        self.assertEqual([row['name'] for row in self.suggest(prefix='sol')], ['Sunrise Solar', 'Solaris'])
+        self.assertEqual([row['name'] for row in self.suggest(prefix='sol', limit=1)], ['Sunrise Solar'])
+        row = self.suggest(prefix='mondragon')[0]
+        self.assertEqual(row['id'], str(Organization.objects.get(name='Mondragon Corporation').pk))
+
+    def test_industries(self):
+        self.assertEqual([row['code'] for row in self.suggest(kind='industry', prefix='c10')], ['C10', 'C10.7'])
+        self.assertEqual(self.suggest(kind='industry', prefix='bakery')[0]['label'], 'C10.7 - Manufacture of bakery products')
+
+    def test_bad_parameters(self):
+        self.assertEqual(self.client.get('/api/autocomplete/?kind=planet&prefix=a').status_code, 400)
+        self.assertEqual(self.client.get('/api/autocomplete/?prefix=a&limit=many').status_code, 400)
+
+    def test_index_follows_writes(self):
+        self.assertEqual(self.suggest(prefix='luna'), [])
+        with self.captureOnCommitCallbacks(execute=True):
+            make_organization('Luna Bakery')
+        self.assertEqual([row['name'] for row in self.suggest(prefix='luna')], ['Luna Bakery'])
+
+        organization = Organization.objects.get(name='Solaris')
+        organization.name = 'Lunaris'
+        with self.captureOnCommitCallbacks(execute=True):
+            organization.save()
+        self.assertEqual([row['name'] for row in self.suggest(prefix='luna')], ['Luna Bakery', 'Lunaris'])
+        self.assertEqual([row['name'] for row in self.suggest(prefix='sol')], ['Sunrise Solar'])
+
+        with self.captureOnCommitCallbacks(execute=True):
+            Industry.objects.create(nace_code='C10.8', description='Other food products')
+        self.assertEqual([row['code'] for row in self.suggest(kind='industry', prefix='other')], ['C10.8'])
+
+    def test_lookups_only_read_the_version(self):
+        self.suggest(prefix='corp')
+        with self.assertNumQueries(1):
+            self.suggest(prefix='sun')
+
+
+class BatchReadTests(APITestCase):
+    def setUp(self):
+        self.structure = OwnershipStructure.objects.create(name='Worker-Owned')
+        self.organizations = [make_located(f'Batch {number}', 10.0, float(number)) for number in range(6)]
+        for organization in self.organizations:
+            organization.ownership_structures.add(self.structure)
+        self.ids = [str(organization.pk) for organization in self.organizations]
+
+    def test_results_follow_the_requested_order(self):
+        requested = [self.ids[4], self.ids[0], self.ids[2]]
+        data = self.client.get('/api/organizations/batch/', {'ids': ','.join(requested)}).json()
+        self.assertEqual([row['id'] for row in data['results']], requested)
+        self.assertEqual(data['missing'], [])
+        self.assertEqual(data['results'][0]['ownership_structures'], [self.structure.pk])
+
+        data = self.client.post('/api/organizations/batch/', {'ids': requested[::-1]}, format='json').json()
+        self.assertEqual([row['id'] for row in data['results']], requested[::-1])
+        data = self.client.post('/api/organizations/batch/', requested, format='json').json()
+        self.assertEqual([row['id'] for row in data['results']], requested)
+
+    def test_missing_ids_are_reported(self):
+        unknown = str(uuid.uuid4())
+        data = self.client.get(f'/api/organizations/batch/?ids={self.ids[1]},{unknown},{self.ids[1]}&ids={self.ids[3]}').json()
+        self.assertEqual([row['id'] for row in data['results']], [self.ids[1], self.ids[3]])
+        self.assertEqual(data['missing'], [unknown])
+
+    def test_invalid_requests_are_rejected(self):
+        for response in (
+            self.client.get(f'/api/organizations/batch/?ids={self.ids[0]},not-a-uuid'),
+            self.client.post('/api/organizations/batch/', {'ids': [self.ids[0], {'id': 1}]}, format='json'),
+            self.client.post('/api/organizations/batch/', {'ids': self.ids[0]}, format='json'),
+            self.client.post('/api/organizations/batch/', {'ids': [str(uuid.uuid4()) for _ in range(501)]}, format='json'),
+        ):
+            with self.subTest(body=response.json()):
+                self.assertEqual(response.status_code, 400)
+                self.assertIn('ids', response.json())
+        self.assertEqual(
+            self.client.post('/api/organizations/batch/', {'ids': [str(uuid.uuid4()) for _ in range(500)]}, format='json').status_code,
+            200,
+        )
+
+    def test_query_count_does_not_grow_with_the_batch(self):
+        with CaptureQueriesContext(connection) as one:
+            self.client.get('/api/organizations/batch/', {'ids': self.ids[0]})
+        self.assertEqual(len(one.captured_queries), 2)  # the rows, then their ownership structures
+        for url in (
+            f'/api/organizations/batch/?ids={",".join(self.ids)}',
+            f'/api/organizations/batch/?ids={",".join(self.ids)}&expand=location',
+            f'/api/organizations/batch/?ids={",".join(self.ids)}&fields=name,ownership_structures',
+        ):
+            with self.subTest(url=url), self.assertNumQueries(len(one.captured_queries)):
+                self.assertEqual(len(self.client.get(url).json()['results']), 6)
+
+
+class FullTextSearchTests(APITestCase):
+    def setUp(self):
+        make_organization('Bakery Collective', description='Sourdough bread')
+        make_organization('Riverside Mill', description='Flour for every bakery in town')
+        make_organization('Grain Network', description='Farmers and millers', tags=['bakery'])
+        make_organization('Bakery DAO', type='dao', description='Funding bakeries on chain')
+        make_organization('Solar Coop', description='Community energy')
+        for number in range(7):
+            make_organization(f'Bread Shop {number}', description='Fresh bread every day')
+
+    def search(self, query, **params):
+        response = self.client.get('/api/organizations/filter/', {'q': query, 'page_size': 50, **params})
+        self.assertEqual(response.status_code, 200)
+        return [row['name'] for row in response.json()['results']]
+
+    def test_ranking(self):
+        # Name (weight A) before description (B) before tags (C)
+        names = self.search('bakery')
+        self.assertEqual(sorted(names[:2]), ['Bakery Collective', 'Bakery DAO'])
+        self.assertEqual(names[2:], ['Riverside Mill', 'Grain Network'])
+
+    def test_prefixes_stems_and_every_term(self):
+        self.assertEqual(self.search('bak'), self.search('bakery'))
+        self.assertIn('Bakery DAO', self.search('bakeries'))
+        self.assertEqual(self.search('bakery flour'), ['Riverside Mill'])
+        self.assertEqual(self.search('bakery nonexistentword'), [])
+        self.assertEqual(len(self.search('!!!')), Organization.objects.count())
+
+    def test_combined_with_other_filters(self):
+        self.assertEqual(self.search('bakery', type='dao'), ['Bakery DAO'])
+        self.assertEqual(self.search('bakery', tag='bakery'), ['Grain Network'])
+        self.assertEqual(self.search('bakery', name='mill'), ['Riverside Mill'])
+
+    def test_pages_follow_the_rank(self):
+        expected = self.search('bread')
+        self.assertEqual(len(expected), 8)
+        names, url = [], '/api/organizations/filter/?q=bread&page_size=3'
+        while url:
+            data = self.client.get(url).json()
+            names.extend(row['name'] for row in data['results'])
+            url = data['next']
+        self.assertEqual(names, expected)
+        # Seven name matches with equal ranks, split by id, then the description match
+        self.assertEqual(expected[-1], 'Bakery Collective')
+
+
+class ClusterTests(APITestCase):
+    def setUp(self):
+        make_located('Paris 1', 48.85, 2.35, tags=['city'])
+        make_located('Paris 2', 48.86, 2.34)
+        make_located('Lyon', 45.76, 4.84, type='dao', tags=['city'])
+        make_located('Suva', -18.14, 178.44, type='dao')
+        make_organization('Nowhere')
+
+    def clusters(self, **params):
+        response = self.client.get('/api/organizations/clusters/', params)
+        self.assertEqual(response.status_code, 200)
+        data = response.json()
+        return data['precision'], {row['geohash']: row['count'] for row in data['clusters']}
+
+    def expected(self, precision, **filters):
+        counts = Counter()
+        rows = Organization.objects.filter(location__latitude__isnull=False, **filters)
+        for latitude, longitude in rows.values_list('location__latitude', 'location__longitude'):
+            counts[encode_geohash(latitude, longitude, precision)] += 1
+        return dict(counts)
+
+    def test_counts_per_precision(self):
+        for zoom, precision in ((0, 1), (5, 4), (11, 7)):
+            with self.subTest(zoom=zoom):
+                self.assertEqual(self.clusters(zoom=zoom), (precision, self.expected(precision)))
+        self.assertEqual(sorted(self.clusters(zoom=0)[1].values()), [1, 3])
+        self.assertEqual(sorted(self.clusters(zoom=5)[1].values()), [1, 1, 2])
+
+    def test_centroids(self):
+        response = self.client.get('/api/organizations/clusters/', {'zoom': 5, 'bbox': '0,45,10,50'})
+        paris = next(row for row in response.json()['clusters'] if row['count'] == 2)
+        self.assertAlmostEqual(paris['latitude'], 48.855)
+        self.assertAlmostEqual(paris['longitude'], 2.345)
+
+    def test_filters(self):
+        # Type-only requests read the precomputed table, other filters aggregate the rows
+        self.assertEqual(self.clusters(zoom=5, type='dao')[1], self.expected(4, type='dao'))
+        self.assertEqual(self.clusters(zoom=5, tag='city')[1], self.expected(4, tags__contains=['city']))
+        self.assertEqual(self.clusters(zoom=5, bbox='170,-25,-170,0')[1], self.expected(4, name='Suva'))
+        self.assertEqual(self.clusters(zoom=5, bbox='0,40,10,50', type='dao')[1], self.expected(4, name='Lyon'))
+
+    def test_counts_follow_moves_and_deletes(self):
+        lyon = Organization.objects.get(name='Lyon')
+        lyon.location.latitude, lyon.location.longitude = 48.85, 2.36
+        lyon.location.save()
+        self.assertEqual(self.clusters(zoom=5), (4, self.expected(4)))
+        self.assertEqual(sorted(self.clusters(zoom=5)[1].values()), [1, 3])
+
+        Organization.objects.get(name='Paris 1').delete()
+        Organization.objects.get(name='Suva').location.delete()
+        self.assertEqual(self.clusters(zoom=5), (4, self.expected(4)))
+        self.assertEqual(list(self.clusters(zoom=5)[1].values()), [2])
+        self.assertEqual(self.clusters(zoom=11)[1], self.expected(7))
+
+    def test_invalid_zoom(self):
+        response = self.client.get('/api/organizations/clusters/?zoom=far')
+        self.assertEqual(response.json()['precision'], 2)
+        self.assertEqual(len(response.json()['warnings']), 1)
+
+
+class SparseFieldsetTests(APITestCase):
+    def setUp(self):
+        industry = Industry.objects.create(nace_code='C10.7', description='Bakery products')
+        self.organization = make_located('Sparse', 45.0, 5.0, industry=industry, description='A long description')
+        self.organization.ownership_structures.add(OwnershipStructure.objects.create(name='Worker-Owned'))
+
+    def keys(self, url):
+        response = self.client.get(url)
+        self.assertEqual(response.status_code, 200)
+        data = response.json()
+        row = data['results'][0] if 'results' in data else data
+        return set(row)
+
+    def test_only_requested_fields_come_back(self):
+        for url in (
+            '/api/organizations/?fields=name,industry_display',
+            '/api/organizations/filter/?fields=name,industry_display',
+            f'/api/organizations/{self.organization.pk}/?fields=name,industry_display',
+            f'/api/organizations/batch/?ids={self.organization.pk}&fields=name,industry_display',
+        ):
+            with self.subTest(url=url):
+                self.assertEqual(self.keys(url), {'id', 'name', 'industry_display'})
+        row = self.client.get('/api/organizations/?fields=name,industry_display').json()['results'][0]
+        self.assertEqual((row['name'], row['industry_display']), ('Sparse', 'C10.7'))
+        self.assertEqual(
+            self.keys('/api/organizations/?fields=location&fields=ownership_structures&expand=location'),
+            {'id', 'location', 'ownership_structures'},
+        )
+
+    def test_unknown_names_are_ignored(self):
+        self.assertEqual(self.keys('/api/organizations/?fields=name,no_such_field'), {'id', 'name'})
+        self.assertEqual(self.keys('/api/organizations/?fields=no_such_field'), {'id'})
+        self.assertEqual(self.keys('/api/organizations/?fields=, ,'), {'id'})
+
+    def test_only_requested_columns_are_read(self):
+        with CaptureQueriesContext(connection) as queries:
+            self.client.get('/api/organizations/?fields=name')
+        sql = '\n'.join(query['sql'] for query in queries.captured_queries)
+        self.assertNotIn('"description"', sql)
+        self.assertNotIn('organizations_manager_app_industry', sql)
+        self.assertNotIn('ownershipstructure', sql)
+
+    def test_writes_return_every_field(self):
+        response = self.client.patch(f'/api/organizations/{self.organization.pk}/?fields=name', {'name': 'Renamed'}, format='json')
+        self.assertEqual(response.status_code, 200)
+        self.assertIn('description', response.json())
+
+
+class ConditionalGetTests(APITestCase):
+    def setUp(self):
+        self.organization = make_organization('Alpha')
+        make_organization('Beta', type='dao')
+        OwnershipStructure.objects.create(name='Community-Owned')
+
+    def assertNotModified(self, url, response, modified=False):
+        """Replay ``response``'s validators against ``url`` and check the outcome."""
+        expected = 200 if modified else 304
+        self.assertEqual(self.client.get(url, HTTP_IF_NONE_MATCH=response['ETag']).status_code, expected)
+
+    def test_unchanged_resources_answer_304(self):
+        for url in (
+            '/api/organizations/',
+            f'/api/organizations/{self.organization.pk}/',
+            '/api/organizations/filter/?type=dao',
+            '/api/ownership-structures/',
+        ):
+            with self.subTest(url=url):
+                response = self.client.get(url)
+                self.assertEqual(response.status_code, 200)
+                with self.assertNumQueries(1):
+                    self.assertNotModified(url, response)
+                since = self.client.get(url, HTTP_IF_MODIFIED_SINCE=response['Last-Modified'])
+                self.assertEqual(since.status_code, 304)
+
+    def test_edits_change_the_etag(self):
+        url = f'/api/organizations/{self.organization.pk}/'
+        response = self.client.get(url)
+        self.organization.name = 'Alpha 2'
+        self.organization.save()
+        self.assertNotModified(url, response, modified=True)
+
+    def test_deletes_change_the_list_etag(self):
+        url = '/api/organizations/'
+        response = self.client.get(url)
+        Organization.objects.filter(name='Beta').delete()
+        self.assertNotModified(url, response, modified=True)
+
+    def test_membership_changes_change_the_etag(self):
+        url = f'/api/organizations/{self.organization.pk}/'
+        response = self.client.get(url)
+        self.organization.ownership_structures.add(OwnershipStructure.objects.create(name='Worker-Owned'))
+        self.assertNotModified(url, response, modified=True)
+
+    def test_representations_have_their_own_etags(self):
+        first = self.client.get('/api/organizations/?page_size=1')
+        second = self.client.get('/api/organizations/?page_size=2')
+        self.assertNotEqual(first['ETag'], second['ETag'])
+
+    def test_side_table_edits_change_the_etag(self):
+        self.organization.location = Location.objects.create(city='Lyon', country='France')
+        self.organization.industry = Industry.objects.create(nace_code='C10.1', description='Meat')
+        self.organization.save()
+        for url in (
+            f'/api/organizations/{self.organization.pk}/?expand=location',
+            '/api/organizations/filter/?type=cooperative&expand=location',
+            f'/api/organizations/{self.organization.pk}/',  # industry_display
+        ):
+            with self.subTest(url=url):
+                response = self.client.get(url)
+                location = Location.objects.get()
+                location.city = f'{location.city}!'
+                # Commit hooks bump the data version behind the filter cache
+                with self.captureOnCommitCallbacks(execute=True):
+                    location.save()
+                self.assertNotModified(url, response, modified=True)
+
+        url = f'/api/organizations/{self.organization.pk}/'
+        response = self.client.get(url)
+        Industry.objects.filter(pk=self.organization.industry_id).get().save()
+        self.assertNotModified(url, response, modified=True)
+        response = self.client.get(url)
+        Location.objects.get().delete()
+        self.assertNotModified(url, response, modified=True)
+
+
+class MinHashTests(SimpleTestCase):
+    def test_signature_is_deterministic(self):
+        features = organization_features(['Food', ' coop '], [3], 'Bakery owned by its workers')
+        self.assertEqual(features, {'tag:food', 'tag:coop', 'ownership:3', 'word:bakery', 'word:own', 'word:work'})
+        self.assertEqual(signature(features), signature(set(features)))
+        self.assertEqual(band_keys(signature(features)), band_keys(signature(features)))
+
+    def test_estimate_tracks_jaccard_similarity(self):
+        rng = random.Random(1)
+        for shared in (0, 10, 30, 50):
+            common = {f'common:{rng.random()}' for _ in range(shared)}
+            first = common | {f'first:{number}' for number in range(50 - shared)}
+            second = common | {f'second:{number}' for number in range(50 - shared)}
+            exact = len(first & second) / len(first | second)
+            with self.subTest(exact=exact):
+                self.assertAlmostEqual(estimate_jaccard(signature(first), signature(second)), exact, delta=0.15)
+
+    def test_similar_sets_share_a_band(self):
+        base = {f'word:{number}' for number in range(20)}
+        close = (base - {'word:0', 'word:1'}) | {'word:a', 'word:b'}
+        self.assertTrue(set(band_keys(signature(base))) & set(band_keys(signature(close))))
+        unrelated = {f'other:{number}' for number in range(20)}
+        self.assertFalse(set(band_keys(signature(base))) & set(band_keys(signature(unrelated))))
+
+    def test_dissimilar_sets_rarely_share_a_band(self):
+        # 5 of 45 features in common: Jaccard 0.11
+        collisions = 0
+        for pair in range(200):
+            common = {f'common:{pair}:{number}' for number in range(5)}
+            first = common | {f'first:{pair}:{number}' for number in range(20)}
+            second = common | {f'second:{pair}:{number}' for number in range(20)}
+            collisions += bool(set(band_keys(signature(first))) & set(band_keys(signature(second))))
+        self.assertLess(collisions, 10)
+
+    def test_empty_features_have_no_band_keys(self):
+        self.assertEqual(band_keys(signature(set())), [])
+        self.assertEqual(estimate_jaccard(signature(set()), signature({'tag:x'})), 0.0)
+
+
+class SimilarOrganizationsTests(APITestCase):
+    def setUp(self):
+        tags = ['renewable energy', 'solar', 'community', 'cooperative', 'local power']
+        self.solar = make_organization('Solar One', tags=tags, description='Community owned solar panels')
+        self.twin = make_organization('Solar Two', tags=tags, description='Community owned solar farms')
+        self.other = make_organization('Bakery', tags=['bread', 'food'], description='Sourdough bakery')
+        self.blank = make_organization('Blank')
+
+    def similar(self, organization, **params):
+        response = self.client.get(f'/api/organizations/{organization.pk}/similar/', params)
+        self.assertEqual(response.status_code, 200)
+        return [(row['name'], row['similarity']) for row in response.json()['results']]
+
+    def test_finds_organizations_with_shared_features(self):
+        results = self.similar(self.solar)
+        self.assertEqual([name for name, _ in results], ['Solar Two'])
+        self.assertGreater(results[0][1], 0.5)
+        self.assertEqual(self.similar(self.blank), [])
+
+    def test_signatures_follow_edits(self):
+        self.other.tags = self.solar.tags
+        self.other.description = self.solar.description
+        self.other.save()
+        self.assertIn('Bakery', [name for name, _ in self.similar(self.solar)])
+
+        structure = OwnershipStructure.objects.create(name='Worker-Owned')
+        before = OrganizationSignature.objects.get(pk=self.blank.pk).minhash
+        self.blank.ownership_structures.add(structure)
+        self.assertNotEqual(OrganizationSignature.objects.get(pk=self.blank.pk).minhash, before)
+
+    def test_rebuild_matches_signals(self):
+        stored = dict(OrganizationSignature.objects.values_list('organization_id', 'bands'))
+        OrganizationSignature.objects.all().delete()
+        call_command('rebuild_signatures', stdout=io.StringIO())
+        self.assertEqual(dict(OrganizationSignature.objects.values_list('organization_id', 'bands')), stored)
+
+    def test_candidates_are_capped_by_shared_bands(self):
+        tags = self.solar.tags
+        make_organization('Solar Three', tags=tags[:4], description='Community owned solar panels')
+        make_organization('Solar Four', tags=tags[:3], description='Solar panels')
+        manager = OrganizationSignature.objects
+        everything = manager.similar(self.solar.pk, limit=1)
+        with mock.patch.object(type(manager), 'max_candidates', 1), CaptureQueriesContext(connection) as queries:
+            capped = manager.similar(self.solar.pk, limit=1)
+        self.assertEqual(capped, everything)
+        self.assertIn('LIMIT 1', queries.captured_queries[-1]['sql'])
+
+    def test_unknown_organization_and_bad_limit(self):
+        self.assertEqual(self.client.get(f'/api/organizations/{uuid.uuid4()}/similar/').status_code, 404)
+        self.assertEqual(self.client.get(f'/api/organizations/{self.solar.pk}/similar/?limit=x').status_code, 400)
+
+
+class DedupTests(SimpleTestCase):
+    def test_normalization(self):
+        self.assertEqual(normalize_name('The Café Collective, Inc.'), 'cafe collective')
+        self.assertEqual(normalize_name('Co'), 'co')  # only stop words: keep them
+        self.assertEqual(normalize_domain('HTTPS://www.Example.org/about?x=1'), 'example.org')
+        self.assertEqual(normalize_domain('example.org'), 'example.org')
+        self.assertEqual(normalize_domain('https://www.facebook.com/somecoop'), '')
+        self.assertEqual(normalize_domain('Hidden'), '')
+        self.assertEqual(normalize_email('Hello+news@Example.org '), 'hello@example.org')
+        self.assertEqual(normalize_email('Hidden'), '')
+
+    def test_best_match(self):
+        index = DedupIndex([
+            (1, 'Mondragon Corporation', 'https://mondragon-corporation.com', ''),
+            (2, 'Green Bakery Cooperative', '', 'info@greenbakery.org'),
+            (3, 'Sunrise Solar Coop', 'https://sunrise.coop', ''),
+        ])
+        self.assertEqual(index.best_match('MONDRAGON Corp.').id, 1)
+        self.assertEqual(index.best_match('Cooperative Green Bakery').reason, 'name')
+        self.assertEqual(index.best_match('Totally different', email='INFO@greenbakery.org').id, 2)
+        self.assertEqual(index.best_match('Sunrise Solar', website='http://www.sunrise.coop/').reason, 'domain')
+        self.assertIsNone(index.best_match('Moonset Wind', website='https://sunrise.coop'))
+        self.assertIsNone(index.best_match('Green Grocer'))
+
+    def test_oversized_blocks_are_ignored(self):
+        index = DedupIndex((number, f'Company {number}', 'https://shared-host.org', '') for number in range(60))
+        self.assertIsNone(index.best_match('Unrelated Name', website='https://shared-host.org'))
+
+    def test_deduplicate_stage(self):
+        index = DedupIndex([('a', 'Sunrise Solar Coop', '', '')])
+        records = [
+            {'id': 'x', 'name': 'SUNRISE Solar-Coop'},
+            {'name': 'Brand New Coop'},
+            {'id': 'y', 'name': 'Brand new coop, Ltd'},
+            {'id': 'a', 'name': 'Sunrise Solar Coop'},
+        ]
+        report = []
+        output = list(deduplicate(records, index, report))
+        self.assertEqual(output[0]['id'], 'a')
+        new_id = output[1]['id']
+        self.assertTrue(new_id)
+        self.assertEqual(output[2]['id'], new_id)
+        self.assertEqual(output[3], records[3])
+        self.assertEqual([(row['id'], row['matched_id']) for row in report], [('x', 'a'), ('y', new_id)])
+
+        report = []
+        kept = list(deduplicate([{'id': 'x', 'name': 'SUNRISE Solar-Coop'}], index, report, assign_ids=False))
+        self.assertEqual(kept[0]['id'], 'x')
+        self.assertEqual(len(report), 1)
+
+    def test_known_ids_are_never_reassigned(self):
+        index = DedupIndex([
+            ('north', 'Riverside Bakery Coop North', '', ''),
+            ('south', 'Riverside Bakery Coop South', '', ''),
+        ])
+        records = [
+            # Renamed so that its name now matches the other organization best
+            {'id': 'north', 'name': 'Riverside Bakery Coop South'},
+            {'id': 'south', 'name': 'Riverside Bakery Coop South'},
+            {'id': 'new', 'name': 'Riverside Bakery Coop, South'},
+        ]
+        report = []
+        output = list(deduplicate(records, index, report))
+        self.assertEqual([record['id'] for record in output], ['north', 'south', 'south'])
+        self.assertEqual([(row['id'], row['matched_id']) for row in report], [('new', 'south')])
+
+
+def aggregate_snapshot():
+    """The signal-maintained summary tables, comparable with a full rebuild."""
+    return (
+        sorted(TagUsage.objects.values_list('kind', 'name', 'count')),
+        sorted(
+            (precision, cell, org_type, count, round(lat_sum, 6), round(lon_sum, 6))
+            for precision, cell, org_type, count, lat_sum, lon_sum in GeoCluster.objects.values_list(
+                'precision', 'cell', 'type', 'count', 'lat_sum', 'lon_sum'
+            )
+        ),
+        sorted(OrganizationStats.objects.values_list('dimension', 'value', 'count')),
+    )
+
+
+class BulkWriteTests(APITestCase):
+    def setUp(self):
+        self.industry = Industry.objects.create(nace_code='C10.1', description='Meat')
+        self.structures = [OwnershipStructure.objects.create(name=name).pk for name in ('Worker-Owned', 'Member-Owned')]
+
+    def item(self, number, **fields):
+        item = {
+            'name': f'Bulk {number}',
+            'type': 'dao',
+            'legal_structure': 'llc',
+            'geo_scope': 'local',
+            'size': 'micro',
+            'tags': ['bulk', f'tag {number % 3}'],
+            'industry': self.industry.pk,
+            'ownership_structures': self.structures[:1 + number % 2],
+            'year_founded': 1990 + number,
+            'location': {'city': 'Lima', 'country': 'Peru' if number % 2 else 'Chile', 'latitude': -12 + number / 100, 'longitude': -77},
+            'contact': {'email': f'team{number}@example.org'},
+        }
+        item.update(fields)
+        return item
+
+    def post(self, items, mode='upsert', status=200):
+        response = self.client.post(f'/api/organizations/bulk/?mode={mode}', items, format='json')
+        self.assertEqual(response.status_code, status, response.content)
+        return response.json()
+
+    def test_create_writes_everything_in_a_fixed_number_of_queries(self):
+        with CaptureQueriesContext(connection) as small:
+            self.post([self.item(number) for number in range(3)], 'create')
+        with self.assertNumQueries(len(small.captured_queries)):
+            data = self.post([self.item(number) for number in range(3, 103)], 'create')
+        self.assertEqual(data['created'], 100)
+        organization = Organization.objects.select_related('location', 'contact').get(id=data['results'][0]['id'])
+        self.assertEqual((organization.name, organization.location.city, organization.contact.email), ('Bulk 3', 'Lima', 'team3@example.org'))
+        self.assertEqual(organization.ownership_structures.count(), 2)
+        self.assertTrue(organization.location.geohash)
+        self.assertTrue(OrganizationSignature.objects.filter(pk=organization.pk).exists())
+        self.assertEqual(Organization.objects.filter(search_vector='bulk').count(), 103)
+
+    def test_aggregates_stay_in_step_with_a_rebuild(self):
+        ids = [row['id'] for row in self.post([self.item(number) for number in range(20)], 'create')['results']]
+        self.post([{'id': id, 'tags': ['changed'], 'location': {'country': 'Bolivia', 'latitude': 5.0}} for id in ids[::2]], 'update')
+        self.post([self.item(1, id=ids[1], type='esop', location=None), self.item(99)])
+        maintained = aggregate_snapshot()
+        rebuild_aggregates()
+        self.assertEqual(aggregate_snapshot(), maintained)
+
+    def test_partial_update_only_writes_given_fields(self):
+        id = self.post([self.item(1)], 'create')['results'][0]['id']
+        self.post([{'id': id, 'location': {'city': 'Cusco'}, 'tags': ['new']}], 'update')
+        organization = Organization.objects.select_related('location').get(id=id)
+        self.assertEqual((organization.name, organization.tags), ('Bulk 1', ['new']))
+        self.assertEqual((organization.location.city, organization.location.country), ('Cusco', 'Peru'))
+        self.assertEqual(organization.ownership_structures.count(), 2)
+
+    def test_upsert_creates_and_updates(self):
+        id = self.post([self.item(1)])['results'][0]['id']
+        data = self.post([self.item(1, id=id, name='Renamed'), self.item(2)])
+        self.assertEqual((data['created'], data['updated']), (1, 1))
+        self.assertEqual([row['status'] for row in data['results']], ['updated', 'created'])
+        self.assertEqual(Organization.objects.get(id=id).name, 'Renamed')
+
+    def test_invalid_items_reject_the_whole_batch(self):
+        id = self.post([self.item(1)], 'create')['results'][0]['id']
+        data = self.post(
+            [
+                self.item(2),
+                self.item(3, id=id),
+                self.item(4, type='nope'),
+                self.item(5, industry=999999, ownership_structures=[424242]),
+            ],
+            'create', status=400,
+        )
+        self.assertEqual([error['index'] for error in data['errors']], [1, 2, 3])
+        self.assertIn('id', data['errors'][0]['errors'])
+        self.assertEqual(set(data['errors'][2]['errors']), {'industry', 'ownership_structures'})
+        self.assertEqual(Organization.objects.count(), 1)
+
+        self.assertIn('id', self.post([{'name': 'No id'}], 'update', status=400)['errors'][0]['errors'])
+        self.assertIn('mode', self.post([self.item(1)], 'zap', status=400))
+
+
+class CounterUpsertTests(TransactionTestCase):
+    def test_concurrent_saves_share_new_counter_rows(self):
+        workers = 8
+        barrier = threading.Barrier(workers)
+        errors = []
+
+        def save(number):
+            try:
+                barrier.wait()
+                make_organization(
+                    f'Worker {number}', tags=['brand new'], year_founded=1999,
+                    location=Location.objects.create(country='Narnia', latitude=1.5, longitude=2.5),
+                )
+            except Exception as error:
+                errors.append(error)
+            finally:
+                connections.close_all()
+
+        threads = [threading.Thread(target=save, args=(number,)) for number in range(workers)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        self.assertEqual(errors, [])
+        self.assertEqual(TagUsage.objects.get(name='brand new').count, workers)
+        self.assertEqual(OrganizationStats.objects.get(dimension='country', value='Narnia').count, workers)
+        self.assertEqual(GeoCluster.objects.filter(precision=1).get().count, workers)
+        maintained = aggregate_snapshot()
+        rebuild_aggregates()
+        self.assertEqual(aggregate_snapshot(), maintained)
+
+    def test_counts_reaching_zero_remove_the_row(self):
+        organization = make_organization('Solo', tags=['lonely'])
+        with self.assertNumQueries(1):
+            TagUsage.objects.adjust(TagUsage.TAG, {'other': 2})
+        organization.delete()
+        self.assertFalse(TagUsage.objects.filter(name='lonely').exists())
+        TagUsage.objects.adjust(TagUsage.TAG, {'other': -2, 'missing': -1})
+        self.assertFalse(TagUsage.objects.exists())
+
+
+class FilterCacheTests(APITestCase):
+    url = '/api/organizations/filter/?type=dao&page_size=2'
+
+    def setUp(self):
+        for number in range(3):
+            make_organization(f'DAO {number}', type='dao')
+
+    @override_settings(ALLOWED_HOSTS=['one.example', 'two.example'])
+    def test_hits_rebuild_links_for_each_host(self):
+        first = self.client.get(self.url, HTTP_HOST='one.example').json()
+        with self.assertNumQueries(1):  # the data version
+            second = self.client.get(self.url, HTTP_HOST='two.example', secure=True).json()
+        self.assertTrue(first['next'].startswith('http://one.example/'))
+        self.assertTrue(second['next'].startswith('https://two.example/'))
+        self.assertEqual(second['results'], first['results'])
+
+    def test_writes_invalidate_cached_responses(self):
+        self.assertEqual(len(self.client.get(self.url).json()['results']), 2)
+        with self.captureOnCommitCallbacks(execute=True):
+            Organization.objects.filter(type='dao').delete()
+        self.assertEqual(self.client.get(self.url).json()['results'], [])
+
+    def test_entries_expire(self):
+        cache = LRUResponseCache(max_entries=2, timeout=60)
+        cache.set('a', 1)
+        self.assertEqual(cache.get('a'), 1)
+        cache.timeout = -1
+        cache.set('b', 2)
+        self.assertIsNone(cache.get('b'))
+        cache.set('c', 3)
+        cache.set('d', 4)
+        self.assertIsNone(cache.get('a'))  # evicted as least recently used
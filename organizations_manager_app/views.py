@@ -1,99 +1,522 @@
-from rest_framework import viewsets, filters
+from rest_framework import viewsets, filters, status
 from rest_framework.decorators import action
+from rest_framework.exceptions import ValidationError
+from rest_framework.generics import get_object_or_404
+from rest_framework.permissions import SAFE_METHODS
+from rest_framework.renderers import JSONRenderer
 from rest_framework.response import Response
-from django.db.models import Q
+from rest_framework.settings import api_settings
+from django.db import transaction
+from django.db.models import Avg, Count, Q, Sum
+from django.db.models.functions import Substr
+from django.http import StreamingHttpResponse
+from django.utils.cache import patch_vary_headers
+import json
 import logging
-from .models import Organization, Industry, OwnershipStructure
-from .serializers import OrganizationSerializer, OwnershipStructureSerializer
+import re
+import uuid
+from .autocomplete import AUTOCOMPLETE_KINDS, AUTOCOMPLETE_LIMIT, MAX_AUTOCOMPLETE_LIMIT, suggest
+from .caching import get_response_cache, response_cache_key
+from .conditional import ConditionalGetMixin, Validators
+from .exporter import csv_chunks, encode_stream, export_records, ndjson_chunks
+from .filtering import OrganizationFilter, normalize_params, parse_timestamp
+from .importer import OrganizationBulkWriter
+from .industries import industry_tree
+from .models import (
+    GeoCluster,
+    Industry,
+    Organization,
+    OrganizationSignature,
+    OrganizationStats,
+    OrganizationTombstone,
+    OwnershipStructure,
+    TagUsage,
+)
+from .pagination import KeysetPagination
+from .renderers import CSVRenderer, FastJSONRenderer, NDJSONRenderer
+from .serializers import (
+    CHOICE_LABELS,
+    IndustrySerializer,
+    OrganizationBulkSerializer,
+    OrganizationRowSerializer,
+    OrganizationSerializer,
+    OrganizationTombstoneSerializer,
+    OwnershipStructureSerializer,
+    TagUsageSerializer,
+    field_columns,
+    requested_expansions,
+    requested_fields,
+)
+from .spatial import cover_bbox, parse_bbox, zoom_precision
 
 logger = logging.getLogger(__name__)
 
-class OrganizationViewSet(viewsets.ModelViewSet):
-    queryset = Organization.objects.all().prefetch_related('ownership_structures', 'industry')
+DEFAULT_ZOOM = 2
+WORLD_BBOX = (-90.0, -180.0, 90.0, 180.0)
+SYNC_ORDERING = ('updated', 'id')
+TOMBSTONE_ORDERING = ('deleted', 'organization_id')
+PAGINATION_PARAMS = (
+    KeysetPagination.cursor_query_param,
+    KeysetPagination.page_size_query_param,
+    KeysetPagination.count_query_param,
+)
+# Parameters that change the representation rather than the rows
+REPRESENTATION_PARAMS = ('expand', 'fields')
+SPARSE_REQUIRED_COLUMNS = ('id', 'created', 'updated')
+EXPORT_ORDERING = ('created', 'id')
+SIMILAR_LIMIT = 10
+MAX_SIMILAR_LIMIT = 50
+BULK_MODES = ('create', 'upsert', 'update')
+MAX_BULK_ITEMS = 1000
+MAX_BATCH_IDS = 500
+GZIP_ACCEPTED = re.compile(r'\bgzip\b')
+
+class OrganizationViewSet(ConditionalGetMixin, viewsets.ModelViewSet):
+    queryset = Organization.objects.all().select_related('industry').prefetch_related('ownership_structures')
     serializer_class = OrganizationSerializer
+    pagination_class = KeysetPagination
+    # Serves application/json in place of DRF's JSONRenderer
+    renderer_classes = [
+        FastJSONRenderer,
+        *(renderer for renderer in api_settings.DEFAULT_RENDERER_CLASSES if renderer is not JSONRenderer),
+    ]
 
     filter_backends = [filters.SearchFilter]
     search_fields = ['name']
 
+    def get_queryset(self):
+        queryset = super().get_queryset()
+        expansions = requested_expansions(self.request)
+        fields = requested_fields(self.request)
+        if fields is not None:
+            columns = field_columns(fields)
+            expansions = [name for name in expansions if name in columns]
+            queryset = queryset.select_related(None).prefetch_related(None)
+            if 'industry' in columns:
+                queryset = queryset.select_related('industry')
+            if 'ownership_structures' in columns:
+                queryset = queryset.prefetch_related('ownership_structures')
+                columns.discard('ownership_structures')
+            # Pagination reads the ordering columns of the last row
+            queryset = queryset.only(*columns, *SPARSE_REQUIRED_COLUMNS)
+        if expansions:
+            # Join exactly the side tables the serializer will nest. Called
+            # without arguments select_related() would follow every non-null FK
+            queryset = queryset.select_related(*expansions)
+        return queryset
+
+    def filter_queryset(self, queryset):
+        queryset = super().filter_queryset(queryset)
+        since = self.get_updated_since()
+        if since is not None and self.action == 'list':
+            queryset = queryset.filter(updated__gte=since)
+        return queryset
+
+    def paginate_queryset(self, queryset):
+        # Syncs walk the changes oldest first so the last page's rows mark where to resume
+        ordering = SYNC_ORDERING if self.get_updated_since() is not None else None
+        return self.paginate_rows(queryset, ordering)
+
+    def paginate_rows(self, queryset, ordering=None):
+        """Paginate, as plain rows when the fast row serializer will render them."""
+        if self.uses_row_serializer():
+            ordering_columns = [field.lstrip('-') for field in ordering or KeysetPagination.ordering]
+            queryset = OrganizationRowSerializer.values(queryset, self.get_serializer_context(), ordering_columns)
+        return self.paginator.paginate_queryset(queryset, self.request, view=self, ordering=ordering)
+
+    def uses_row_serializer(self):
+        # Nested expansions still go through the model serializer
+        return self.request.method in SAFE_METHODS and not requested_expansions(self.request)
+
+    def get_serializer(self, *args, **kwargs):
+        if kwargs.get('many') and self.uses_row_serializer():
+            return OrganizationRowSerializer(*args, context=self.get_serializer_context())
+        return super().get_serializer(*args, **kwargs)
+
+    def get_updated_since(self):
+        value = self.request.query_params.get('updated_since', '')
+        if not value.strip():
+            return None
+        try:
+            return parse_timestamp(value)
+        except ValueError:
+            raise ValidationError({'updated_since': f"Invalid timestamp '{value}', expected ISO 8601"})
+
     @action(detail=False, methods=['get'])
-    def filter(self, request):
-        # Validate and normalize parameters
-        params = {
-            'name': request.GET.get('name', '').strip(),
-            'type': request.GET.get('type', '').strip().lower(),
-            'ownership': request.GET.getlist('ownership', []),
-            'industry': request.GET.get('industry', '').split(' - ')[0].strip().upper(),
-            'geo_scope': request.GET.get('geoScope', '').strip().lower(),
-            'governance': request.GET.get('governance', '').strip().lower(),
-        }
+    def deleted(self, request):
+        """
+        Organizations deleted since ``?updated_since=`` (all tombstones
+        without it), oldest first. Together with ``list?updated_since=``
+        this gives a mirror everything it needs to apply a delta.
+        """
+        tombstones = OrganizationTombstone.objects.all()
+        since = self.get_updated_since()
+        if since is not None:
+            tombstones = tombstones.filter(deleted__gte=since)
+        page = self.paginator.paginate_queryset(tombstones, request, view=self, ordering=TOMBSTONE_ORDERING)
+        return self.get_paginated_response(OrganizationTombstoneSerializer(page, many=True).data)
 
+    @action(detail=False, methods=['get'])
+    def filter(self, request):
+        params = normalize_params(request.GET)
         logger.info(f"Filter request received with params: {params}")
 
-        # Build query with validation
-        query = Q()
-        errors = []
+        # Served without touching the database until the next write
+        response_cache = get_response_cache()
+        cache_key = response_cache_key('filter', request, params, PAGINATION_PARAMS + REPRESENTATION_PARAMS)
+        cached = response_cache.get(cache_key)
+        if cached is not None:
+            data, cursor, validators = cached
+            # The next link is absolute, so it is rebuilt for this request's host and scheme
+            data = {'next': self.paginator.get_cursor_link(request, cursor), **data}
+            return validators.not_modified(request) or validators.apply(Response(data))
 
-        # Name filter (partial match)
-        if params['name']:
-            query &= Q(name__icontains=params['name'])
+        org_filter = OrganizationFilter(request.GET)
+        organizations, ordering = org_filter.apply(self.get_queryset())
+        errors = org_filter.errors
 
-        # Type filter (exact match)
-        if params['type']:
-            query &= Q(type__iexact=params['type'])
+        validators = Validators.for_queryset(request, organizations)
+        not_modified = validators.not_modified(request)
+        if not_modified:
+            return not_modified
 
-        # Ownership filter (multi-select)
-        if params['ownership']:
-            try:
-                valid_ids = OwnershipStructure.objects.filter(
-                    name__in=params['ownership']
-                ).values_list('id', flat=True)
-                
-                if valid_ids:
-                    query &= Q(ownership_structures__id__in=valid_ids)
-                else:
-                    errors.append(f"No matching ownership structures found for: {params['ownership']}")
-            except Exception as e:
-                logger.error(f"Ownership filter error: {str(e)}")
-                errors.append("Invalid ownership structure filter")
-
-        # Industry filter (NACE code exact match)
-        if params['industry']:
-            try:
-                industry = Industry.objects.get(nace_code__iexact=params['industry'])
-                print(industry)
-                query &= Q(industry=industry)
-            except Industry.DoesNotExist:
-                errors.append(f"Invalid industry code: {params['industry']}")
-            except Industry.MultipleObjectsReturned:
-                errors.append(f"Multiple industries found for code: {params['industry']}")
+        page = self.paginate_rows(organizations, ordering)
+        serializer = self.get_serializer(page, many=True)
+        response = self.get_paginated_response(serializer.data)
+
+        if errors:
+            response.data['warnings'] = errors
+            logger.warning(f"Filter completed with warnings: {errors}")
+
+        data = {key: value for key, value in response.data.items() if key != 'next'}
+        response_cache.set(cache_key, (data, self.paginator.get_next_cursor(), validators))
+        return validators.apply(response)
+
+    @action(detail=False, methods=['get'])
+    def facets(self, request):
+        """
+        Counts per type, ownership structure, industry, geo scope and
+        governance value for the current ``filter`` parameters, cached
+        until the next write.
+        """
+        params = normalize_params(request.GET)
+        response_cache = get_response_cache()
+        cache_key = response_cache_key('facets', request, params)
+        cached = response_cache.get(cache_key)
+        if cached is not None:
+            return Response(cached)
+
+        org_filter = OrganizationFilter(request.GET)
+        data = org_filter.facet_counts(labels=CHOICE_LABELS)
+        if org_filter.errors:
+            data['warnings'] = org_filter.errors
+        response_cache.set(cache_key, data)
+        return Response(data)
+
+    @action(detail=False, methods=['get'], renderer_classes=[NDJSONRenderer, CSVRenderer])
+    def export(self, request):
+        """
+        Stream every organization matching the ``filter`` parameters as
+        NDJSON (``?format=ndjson``, the default) or CSV (``?format=csv``),
+        gzipped when the client accepts it. NDJSON exports use the seed
+        file layout and can be re-imported with ``seeddata``.
+        """
+        org_filter = OrganizationFilter(request.GET)
+        organizations, ordering = org_filter.apply(Organization.objects.all())
+        organizations = organizations.order_by(*(ordering or EXPORT_ORDERING))
 
-        # Geo Scope filter (exact match)
-        if params['geo_scope']:
-            query &= Q(geo_scope__iexact=params['geo_scope'])
+        export_format = request.accepted_renderer.format
+        records = export_records(organizations)
+        chunks = csv_chunks(records) if export_format == 'csv' else ndjson_chunks(records)
+        compress = bool(GZIP_ACCEPTED.search(request.META.get('HTTP_ACCEPT_ENCODING', '')))
 
-        # Governance filter (exact match)
-        if params['governance']:
-            query &= Q(governance__iexact=params['governance'])
+        response = StreamingHttpResponse(
+            encode_stream(chunks, compress=compress),
+            content_type=request.accepted_renderer.media_type + '; charset=utf-8',
+        )
+        response['Content-Disposition'] = f'attachment; filename="organizations.{export_format}"'
+        if compress:
+            response['Content-Encoding'] = 'gzip'
+        patch_vary_headers(response, ('Accept-Encoding',))
+        if org_filter.errors:
+            # The body is already streaming, so warnings travel in a header
+            response['X-Filter-Warnings'] = json.dumps(org_filter.errors)
+            logger.warning(f"Export started with warnings: {org_filter.errors}")
+        return response
 
+    @action(detail=False, methods=['get'])
+    def clusters(self, request):
+        """
+        Map clusters for a viewport: ``?bbox=min_lon,min_lat,max_lon,max_lat&zoom=``
+        plus any of the ``filter`` parameters. Cells are geohash prefixes
+        whose length grows with the zoom level. Unfiltered and type-only
+        requests are answered from the precomputed GeoCluster table; other
+        filters aggregate the matching organizations in the same cells.
+        """
+        org_filter = OrganizationFilter(request.GET)
+        params, errors = org_filter.params, org_filter.errors
+
+        try:
+            zoom = int(request.GET.get('zoom', DEFAULT_ZOOM))
+        except ValueError:
+            errors.append(f"Invalid zoom '{request.GET.get('zoom')}', using {DEFAULT_ZOOM}")
+            zoom = DEFAULT_ZOOM
+        precision = zoom_precision(zoom)
 
-        organizations = Organization.objects.filter(query).distinct()
+        boxes = [WORLD_BBOX]
+        if 'bbox' in org_filter.conditions:
+            boxes = parse_bbox(params['bbox'])
+        cells = {cell for box in boxes for cell in cover_bbox(box, max_precision=precision)}
 
-        serializer = self.get_serializer(organizations, many=True)
-        response_data = {
-            'count': organizations.count(),
-            'results': serializer.data
-        }
+        if set(org_filter.conditions) <= {'type', 'bbox'} and not params['q']:
+            in_view = Q()
+            for cell in cells:
+                in_view |= Q(cell__startswith=cell)
+            rows = GeoCluster.objects.filter(in_view, precision=precision)
+            if params['type']:
+                rows = rows.filter(type__iexact=params['type'])
+            rows = rows.values('cell').annotate(
+                total=Sum('count'), lat_sum=Sum('lat_sum'), lon_sum=Sum('lon_sum'),
+            ).filter(total__gt=0).order_by('cell')
+            clusters = [
+                {
+                    'geohash': row['cell'],
+                    'count': row['total'],
+                    'latitude': row['lat_sum'] / row['total'],
+                    'longitude': row['lon_sum'] / row['total'],
+                }
+                for row in rows
+            ]
+        else:
+            in_view = Q()
+            for cell in cells:
+                in_view |= Q(location__geohash__startswith=cell)
+            # The cell cover stands in for the exact bbox, as in the precomputed path
+            organizations, _ = org_filter.apply(Organization.objects.filter(in_view), exclude=('bbox',))
+            rows = organizations.values(geohash=Substr('location__geohash', 1, precision)).annotate(
+                count=Count('id'), latitude=Avg('location__latitude'), longitude=Avg('location__longitude'),
+            ).order_by('geohash')
+            clusters = list(rows)
 
+        data = {'precision': precision, 'clusters': clusters}
         if errors:
-            response_data['warnings'] = errors
-            logger.warning(f"Filter completed with warnings: {errors}")
+            data['warnings'] = errors
+        return Response(data)
+
+
+    @action(detail=False, methods=['get', 'post'])
+    def batch(self, request):
+        """
+        Up to ``MAX_BATCH_IDS`` organizations by id, from ``?ids=a,b`` or,
+        for long lists, a POST body of ``{"ids": [...]}`` or a plain list.
+        One ``id__in`` query (plus the usual joins and prefetches, and
+        ``?expand=`` / ``?fields=`` on GET) replaces one request per id.
+        Results follow the requested order and ids that do not exist are
+        listed under ``missing``; a request with ids that are not valid
+        UUIDs is rejected.
+        """
+        if request.method == 'GET':
+            requested = [value for param in request.query_params.getlist('ids') for value in param.split(',')]
+        else:
+            requested = request.data.get('ids') if isinstance(request.data, dict) else request.data
+            if not isinstance(requested, list):
+                raise ValidationError({'ids': 'Expected a list of organization ids'})
+        requested = list(dict.fromkeys(str(value).strip() for value in requested if str(value).strip()))
+        if len(requested) > MAX_BATCH_IDS:
+            raise ValidationError({'ids': f'At most {MAX_BATCH_IDS} ids per request'})
+
+        ids, invalid = {}, []
+        for value in requested:
+            try:
+                ids[value] = uuid.UUID(value)
+            except ValueError:
+                invalid.append(value)
+        if invalid:
+            raise ValidationError({'ids': [f"'{value}' is not a valid organization id" for value in invalid]})
+        queryset = self.get_queryset().filter(id__in=ids.values())
+        if self.uses_row_serializer():
+            queryset = OrganizationRowSerializer.values(queryset, self.get_serializer_context())
+            found = {row['id']: row for row in queryset}
+        else:
+            found = {organization.id: organization for organization in queryset}
 
-        return Response(response_data)
+        ordered = [found[ids[value]] for value in requested if ids[value] in found]
+        missing = [value for value in requested if ids[value] not in found]
+        return Response({'results': self.get_serializer(ordered, many=True).data, 'missing': missing})
 
+    @action(detail=False, methods=['post'])
+    def bulk(self, request):
+        """
+        Create (``mode=create``), create or update (``mode=upsert``, the
+        default) or partially update (``mode=update``) up to
+        ``MAX_BULK_ITEMS`` organizations in one transaction. The body is a
+        list of organizations or ``{"mode": ..., "items": [...]}``; side
+        tables are nested objects and ``industry`` / ``ownership_structures``
+        are ids. The whole batch is validated first, and any invalid item
+        rejects it with per-item errors.
+        """
+        mode = request.query_params.get('mode', 'upsert')
+        items = request.data
+        if isinstance(items, dict):
+            mode = items.get('mode', mode)
+            items = items.get('items')
+        if mode not in BULK_MODES:
+            raise ValidationError({'mode': f"Must be one of: {', '.join(BULK_MODES)}"})
+        if not isinstance(items, list) or not items:
+            raise ValidationError({'items': 'Expected a non-empty list of organizations'})
+        if len(items) > MAX_BULK_ITEMS:
+            raise ValidationError({'items': f'At most {MAX_BULK_ITEMS} organizations per request'})
 
-class OwnershipStructureViewSet(viewsets.ReadOnlyModelViewSet):
+        validated, errors = [], []
+        for item in items:
+            serializer = OrganizationBulkSerializer(data=item, partial=mode == 'update')
+            serializer.is_valid()
+            validated.append(serializer.validated_data if not serializer.errors else {})
+            errors.append(dict(serializer.errors))
+
+        # Relations and ids are checked with one query each for the whole batch
+        ids = [item['id'] for item in validated if 'id' in item]
+        stored = set(Organization.objects.filter(id__in=ids).values_list('id', flat=True))
+        industries = {item['industry'] for item in validated if item.get('industry') is not None}
+        industries -= set(Industry.objects.filter(pk__in=industries).values_list('pk', flat=True))
+        structures = {pk for item in validated for pk in item.get('ownership_structures', ())}
+        structures -= set(OwnershipStructure.objects.filter(pk__in=structures).values_list('pk', flat=True))
+        seen = set()
+        for item, item_errors in zip(validated, errors):
+            if item_errors:
+                continue
+            organization_id = item.get('id')
+            if organization_id is None:
+                if mode == 'update':
+                    item_errors['id'] = ['This field is required for updates.']
+            elif organization_id in seen:
+                item_errors['id'] = ['Duplicate id in this batch.']
+            elif mode == 'create' and organization_id in stored:
+                item_errors['id'] = ['An organization with this id already exists.']
+            elif mode == 'update' and organization_id not in stored:
+                item_errors['id'] = ['No organization with this id.']
+            seen.add(organization_id)
+            if item.get('industry') in industries:
+                item_errors['industry'] = [f"Invalid pk \"{item['industry']}\" - object does not exist."]
+            missing = [pk for pk in item.get('ownership_structures', ()) if pk in structures]
+            if missing:
+                item_errors['ownership_structures'] = [f'Invalid pk "{pk}" - object does not exist.' for pk in missing]
+
+        if any(errors):
+            return Response(
+                {'errors': [{'index': index, 'errors': item_errors} for index, item_errors in enumerate(errors) if item_errors]},
+                status=status.HTTP_400_BAD_REQUEST,
+            )
+
+        with transaction.atomic():
+            written = OrganizationBulkWriter().write(validated)
+        results = [
+            {'index': index, 'id': str(organization_id), 'status': 'created' if created else 'updated'}
+            for index, (organization_id, created) in enumerate(written)
+        ]
+        created = sum(1 for result in results if result['status'] == 'created')
+        return Response({'created': created, 'updated': len(results) - created, 'results': results})
+
+    @action(detail=True, methods=['get'])
+    def similar(self, request, pk=None):
+        """
+        Up to ``?limit=`` (default 10, max 50) organizations most like this
+        one by tags, ownership structures and description, each with its
+        estimated Jaccard ``similarity``, best first. Candidates come from
+        the LSH band index, so the cost does not grow with the directory.
+        """
+        organization = get_object_or_404(Organization.objects.only('id'), pk=pk)
+        try:
+            limit = int(request.query_params.get('limit', SIMILAR_LIMIT))
+        except ValueError:
+            raise ValidationError({'limit': 'Must be an integer'})
+        limit = min(max(limit, 1), MAX_SIMILAR_LIMIT)
+
+        neighbours = OrganizationSignature.objects.similar(organization.pk, limit)
+        scores = dict(neighbours)
+        order = {candidate_id: position for position, (candidate_id, _) in enumerate(neighbours)}
+        context = self.get_serializer_context()
+        rows = OrganizationRowSerializer.values(Organization.objects.filter(id__in=scores), context)
+        rows = sorted(rows, key=lambda row: order[row['id']])
+        results = OrganizationRowSerializer(rows, context=context).data
+        for result, row in zip(results, rows):
+            result['similarity'] = round(scores[row['id']], 4)
+        return Response({'results': results})
+
+
+class IndustryViewSet(viewsets.ReadOnlyModelViewSet):
+    """
+    API endpoint for listing NACE industries in hierarchy order.
+    """
+    queryset = Industry.objects.order_by('path')
+    serializer_class = IndustrySerializer
+
+    @action(detail=False, methods=['get'])
+    def tree(self, request):
+        """
+        The whole hierarchy as nested ``{code, description, children}``
+        nodes, served from memory and rebuilt only after industries change.
+        """
+        return Response(industry_tree())
+
+
+class OwnershipStructureViewSet(ConditionalGetMixin, viewsets.ReadOnlyModelViewSet):
     """
     API endpoint for listing ownership structures.
     """
     queryset = OwnershipStructure.objects.all()
-    serializer_class = OwnershipStructureSerializer
\ No newline at end of file
+    serializer_class = OwnershipStructureSerializer
+
+
+class TagUsageViewSet(viewsets.ReadOnlyModelViewSet):
+    """
+    API endpoint listing tags (or certifications with ``?kind=certification``)
+    with the number of organizations using them, most used first.
+    """
+    serializer_class = TagUsageSerializer
+
+    def get_queryset(self):
+        kind = self.request.query_params.get('kind', TagUsage.TAG).strip().lower()
+        return TagUsage.objects.filter(kind=kind).order_by('-count', 'name')
+
+
+class OrganizationStatsViewSet(viewsets.ViewSet):
+    """
+    API endpoint with dashboard totals per type, size, legal structure,
+    geographic scope, country and decade founded. It reads only the
+    precomputed summary rows, never the organizations table.
+    """
+
+    def list(self, request):
+        stats = {dimension: [] for dimension, _ in OrganizationStats.DIMENSION_CHOICES}
+        rows = OrganizationStats.objects.order_by('dimension', '-count', 'value').values('dimension', 'value', 'count')
+        for row in rows:
+            labels = CHOICE_LABELS.get(row['dimension'], {})
+            stats.setdefault(row['dimension'], []).append({
+                'value': row['value'],
+                'label': labels.get(row['value'], row['value']),
+                'count': row['count'],
+            })
+        total = sum(entry['count'] for entry in stats[OrganizationStats.TYPE])
+        return Response({'total': total, 'stats': stats})
+
+
+class AutocompleteViewSet(viewsets.ViewSet):
+    """
+    API endpoint with type-ahead suggestions: organization names
+    (``?kind=org``, the default) or NACE industries (``?kind=industry``)
+    starting with ``?prefix=``, at any word. Served from an in-memory
+    index that is rebuilt after the data changes.
+    """
+
+    def list(self, request):
+        kind = request.query_params.get('kind', 'org').strip().lower()
+        if kind not in AUTOCOMPLETE_KINDS:
+            raise ValidationError({'kind': f"Must be one of: {', '.join(AUTOCOMPLETE_KINDS)}"})
+        try:
+            limit = int(request.query_params.get('limit', AUTOCOMPLETE_LIMIT))
+        except ValueError:
+            raise ValidationError({'limit': 'Must be an integer'})
+        limit = min(max(limit, 1), MAX_AUTOCOMPLETE_LIMIT)
+        prefix = request.query_params.get('prefix', '')
+        return Response({'kind': kind, 'prefix': prefix, 'results': suggest(kind, prefix, limit)})
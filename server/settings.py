@@ -45,7 +45,8 @@ INSTALLED_APPS = [
     'django.contrib.sessions',
     'django.contrib.messages',
     'django.contrib.staticfiles',
-    
+    'django.contrib.postgres',
+
     'django_extensions',
 
     'rest_framework',
@@ -105,6 +106,19 @@ DATABASES = {
 }
 
 
+# Response cache for the organization filter endpoint. BACKEND is 'lru'
+# (in-process, at most MAX_ENTRIES responses) or 'django' (the CACHES
+# alias in ALIAS); either way entries are kept for TIMEOUT seconds.
+# Entries are invalidated through data versions stored in the database,
+# so writes made by any process are seen by every other one.
+
+ORGANIZATION_RESPONSE_CACHE = {
+    'BACKEND': 'lru',
+    'MAX_ENTRIES': 1024,
+    'TIMEOUT': 300,
+}
+
+
 # Password validation
 # https://docs.djangoproject.com/en/5.1/ref/settings/#auth-password-validators
 
@@ -1,11 +1,22 @@
 from django.urls import path, include
 from rest_framework.routers import DefaultRouter
-from organizations_manager_app.views import OrganizationViewSet, OwnershipStructureViewSet
+from organizations_manager_app.views import (
+    AutocompleteViewSet,
+    IndustryViewSet,
+    OrganizationStatsViewSet,
+    OrganizationViewSet,
+    OwnershipStructureViewSet,
+    TagUsageViewSet,
+)
 
 # Create a router and register viewsets
 router = DefaultRouter()
 router.register(r'organizations', OrganizationViewSet)
+router.register(r'industries', IndustryViewSet)
 router.register(r'ownership-structures', OwnershipStructureViewSet)
+router.register(r'tags', TagUsageViewSet, basename='tag')
+router.register(r'stats', OrganizationStatsViewSet, basename='stats')
+router.register(r'autocomplete', AutocompleteViewSet, basename='autocomplete')
 
 urlpatterns = [
     path('api/', include(router.urls)),